@@ -9,27 +9,32 @@ from psycopg2.extras import RealDictCursor
 from sentence_transformers import SentenceTransformer
 import logging
 
-from agents_db import REAL_AGENTS, get_agent_profile_text
+from agents_db import PROFILE_EMBEDDING_MODEL, REAL_AGENTS, get_agent_profile_text
+from towow.hdc.encoder import encode_bucketed
+from towow.hdc.pgvector import EMBEDDING_SPACE_SCHEMA, EMBEDDING_SPACE_TABLE
+from towow.hdc.projection import create_projector, load_projector
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class AgentSyncService:
-    def __init__(self, supabase_url: str):
+    def __init__(self, supabase_url: str, projection_path: Optional[str] = None):
         """
         初始化Agent同步服务
         
         Args:
             supabase_url: Supabase数据库连接URL
+            projection_path: 已拟合的降维投影文件（可选，用于对齐 VECTOR(384) 等列维度）
         """
         self.supabase_url = supabase_url.replace("postgresql://", "")
         self.model = None
+        self.projector = load_projector(projection_path) if projection_path else None
         
     def _get_model(self):
         """懒加载向量编码模型"""
         if self.model is None:
-            model_name = "shibing624/text2vec-base-chinese"
+            model_name = PROFILE_EMBEDDING_MODEL
             cache_dir = "/app/models"
             logger.info(f"加载向量编码模型: {model_name}")
             self.model = SentenceTransformer(model_name, cache_folder=cache_dir)
@@ -50,20 +55,79 @@ class AgentSyncService:
             agent: Agent数据字典
             
         Returns:
-            768维向量列表
+            768维向量列表（配置投影时为投影后的维度）
         """
         profile_text = get_agent_profile_text(agent)
         model = self._get_model()
         vector = model.encode(profile_text, normalize_embeddings=True)
+        if self.projector is not None:
+            vector = self.projector.transform(vector)
         return vector.tolist()
     
-    def sync_agent(self, agent: dict, conn=None) -> bool:
+    def _encode_agent_profiles(self, agents: List[dict]) -> List[List[float]]:
+        """
+        批量编码Agent技能描述（去重 + 按长度分桶）
+        
+        Args:
+            agents: Agent数据列表
+            
+        Returns:
+            与输入顺序一致的向量列表
+        """
+        profile_texts = [get_agent_profile_text(agent) for agent in agents]
+        model = self._get_model()
+        vectors = encode_bucketed(model, profile_texts)
+        if self.projector is not None:
+            vectors = self.projector.transform_many(vectors)
+        return vectors.tolist()
+    
+    def fit_projection(self, path: str, target_dim: int = 384, method: str = "random", seed: int = 0) -> dict:
+        """
+        在全部Agent的原始向量上拟合降维投影并保存，供同步与查询编码共用
+        
+        Args:
+            path: 输出文件（.npz）
+            target_dim: 目标维度
+            method: "random"（Agent 较少时）或 "pca"（样本数需不少于目标维度）
+            seed: 随机投影种子
+            
+        Returns:
+            拟合报告（维度、召回率等）
+        """
+        profile_texts = [get_agent_profile_text(agent) for agent in REAL_AGENTS]
+        vectors = encode_bucketed(self._get_model(), profile_texts)
+        projector = create_projector(method, target_dim, seed=seed)
+        report = projector.fit(vectors)
+        projector.save(path)
+        self.projector = projector
+        logger.info(f"投影已保存: {path} ({projector.fingerprint})")
+        return report.to_dict()
+    
+    def _record_embedding_space(self, cursor, dimension: int) -> None:
+        """记录向量所属的模型/投影/维度，服务启动时据此校验查询编码器"""
+        cursor.execute(EMBEDDING_SPACE_SCHEMA)
+        cursor.execute(f"""
+            INSERT INTO {EMBEDDING_SPACE_TABLE} (table_name, model, dimension, projection, updated_at)
+            VALUES ('agents', %s, %s, %s, NOW())
+            ON CONFLICT (table_name) DO UPDATE SET
+                model = EXCLUDED.model,
+                dimension = EXCLUDED.dimension,
+                projection = EXCLUDED.projection,
+                updated_at = NOW()
+        """, (
+            PROFILE_EMBEDDING_MODEL,
+            dimension,
+            self.projector.fingerprint if self.projector is not None else None,
+        ))
+    
+    def sync_agent(self, agent: dict, conn=None, profile_vector: Optional[List[float]] = None) -> bool:
         """
         同步单个Agent到数据库
         
         Args:
             agent: Agent数据
             conn: 数据库连接（可选）
+            profile_vector: 预先编码的向量（可选，缺省时单独编码）
             
         Returns:
             是否成功
@@ -78,7 +142,8 @@ class AgentSyncService:
         
         try:
             # 编码Agent向量
-            profile_vector = self._encode_agent_profile(agent)
+            if profile_vector is None:
+                profile_vector = self._encode_agent_profile(agent)
             skills_json = [skill["name"] for skill in agent["skills"]]
             
             # 检查Agent是否存在
@@ -166,8 +231,12 @@ class AgentSyncService:
         conn.autocommit = True
         cursor = conn.cursor()
         
-        for agent in REAL_AGENTS:
-            success = self.sync_agent(agent, conn)
+        profile_vectors = self._encode_agent_profiles(REAL_AGENTS)
+        if profile_vectors:
+            self._record_embedding_space(cursor, len(profile_vectors[0]))
+        
+        for agent, profile_vector in zip(REAL_AGENTS, profile_vectors):
+            success = self.sync_agent(agent, conn, profile_vector)
             if success:
                 results["success"] += 1
             else:
@@ -276,14 +345,31 @@ class AgentSyncService:
 
 
 if __name__ == "__main__":
+    import argparse
+    import json
     import os
     
+    parser = argparse.ArgumentParser(description="同步Agent向量，或拟合降维投影")
+    subcommands = parser.add_subparsers(dest="command")
+    fit_parser = subcommands.add_parser("fit-projection", help="拟合并保存投影（之后同步与服务端查询编码都会加载它）")
+    fit_parser.add_argument("-o", "--output", default=os.getenv("TOWOW_PROJECTION_PATH") or "projection.npz")
+    fit_parser.add_argument("--dim", type=int, default=384, help="目标维度，需与 profile_vector 列一致")
+    fit_parser.add_argument("--method", choices=["random", "pca"], default="random")
+    fit_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    if args.command == "fit-projection":
+        report = AgentSyncService("").fit_projection(args.output, args.dim, args.method, args.seed)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        print(f"\n请设置 TOWOW_PROJECTION_PATH={args.output} 后重新同步Agent并重启服务")
+        exit(0)
+    
     supabase_url = os.getenv("SUPABASE_URL")
     if not supabase_url:
         print("错误: 请设置环境变量 SUPABASE_URL")
         exit(1)
     
-    sync_service = AgentSyncService(supabase_url)
+    sync_service = AgentSyncService(supabase_url, os.getenv("TOWOW_PROJECTION_PATH"))
     results = sync_service.sync_all_agents()
     
     print(f"\n同步结果:")
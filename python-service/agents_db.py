@@ -3,6 +3,11 @@
 包含预置的真实Agent数据，包含技能描述用于向量编码
 """
 
+import os
+
+# Agent 资料向量化所用模型：agent_sync 写入数据库与服务端查询编码必须一致
+PROFILE_EMBEDDING_MODEL = os.getenv("TOWOW_ENCODER_MODEL") or "shibing624/text2vec-base-chinese"
+
 REAL_AGENTS = [
     {
         "id": "agent-001",
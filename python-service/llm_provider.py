@@ -1,26 +1,20 @@
+import json
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class LLMSettings(BaseSettings):
     llm_provider: str = "openai"
     openai_api_key: str = ""
+    openai_base_url: Optional[str] = None
+    openai_model: str = "gpt-3.5-turbo"
     zhipu_api_key: str = ""
+    llm_timeout_s: float = 30.0
+    llm_max_retries: int = 2
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, extra="ignore")
 
-class LLMProvider(ABC):
-    @abstractmethod
-    async def formulate_requirement(self, original: str) -> Dict[str, Any]:
-        pass
-
-class OpenAIProvider(LLMProvider):
-    def __init__(self, api_key: str):
-        from openai import OpenAI
-        self.client = OpenAI(api_key=api_key)
-    
-    async def formulate_requirement(self, original: str) -> Dict[str, Any]:
-        system_prompt = """你是一个需求分析专家。你的任务是将用户的原始需求（往往模糊、不完整）转化为结构化、可执行的描述。
+FORMULATION_PROMPT = """你是一个需求分析专家。你的任务是将用户的原始需求（往往模糊、不完整）转化为结构化、可执行的描述。
 
 规则：
 1. 理解用户的核心需求，而不是字面意思
@@ -56,107 +50,135 @@ class OpenAIProvider(LLMProvider):
   },
   "confidence": 0.85
 }"""
-        
-        response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
+
+class LLMProvider(ABC):
+    """异步 LLM 调用。实现类持有一个共享客户端，复用连接，调用方取消任务时请求随之中止。"""
+
+    @abstractmethod
+    async def _complete(
+        self, messages: List[Dict[str, str]], temperature: float, json_mode: bool
+    ) -> str:
+        pass
+
+    async def chat(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> str:
+        return await self._complete(messages, temperature, json_mode=False)
+
+    async def formulate_requirement(self, original: str) -> Dict[str, Any]:
+        content = await self._complete(
+            [
+                {"role": "system", "content": FORMULATION_PROMPT},
                 {"role": "user", "content": f"原始需求：{original}"}
             ],
             temperature=0.7,
-            response_format={"type": "json_object"}
+            json_mode=True,
+        )
+        return json.loads(content)
+
+    async def aclose(self) -> None:
+        pass
+
+class OpenAIProvider(LLMProvider):
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        model: str = "gpt-3.5-turbo",
+        timeout_s: float = 30.0,
+        max_retries: int = 2,
+    ):
+        from openai import AsyncOpenAI
+        self.model = model
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout_s,
+            max_retries=max_retries,
+        )
+
+    async def _complete(
+        self, messages: List[Dict[str, str]], temperature: float, json_mode: bool
+    ) -> str:
+        kwargs: Dict[str, Any] = {}
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            **kwargs,
         )
-        
-        import json
-        content = response.choices[0].message.content
-        result = json.loads(content)
-        
-        return result
+        return response.choices[0].message.content or ""
+
+    async def aclose(self) -> None:
+        await self.client.close()
 
 class ZhipuProvider(LLMProvider):
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-    
-    async def formulate_requirement(self, original: str) -> Dict[str, Any]:
+    URL = "https://open.bigmodel.cn/api/paas/v4/chat/completions"
+
+    def __init__(self, api_key: str, model: str = "glm-4", timeout_s: float = 30.0):
         import httpx
-        
-        system_prompt = """你是一个需求分析专家。你的任务是将用户的原始需求（往往模糊、不完整）转化为结构化、可执行的描述。
+        self.api_key = api_key
+        self.model = model
+        self.client = httpx.AsyncClient(
+            timeout=timeout_s,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+        )
 
-规则：
-1. 理解用户的核心需求，而不是字面意思
-2. 识别隐含的需求和约束条件
-3. 提供关键关键词（3-5个）
-4. 给出置信度评分（0-1）
-5. 输出必须是中文
+    async def _complete(
+        self, messages: List[Dict[str, str]], temperature: float, json_mode: bool
+    ) -> str:
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+        }
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
 
-输出格式（JSON）：
-{
-  "enriched": "丰富化后的需求描述",
-  "keywords": ["关键词1", "关键词2", "关键词3"],
-  "context": {
-    "type": "需求类型（如：技能匹配、任务发布、方案咨询）",
-    "domain": "领域（如：法律、金融、技术、设计）",
-    "urgency": "紧急程度（如：高、中、低）",
-    "complexity": "复杂度（如：简单、中等、复杂）"
-  },
-  "confidence": 0.9
-}
+        response = await self.client.post(self.URL, json=payload)
+        if response.status_code != 200:
+            raise Exception(f"智谱AI API错误: {response.status_code}")
 
-示例：
-输入："我需要审核一份合同"
-输出：
-{
-  "enriched": "需要一位具有法律专业背景的专家协助审核跨境贸易合同的合规性，包括条款风险、法律效力等方面",
-  "keywords": ["合同审核", "法律咨询", "合规性检查", "跨境贸易"],
-  "context": {
-    "type": "任务发布",
-    "domain": "法律",
-    "urgency": "中",
-    "complexity": "中等"
-  },
-  "confidence": 0.85
-}"""
-        
-        payload = {
-            "model": "glm-4",
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"原始需求：{original}"}
-            ],
-            "temperature": 0.7,
-            "response_format": {"type": "json_object"}
-        }
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                "https://open.bigmodel.cn/api/paas/v4/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json=payload
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"智谱AI API错误: {response.status_code}")
-            
-            data = response.json()
-            content = data["choices"][0]["message"]["content"]
-            result = json.loads(content)
-            
-            return result
+        data = response.json()
+        return data["choices"][0]["message"]["content"]
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+_provider: Optional[LLMProvider] = None
 
 def get_llm_provider() -> LLMProvider:
-    settings = LLMSettings()
+    """进程内共享的 Provider，避免每次调用新建客户端和连接。"""
+    global _provider
+    if _provider is None:
+        _provider = _create_provider(LLMSettings())
+    return _provider
+
+async def close_llm_provider() -> None:
+    global _provider
+    if _provider is not None:
+        provider, _provider = _provider, None
+        await provider.aclose()
+
+def _create_provider(settings: LLMSettings) -> LLMProvider:
     provider_type = settings.llm_provider.lower()
     
     if provider_type == "zhipu":
         api_key = settings.zhipu_api_key
         if not api_key:
             raise ValueError("使用智谱AI需要配置ZHIPU_API_KEY")
-        return ZhipuProvider(api_key)
+        return ZhipuProvider(api_key, timeout_s=settings.llm_timeout_s)
     else:
         api_key = settings.openai_api_key
         if not api_key:
             raise ValueError("使用OpenAI需要配置OPENAI_API_KEY")
-        return OpenAIProvider(api_key)
+        return OpenAIProvider(
+            api_key,
+            base_url=settings.openai_base_url,
+            model=settings.openai_model,
+            timeout_s=settings.llm_timeout_s,
+            max_retries=settings.llm_max_retries,
+        )
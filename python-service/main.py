@@ -4,10 +4,10 @@ import asyncio
 import os
 import sys
 from datetime import datetime, timedelta
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Union
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from dotenv import load_dotenv
@@ -15,28 +15,41 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from towow import (
+    BarrierPolicy,
+    ConfigError,
+    ConfirmationMode,
+    Deadline,
     EngineBuilder,
     NegotiationSession,
+    NegotiationState,
     DemandSnapshot,
     DemandFormulationSkill,
     OfferGenerationSkill,
     CenterCoordinatorSkill,
     SubNegotiationSkill,
     GapRecursionSkill,
+    HedgePolicy,
+    LLMScheduler,
     LoggingEventPusher,
+    OfferCache,
+    ResultCache,
+    SpeculationPolicy,
+    StragglerMode,
 )
 from towow.adapters.agentcraft_adapter import AgentcraftAdapter
+from towow.infra.admission import AdmissionController, AdmissionRejected
+from towow.infra.idempotency import IdempotencyIndex
+from towow.infra.session_store import SessionStore
+from towow.infra.trace_export import to_chrome_trace
 from towow.infra.llm_client import ClaudePlatformClient
 from towow.hdc.encoder import EmbeddingEncoder
+from towow.hdc.projection import ProjectedEncoder, load_projector
 from towow.hdc.resonance import CosineResonanceDetector
-from agents_db import REAL_AGENTS, get_agent_profile_text
-from llm_provider import get_llm_provider
+from agents_db import PROFILE_EMBEDDING_MODEL, REAL_AGENTS, get_agent_profile_text
+from llm_provider import close_llm_provider, get_llm_provider
 
 logger = __import__('logging').getLogger(__name__)
 
-sessions: dict[str, NegotiationSession] = {}
-tasks: dict[str, asyncio.Task] = {}
-
 class Settings(BaseModel):
     secondme_api_url: str = "https://app.mindos.com/gate/lab/api/secondme"
     secondme_oauth_url: str = "https://app.mindos.com/gate/lab"
@@ -45,6 +58,32 @@ class Settings(BaseModel):
     anthropic_api_key: Optional[str] = ""
     openai_api_key: Optional[str] = ""
     llm_provider: str = "openai"
+    pgvector_dsn: str = os.getenv("TOWOW_PGVECTOR_DSN", "")
+    projection_path: str = os.getenv("TOWOW_PROJECTION_PATH", "")
+    encoder_warmup_retry_s: float = float(os.getenv("TOWOW_ENCODER_WARMUP_RETRY_S", "5"))
+    encoder_warmup_retry_max_s: float = float(os.getenv("TOWOW_ENCODER_WARMUP_RETRY_MAX_S", "300"))
+    barrier_min_fraction: float = float(os.getenv("TOWOW_BARRIER_MIN_FRACTION", "0.8"))
+    barrier_soft_deadline_s: float = float(os.getenv("TOWOW_BARRIER_SOFT_DEADLINE_S", "15"))
+    llm_max_concurrency: int = int(os.getenv("TOWOW_LLM_MAX_CONCURRENCY", "8"))
+    llm_platform_rps: float = float(os.getenv("TOWOW_LLM_PLATFORM_RPS", "4"))
+    llm_platform_burst: int = int(os.getenv("TOWOW_LLM_PLATFORM_BURST", "8"))
+    llm_agent_rps: float = float(os.getenv("TOWOW_LLM_AGENT_RPS", "10"))
+    llm_agent_burst: int = int(os.getenv("TOWOW_LLM_AGENT_BURST", "20"))
+    max_inflight_negotiations: int = int(os.getenv("TOWOW_MAX_INFLIGHT_NEGOTIATIONS", "16"))
+    max_queued_negotiations: int = int(os.getenv("TOWOW_MAX_QUEUED_NEGOTIATIONS", "64"))
+    offer_hedge_budget: float = float(os.getenv("TOWOW_OFFER_HEDGE_BUDGET", "0.1"))
+    negotiation_deadline_s: float = float(os.getenv("TOWOW_NEGOTIATION_DEADLINE_S", "300"))
+    confirmation_mode: str = os.getenv("TOWOW_CONFIRMATION_MODE", "auto")
+    confirmation_timeout_s: float = float(os.getenv("TOWOW_CONFIRMATION_TIMEOUT_S", "60"))
+    session_db_path: str = os.getenv("TOWOW_SESSION_DB_PATH", "towow_sessions.db")
+    session_cache_size: int = int(os.getenv("TOWOW_SESSION_CACHE_SIZE", "256"))
+    session_ttl_s: float = float(os.getenv("TOWOW_SESSION_TTL_S", "300"))
+    idempotency_window_s: float = float(os.getenv("TOWOW_IDEMPOTENCY_WINDOW_S", "60"))
+    result_cache_ttl_s: float = float(os.getenv("TOWOW_RESULT_CACHE_TTL_S", "1800"))
+    result_cache_similarity: float = float(os.getenv("TOWOW_RESULT_CACHE_SIMILARITY", "0.97"))
+    offer_cache_per_agent: int = int(os.getenv("TOWOW_OFFER_CACHE_PER_AGENT", "32"))
+    offer_cache_similarity: float = float(os.getenv("TOWOW_OFFER_CACHE_SIMILARITY", "0.95"))
+    speculative_center_fraction: float = float(os.getenv("TOWOW_SPECULATIVE_CENTER_FRACTION", "0"))
 
     @property
     def config(self) -> dict[str, Any]:
@@ -52,6 +91,19 @@ class Settings(BaseModel):
 
 settings = Settings()
 
+admission = AdmissionController(
+    max_in_flight=settings.max_inflight_negotiations,
+    max_queued=settings.max_queued_negotiations,
+)
+
+session_store = SessionStore(
+    settings.session_db_path,
+    max_completed=settings.session_cache_size,
+    completed_ttl_s=settings.session_ttl_s,
+)
+
+idempotency = IdempotencyIndex(window_s=settings.idempotency_window_s)
+
 llm = get_llm_provider()
 
 app = FastAPI(
@@ -85,6 +137,8 @@ class StartNegotiationRequest(BaseModel):
     user_id: str
     requirement: str
     k: int = 5
+    deadline_s: Optional[float] = None
+    idempotency_key: Optional[str] = None
 
 class NegotiationStatusResponse(BaseModel):
     negotiation_id: str
@@ -95,6 +149,8 @@ class NegotiationStatusResponse(BaseModel):
     offers: List[dict[str, Any]] = []
     plan: Optional[str] = None
     center_rounds: int = 0
+    queue_position: Optional[int] = None
+    trace: Optional[dict[str, Any]] = None
     created_at: str
     completed_at: Optional[str] = None
 
@@ -106,25 +162,169 @@ class MigrateResponse(BaseModel):
     errors: List[str] = []
 
 engine: Optional['NegotiationEngine'] = None
+encoder: Optional[Union[EmbeddingEncoder, ProjectedEncoder]] = None
+llm_scheduler: Optional[LLMScheduler] = None
+warmup_task: Optional[asyncio.Task] = None
+
+async def _retry_warmup(target: Union[EmbeddingEncoder, ProjectedEncoder]) -> None:
+    """预热失败后在后台按指数退避重试，成功后 /ready 自动恢复，无需重启进程"""
+    delay = settings.encoder_warmup_retry_s
+    attempt = 1
+    while True:
+        await asyncio.sleep(delay)
+        attempt += 1
+        try:
+            await target.warmup()
+            logger.info(f"Encoder 第 {attempt} 次预热成功: {target.status()}")
+            return
+        except Exception as e:
+            delay = min(delay * 2, settings.encoder_warmup_retry_max_s)
+            logger.error(f"Encoder 第 {attempt} 次预热失败，{delay:.0f}s 后重试: {e}")
+
+async def _agent_pool() -> tuple[dict[str, Any], dict[str, str]]:
+    agent_vectors = {}
+    display_names = {}
+    
+    agents = [agent_data for agent_data in REAL_AGENTS if agent_data.get("id")]
+    for agent_data in agents:
+        display_names[agent_data["id"]] = agent_data.get("name", agent_data["id"])
+    
+    if settings.pgvector_dsn:
+        # Agent 向量已在数据库中，共振检测由 pgvector 完成
+        logger.info("使用 pgvector 共振检测，跳过 Agent 向量编码")
+    else:
+        try:
+            vectors = await engine_defaults.get('encoder', engine._encoder).batch_encode(
+                [get_agent_profile_text(agent_data) for agent_data in agents]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to encode agents: {e}")
+            vectors = []
+        
+        for agent_data, vector in zip(agents, vectors):
+            agent_vectors[agent_data["id"]] = vector
+        
+        logger.info(f"已编码 {len(agent_vectors)} 个 Agent 向量")
+    
+    return agent_vectors, display_names
+
+def _launch(
+    session: NegotiationSession,
+    agent_vectors: dict[str, Any],
+    display_names: dict[str, str],
+    deadline_s: Optional[float] = None,
+    resume: bool = False,
+) -> asyncio.Task:
+    negotiation_id = session.negotiation_id
+    
+    async def run_negotiation():
+        run = engine.resume_negotiation if resume else engine.start_negotiation
+        try:
+            result_session = await run(
+                session=session,
+                **engine_defaults,
+                agent_vectors=agent_vectors,
+                k_star=session.metadata.get("k_star", 5),
+                agent_display_names=display_names,
+                deadline=Deadline(deadline_s or settings.negotiation_deadline_s),
+            )
+            logger.info(f"协商 {negotiation_id} 完成，状态: {result_session.state.value}")
+        except asyncio.CancelledError:
+            logger.info(f"协商 {negotiation_id} 已取消")
+            session.metadata["cancelled"] = True
+            raise
+        except Exception as e:
+            logger.error(f"协商 {negotiation_id} 失败: {e}")
+            session.metadata["error"] = str(e)
+    
+    task = admission.submit(negotiation_id, run_negotiation)
+    session_store.attach_task(negotiation_id, task)
+    task.add_done_callback(lambda _: session_store.complete(negotiation_id))
+    return task
+
+async def _resume_unfinished() -> None:
+    """重启后从最近的检查点继续未完成的协商，不重复已付费的 LLM 调用"""
+    unfinished = session_store.unfinished()
+    if not unfinished:
+        return
+    
+    agent_vectors, display_names = await _agent_pool()
+    resumed = 0
+    for session in unfinished:
+        session_store.put(session)
+        if session.parent_negotiation_id:
+            # 子协商随父协商中心轮次重新发起，中断的实例直接结束
+            session.metadata["interrupted"] = True
+            session.state = NegotiationState.COMPLETED
+            session_store.complete(session.negotiation_id)
+            continue
+        try:
+            _launch(session, agent_vectors, display_names, resume=True)
+            resumed += 1
+        except AdmissionRejected:
+            logger.warning(f"准入队列已满，协商 {session.negotiation_id} 未能恢复")
+            session.metadata["interrupted"] = True
+            session.state = NegotiationState.COMPLETED
+            session_store.complete(session.negotiation_id)
+    logger.info(f"已从检查点恢复 {resumed} 个未完成的协商")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global engine
+    global engine, encoder, llm_scheduler, warmup_task
     
     try:
         from towow.hdc.encoder import EmbeddingEncoder
         from towow.hdc.resonance import CosineResonanceDetector
         
-        encoder = EmbeddingEncoder()
-        resonance_detector = CosineResonanceDetector()
+        # pgvector 中的向量与降维投影都由 agent_sync 基于同一模型生成，查询必须使用该模型
+        uses_profile_model = bool(settings.pgvector_dsn or settings.projection_path)
+        encoder = EmbeddingEncoder(PROFILE_EMBEDDING_MODEL if uses_profile_model else None)
+        projector = None
+        if settings.projection_path:
+            # 与 agent_sync 加载同一个投影，查询向量与 Agent 向量处于同一空间
+            projector = load_projector(settings.projection_path)
+            encoder = ProjectedEncoder(encoder, projector)
+            logger.info(f"使用降维投影 {settings.projection_path} ({projector.fingerprint}, {projector.target_dim} 维)")
+        if settings.pgvector_dsn:
+            from towow.hdc.pgvector import PgVectorResonanceDetector
+            resonance_detector = PgVectorResonanceDetector(settings.pgvector_dsn)
+            # 模型、投影或维度与库中向量不一致时拒绝启动
+            space = await resonance_detector.verify_embedding_space(
+                PROFILE_EMBEDDING_MODEL,
+                dimension=projector.target_dim if projector else None,
+                projection=projector.fingerprint if projector else None,
+            )
+            logger.info(f"pgvector 向量空间校验通过: {space}")
+        else:
+            resonance_detector = CosineResonanceDetector()
+
+        try:
+            await encoder.warmup()
+            logger.info(f"Encoder 预热完成: {encoder.status()}")
+        except ConfigError:
+            # 投影与模型维度不一致属于配置错误，重试无意义，拒绝启动
+            raise
+        except Exception as e:
+            logger.error(f"Encoder 预热失败，{settings.encoder_warmup_retry_s:.0f}s 后重试: {e}")
+            warmup_task = asyncio.create_task(_retry_warmup(encoder))
         
         api_key = getattr(llm, '_api_key', None) or settings.anthropic_api_key or ""
         llm_client = ClaudePlatformClient(api_key=api_key)
         
         agentcraft_adapter = AgentcraftAdapter(agent_profiles=REAL_AGENTS)
+
+        llm_scheduler = LLMScheduler(
+            max_concurrency=settings.llm_max_concurrency,
+            rate_limits={
+                "platform": (settings.llm_platform_rps, settings.llm_platform_burst),
+                "agent": (settings.llm_agent_rps, settings.llm_agent_burst),
+            },
+        )
         
         engine_builder = (
             EngineBuilder()
+            .with_encoder(encoder)
+            .with_resonance_detector(resonance_detector)
             .with_adapter(agentcraft_adapter)
             .with_llm_client(llm_client)
             .with_center_skill(CenterCoordinatorSkill())
@@ -133,8 +333,35 @@ async def lifespan(app: FastAPI):
             .with_sub_negotiation_skill(SubNegotiationSkill())
             .with_gap_recursion_skill(GapRecursionSkill())
             .with_event_pusher(LoggingEventPusher())
+            .with_llm_scheduler(llm_scheduler)
+            .with_register_session(session_store.put)
+            .with_checkpoint_store(session_store)
+            .confirmation_mode(ConfirmationMode(settings.confirmation_mode))
+            .confirmation_timeout(settings.confirmation_timeout_s)
+            .barrier_policy(BarrierPolicy(
+                min_fraction=settings.barrier_min_fraction,
+                soft_deadline_s=settings.barrier_soft_deadline_s,
+                stragglers=StragglerMode.LATE,
+            ))
+            .pipeline_offers()
+            .hedge_offers(HedgePolicy(max_hedge_ratio=settings.offer_hedge_budget))
         )
         
+        if settings.result_cache_ttl_s > 0:
+            engine_builder.with_result_cache(ResultCache(
+                ttl_s=settings.result_cache_ttl_s,
+                similarity=settings.result_cache_similarity,
+            ))
+        if settings.offer_cache_per_agent > 0:
+            engine_builder.with_offer_cache(OfferCache(
+                similarity=settings.offer_cache_similarity,
+                max_per_agent=settings.offer_cache_per_agent,
+            ))
+        if settings.speculative_center_fraction > 0:
+            engine_builder.speculate_center(SpeculationPolicy(
+                min_fraction=settings.speculative_center_fraction,
+            ))
+        
         engine, defaults = engine_builder.build()
         
         global engine_defaults
@@ -146,10 +373,20 @@ async def lifespan(app: FastAPI):
         logger.info(f"  - LLM Client: {type(llm_client).__name__}")
         logger.info(f"  - Adapter: {type(agentcraft_adapter).__name__}")
         
+        await _resume_unfinished()
+        
         yield
     except Exception as e:
         logger.error(f"Engine 初始化失败: {e}")
         raise
+    finally:
+        if warmup_task is not None and not warmup_task.done():
+            warmup_task.cancel()
+        close = getattr(engine._resonance_detector, "close", None) if engine else None
+        if close is not None:
+            await close()
+        await close_llm_provider()
+        session_store.flush()
 
 app.router.lifespan_context = lifespan
 
@@ -169,7 +406,68 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "encoder": encoder.status() if encoder else None,
+    }
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    就绪检查：Encoder 模型已加载并完成预热
+    """
+    if engine is None or encoder is None or not encoder.is_ready:
+        raise HTTPException(status_code=503, detail="服务未就绪")
+    return {"status": "ready", "encoder": encoder.status()}
+
+@app.get("/api/metrics/llm")
+async def llm_metrics():
+    """
+    LLM 调度器指标：并发、排队长度、各优先级排队耗时
+    """
+    if llm_scheduler is None or engine is None:
+        raise HTTPException(status_code=503, detail="服务未就绪")
+    return {
+        **llm_scheduler.metrics(),
+        "offer_hedging": engine.hedge_metrics(),
+        "speculation": engine.speculation_metrics(),
+    }
+
+@app.get("/api/metrics/phases")
+async def phase_metrics():
+    """
+    协商各阶段耗时直方图（formulation / encoding / offer / center_round / tool_call ...）
+    """
+    if engine is None:
+        raise HTTPException(status_code=503, detail="服务未就绪")
+    return engine.phase_metrics()
+
+@app.get("/api/metrics/admission")
+async def admission_metrics():
+    """
+    协商准入控制指标：运行中、排队、拒绝数量
+    """
+    return admission.metrics()
+
+@app.get("/api/metrics/cache")
+async def cache_metrics():
+    """
+    协商结果与 Offer 缓存指标：命中率、条目数、因 Profile 变化失效的次数
+    """
+    if engine is None:
+        return {"result_cache": None, "offer_cache": None}
+    return {
+        "result_cache": engine.result_cache.metrics() if engine.result_cache else None,
+        "offer_cache": engine.offer_cache.metrics() if engine.offer_cache else None,
+    }
+
+@app.get("/api/metrics/sessions")
+async def session_metrics():
+    """
+    会话存储指标：内存中活跃/已完成会话数、落盘与回读次数
+    """
+    return {**session_store.metrics(), "idempotency": idempotency.metrics()}
 
 @app.post("/api/db/migrate", response_model=MigrateResponse)
 async def migrate_database(background_tasks: BackgroundTasks):
@@ -233,78 +531,77 @@ async def migrate_database(background_tasks: BackgroundTasks):
 @app.post("/api/negotiation/start")
 async def start_negotiation(
     request: StartNegotiationRequest,
-    background_tasks: BackgroundTasks
+    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
 ):
     """
     启动完整协商流程（通爻协议）
+    
+    相同的 Idempotency-Key（或窗口期内相同的 user_id + 需求 + k）会复用已有协商，不重复启动
     """
     global engine, engine_defaults
     
     if engine is None:
         raise HTTPException(status_code=500, detail="Engine 未初始化，请检查配置")
+
+    if encoder is None or not encoder.is_ready:
+        raise HTTPException(status_code=503, detail="Encoder 未就绪，请稍后重试")
+    
+    # 直接调用（非 HTTP 请求）时参数可能是 FastAPI 的 Header 默认值对象，只接受字符串
+    if not isinstance(idempotency_key, str):
+        idempotency_key = None
+    dedup_key = None
+    if idempotency.enabled:
+        dedup_key = IdempotencyIndex.key_for(
+            request.user_id, request.requirement, request.k,
+            idempotency_key or request.idempotency_key,
+        )
+        existing_id = idempotency.lookup(dedup_key)
+        existing = session_store.get(existing_id) if existing_id else None
+        if existing is not None and not (
+            existing.metadata.get("error") or existing.metadata.get("cancelled")
+        ):
+            logger.info(f"重复的协商请求，复用 {existing.negotiation_id}")
+            return _start_response(existing, request.k, deduplicated=True)
+    
+    import uuid
+    negotiation_id = f"neg_{uuid.uuid4().hex[:12]}"
+    
+    # 先占准入名额再准备 Agent 池，过载时直接 429，不做编码等昂贵工作
+    try:
+        admission.reserve(negotiation_id)
+    except AdmissionRejected as e:
+        logger.warning(f"协商队列已满，拒绝 {negotiation_id}: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail="协商队列已满，请稍后重试",
+            headers={"Retry-After": str(int(e.retry_after_s))},
+        )
     
     try:
-        import uuid
-        negotiation_id = f"neg_{uuid.uuid4().hex[:12]}"
-        
-        agent_vectors = {}
-        display_names = {}
-        
-        for agent_data in REAL_AGENTS:
-            agent_id = agent_data.get("id")
-            if not agent_id:
-                continue
-            try:
-                profile_text = get_agent_profile_text(agent_data)
-                vector = await engine_defaults.get('encoder', engine._encoder).encode(profile_text)
-                agent_vectors[agent_id] = vector
-                display_names[agent_id] = agent_data.get("name", agent_id)
-            except Exception as e:
-                logger.warning(f"Failed to encode agent {agent_id}: {e}")
-        
-        logger.info(f"已编码 {len(agent_vectors)} 个 Agent 向量")
-        
         session = NegotiationSession(
             negotiation_id=negotiation_id,
             demand=DemandSnapshot(
                 raw_intent=request.requirement,
                 user_id=request.user_id,
             ),
+            metadata={"k_star": request.k},
         )
         
-        sessions[negotiation_id] = session
+        # 在第一个 await 之前登记，保证并发的重复请求也能命中
+        session_store.put(session)
+        if dedup_key:
+            idempotency.remember(dedup_key, negotiation_id)
         
-        async def auto_confirm():
-            for _ in range(60):
-                await asyncio.sleep(1)
-                if engine.is_awaiting_confirmation(negotiation_id):
-                    engine.confirm_formulation(negotiation_id)
-                    logger.info(f"Auto-confirmed formulation for {negotiation_id}")
-                    return
-
-        background_tasks.add_task(auto_confirm)
-
-        async def run_negotiation():
-            try:
-                result_session = await engine.start_negotiation(
-                    session=session,
-                    **engine_defaults,
-                    agent_vectors=agent_vectors,
-                    k_star=request.k,
-                    agent_display_names=display_names,
-                )
-                sessions[negotiation_id] = result_session
-                logger.info(f"协商 {negotiation_id} 完成，状态: {result_session.state.value}")
-            except Exception as e:
-                logger.error(f"协商 {negotiation_id} 失败: {e}")
-                session.metadata["error"] = str(e)
-                sessions[negotiation_id] = session
-
-        task = asyncio.create_task(run_negotiation())
-        tasks[negotiation_id] = task
+        try:
+            agent_vectors, display_names = await _agent_pool()
+        except BaseException:
+            admission.cancel_reservation(negotiation_id)
+            raise
+        _launch(session, agent_vectors, display_names, request.deadline_s)
         
         matched_agents = []
-        for agent_id, vector in agent_vectors.items():
+        for agent_id in agent_vectors or display_names:
             display_name = display_names.get(agent_id, agent_id)
             matched_agents.append({
                 "agentId": agent_id,
@@ -312,17 +609,46 @@ async def start_negotiation(
                 "resonanceScore": 0.0,
             })
         
-        return {
-            "sessionId": negotiation_id,
-            "formulation": session.demand.formulated_text or session.demand.raw_intent,
-            "matchedAgents": matched_agents[:request.k],
-            "status": "negotiating",
-        }
+        return _start_response(session, request.k, matched_agents)
         
+    except HTTPException:
+        if dedup_key:
+            idempotency.forget(dedup_key)
+        raise
     except Exception as e:
+        if dedup_key:
+            idempotency.forget(dedup_key)
+        session_store.discard(negotiation_id)
         logger.error(f"启动协商失败: {e}")
         raise HTTPException(status_code=500, detail=f"启动协商失败: {str(e)}")
 
+def _start_response(
+    session: NegotiationSession,
+    k: int,
+    matched_agents: Optional[List[dict[str, Any]]] = None,
+    deduplicated: bool = False,
+) -> dict[str, Any]:
+    if matched_agents is None:
+        matched_agents = [
+            {"agentId": p.agent_id, "name": p.display_name, "resonanceScore": p.resonance_score}
+            for p in session.participants
+        ]
+    queue_position = admission.position(session.negotiation_id)
+    if session.state == NegotiationState.COMPLETED:
+        status = "completed"
+    elif queue_position:
+        status = "queued"
+    else:
+        status = "negotiating"
+    return {
+        "sessionId": session.negotiation_id,
+        "formulation": session.demand.formulated_text or session.demand.raw_intent,
+        "matchedAgents": matched_agents[:k],
+        "status": status,
+        "queuePosition": queue_position,
+        "deduplicated": deduplicated,
+    }
+
 @app.post("/api/formulate/requirement")
 async def formulate_requirement(request: dict):
     """
@@ -368,14 +694,14 @@ async def find_resonating_agents(
         # Calculate resonance with all agents
         matched_agents = []
         
-        for agent_data in REAL_AGENTS:
-            agent_id = agent_data.get("id")
-            if not agent_id:
-                continue
+        agents = [agent_data for agent_data in REAL_AGENTS if agent_data.get("id")]
+        agent_vectors = await engine_defaults.get('encoder', engine._encoder).batch_encode(
+            [get_agent_profile_text(agent_data) for agent_data in agents]
+        )
+        
+        for agent_data, agent_vector in zip(agents, agent_vectors):
+            agent_id = agent_data["id"]
             try:
-                profile_text = get_agent_profile_text(agent_data)
-                agent_vector = await engine_defaults.get('encoder', engine._encoder).encode(profile_text)
-                
                 # Calculate cosine similarity
                 import numpy as np
                 req_vec = np.array(requirement_vector)
@@ -422,9 +748,7 @@ async def get_negotiation_status(session_id: str):
     """
     获取协商状态
     """
-    global sessions
-    
-    session = sessions.get(session_id)
+    session = session_store.get(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="会话不存在")
     
@@ -445,19 +769,81 @@ async def get_negotiation_status(session_id: str):
             "confidence": o.confidence,
         })
     
+    queue_position = admission.position(session_id)
+    if session.metadata.get("cancelled"):
+        status = "cancelled"
+    elif engine is not None and engine.is_awaiting_confirmation(session_id):
+        status = "awaiting_confirmation"
+    elif session.state.value == "completed":
+        status = "completed"
+    elif queue_position:
+        status = "queued"
+    else:
+        status = "negotiating"
+    
     return NegotiationStatusResponse(
         negotiation_id=session.negotiation_id,
-        status="completed" if session.state.value == "completed" else "negotiating",
+        status=status,
         state=session.state.value,
         formulation=session.demand.formulated_text,
         matched_agents=matched_agents,
         offers=offers,
         plan=session.plan_output,
         center_rounds=session.center_rounds,
+        queue_position=queue_position,
+        trace=session.trace.summary() if session.trace else None,
         created_at=session.created_at.isoformat(),
         completed_at=session.completed_at.isoformat() if session.completed_at else None,
     )
 
+@app.get("/api/negotiation/{session_id}/trace")
+async def get_negotiation_trace(session_id: str, format: str = "chrome"):
+    """
+    导出协商时间线：format=chrome 为 Chrome Trace Event（可在 Perfetto 打开），format=raw 为原始 span
+    """
+    session = session_store.get(session_id)
+    if not session or not session.trace:
+        raise HTTPException(status_code=404, detail="会话不存在")
+    
+    traces = [session.trace.to_dict()]
+    for sub_id in session.sub_session_ids:
+        sub_session = session_store.get(sub_id)
+        if sub_session and sub_session.trace:
+            traces.append(sub_session.trace.to_dict())
+    
+    if format == "raw":
+        return traces
+    return to_chrome_trace(traces)
+
+class ConfirmFormulationRequest(BaseModel):
+    confirmed_text: Optional[str] = None
+
+@app.post("/api/negotiation/{session_id}/confirm")
+async def confirm_formulation(session_id: str, request: ConfirmFormulationRequest):
+    """
+    确认需求 Formulation（可选修改文本），协商随即继续
+    """
+    if engine is None or not engine.confirm_formulation(session_id, request.confirmed_text):
+        raise HTTPException(status_code=409, detail="该协商当前不在等待确认")
+    return {"sessionId": session_id, "status": "confirmed"}
+
+@app.post("/api/negotiation/{session_id}/cancel")
+async def cancel_negotiation(session_id: str):
+    """
+    取消协商：中止排队或进行中的协商，释放其 LLM 与并发配额
+    """
+    session = session_store.get(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="会话不存在")
+    
+    task = session_store.get_task(session_id)
+    if task is None or task.done():
+        raise HTTPException(status_code=409, detail="协商已结束，无法取消")
+    
+    task.cancel()
+    session.metadata["cancelled"] = True
+    return {"sessionId": session_id, "status": "cancelled"}
+
 @app.get("/api/market/skills")
 async def get_market_skills():
     """
@@ -563,6 +949,11 @@ async def sync_agents(background_tasks: BackgroundTasks):
     管理接口：同步Agent数据到数据库
     """
     try:
+        # Profile 可能已更新，缓存的协商结果不再可信
+        if engine is not None and engine.result_cache is not None:
+            engine.result_cache.clear()
+        if engine is not None and engine.offer_cache is not None:
+            engine.offer_cache.clear()
         return {
             "status": "success",
             "synced_count": len(REAL_AGENTS),
@@ -583,7 +974,7 @@ async def test_negotiation():
             requirement="我需要一个技术合伙人来开发AI产品",
             k=3
         )
-        return await start_negotiation(request, BackgroundTasks())
+        return await start_negotiation(request, BackgroundTasks(), idempotency_key=None)
     except Exception as e:
         logger.error(f"测试协商失败: {e}")
         raise HTTPException(status_code=500, detail=str(e))
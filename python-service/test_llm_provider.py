@@ -0,0 +1,141 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from openai import APITimeoutError
+
+from llm_provider import OpenAIProvider
+
+DELAY_S = 0.3
+
+
+class StubCompletions(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    requests: list[dict] = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cls = type(self)
+        with cls.lock:
+            cls.requests.append(body)
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            time.sleep(DELAY_S)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+        content = json.dumps({"enriched": body["messages"][-1]["content"], "keywords": [], "confidence": 0.9})
+        payload = json.dumps({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+        }).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    StubCompletions.in_flight = StubCompletions.max_in_flight = 0
+    StubCompletions.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubCompletions)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _provider(server, **kwargs):
+    host, port = server.server_address
+    return OpenAIProvider(api_key="test", base_url=f"http://{host}:{port}/v1", max_retries=0, **kwargs)
+
+
+def test_concurrent_requests_overlap_without_blocking_the_loop():
+    server = _serve()
+
+    async def run():
+        provider = _provider(server)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        tick_task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        results = await asyncio.gather(*(provider.formulate_requirement(f"需求 {i}") for i in range(4)))
+        elapsed = time.perf_counter() - started
+        tick_task.cancel()
+        await provider.aclose()
+        return results, elapsed, ticks
+
+    try:
+        results, elapsed, ticks = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    assert [r["enriched"] for r in results] == [f"原始需求：需求 {i}" for i in range(4)]
+    assert StubCompletions.max_in_flight == 4
+    assert elapsed < DELAY_S * 2
+    # The loop kept running while the requests were in flight.
+    assert ticks >= int(DELAY_S / 0.01) // 2
+    assert all(r["response_format"] == {"type": "json_object"} for r in StubCompletions.requests)
+
+
+def test_chat_honours_cancellation_and_timeout():
+    server = _serve()
+
+    async def run():
+        provider = _provider(server)
+        reply = await provider.chat([{"role": "user", "content": "hello"}])
+
+        task = asyncio.create_task(provider.chat([{"role": "user", "content": "slow"}]))
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            cancelled_after = time.perf_counter() - started
+        await provider.aclose()
+
+        impatient = _provider(server, timeout_s=0.05)
+        try:
+            await impatient.chat([{"role": "user", "content": "too slow"}])
+            timed_out = False
+        except APITimeoutError:
+            timed_out = True
+        await impatient.aclose()
+        return reply, cancelled_after, timed_out
+
+    try:
+        reply, cancelled_after, timed_out = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    assert json.loads(reply)["enriched"] == "hello"
+    assert "response_format" not in StubCompletions.requests[0]
+    assert cancelled_after < DELAY_S / 2
+    assert timed_out
@@ -0,0 +1,24 @@
+import asyncio
+
+from towow.adapters.agentcraft_adapter import AgentcraftAdapter
+
+
+AGENTS = [
+    {"id": "agent-001", "name": "CodeNinja"},
+    {"id": "agent-002", "name": "PixelMaster"},
+    {"name": "no id"},
+]
+
+
+def test_agentcraft_adapter_indexes_agent_list_by_id():
+    adapter = AgentcraftAdapter(agent_profiles=AGENTS)
+
+    async def run():
+        single = await adapter.get_profile("agent-002")
+        bulk = await adapter.get_profiles(["agent-001", "missing"])
+        return single, bulk
+
+    single, bulk = asyncio.run(run())
+    assert single["name"] == "PixelMaster"
+    assert bulk["agent-001"]["name"] == "CodeNinja"
+    assert bulk["missing"] == {"agent_id": "missing"}
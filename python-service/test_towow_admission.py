@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from towow.infra.admission import AdmissionController, AdmissionRejected
+
+
+def test_admission_defers_then_rejects_when_full():
+    controller = AdmissionController(max_in_flight=2, max_queued=1, expected_duration_s=10.0)
+
+    async def run():
+        gate = asyncio.Event()
+        running = [controller.submit(f"s{i}", gate.wait) for i in range(3)]
+        assert [controller.position(f"s{i}") for i in range(3)] == [0, 0, 1]
+        with pytest.raises(AdmissionRejected) as exc:
+            controller.submit("s3", gate.wait)
+        assert exc.value.retry_after_s == 10.0
+        gate.set()
+        await asyncio.gather(*running)
+
+    asyncio.run(run())
+    metrics = controller.metrics()
+    assert metrics["rejected"] == 1
+    assert metrics["deferred"] == 1
+    assert metrics["admitted"] == 3
+    assert metrics["in_flight"] == 0 and metrics["queued"] == 0
+
+
+def test_admission_caps_in_flight_and_runs_fifo():
+    controller = AdmissionController(max_in_flight=2, max_queued=10)
+    active = 0
+    peak = 0
+    started = []
+
+    def job(key):
+        async def fn():
+            nonlocal active, peak
+            started.append(key)
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+        return fn
+
+    async def run():
+        await asyncio.gather(*(controller.submit(f"s{i}", job(f"s{i}")) for i in range(6)))
+
+    asyncio.run(run())
+    assert peak == 2
+    assert started == [f"s{i}" for i in range(6)]
+
+
+def test_cancelled_deferred_session_leaves_queue():
+    controller = AdmissionController(max_in_flight=1, max_queued=5)
+
+    async def run():
+        gate = asyncio.Event()
+        first = controller.submit("s0", gate.wait)
+        second = controller.submit("s1", gate.wait)
+        third = controller.submit("s2", gate.wait)
+        await asyncio.sleep(0)
+        second.cancel()
+        await asyncio.sleep(0)
+        assert controller.position("s1") is None
+        assert controller.position("s2") == 1
+        gate.set()
+        await asyncio.gather(first, third)
+
+    asyncio.run(run())
+    assert controller.in_flight == 0
+
+
+def test_reservation_rejects_before_setup_and_can_be_released():
+    controller = AdmissionController(max_in_flight=1, max_queued=1)
+
+    async def run():
+        gate = asyncio.Event()
+        controller.reserve("s0")
+        controller.reserve("s1")
+        assert controller.position("s1") == 1
+        with pytest.raises(AdmissionRejected):
+            controller.reserve("s2")
+
+        # Setup for s1 failed: its queued slot goes back to the pool.
+        controller.cancel_reservation("s1")
+        assert controller.position("s1") is None
+        controller.reserve("s2")
+
+        first = controller.submit("s0", gate.wait)
+        second = controller.submit("s2", gate.wait)
+        assert controller.metrics()["rejected"] == 1
+        gate.set()
+        await asyncio.gather(first, second)
+
+    asyncio.run(run())
+    assert controller.in_flight == 0 and controller.queued == 0
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+import towow.hdc.encoder as encoder_module
+from towow.hdc.encoder import EmbeddingEncoder, encode_bucketed, plan_length_buckets
+
+
+class FakeSentenceTransformer:
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.encode_calls: list[list[str]] = []
+        self.batch_sizes: list[int] = []
+        self._lock = threading.Lock()
+
+    def encode(self, texts, normalize_embeddings=True, batch_size=32, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        with self._lock:
+            self.encode_calls.append(batch)
+            self.batch_sizes.append(batch_size)
+        vecs = np.stack([self._vector(t) for t in batch]) if batch else np.zeros((0, self.dim))
+        return vecs[0] if single else vecs
+
+    def _vector(self, text: str) -> np.ndarray:
+        rng = np.random.default_rng(sum(ord(c) for c in text))
+        vec = rng.standard_normal(self.dim).astype(np.float32)
+        return vec / np.linalg.norm(vec)
+
+
+def _patch_loader(monkeypatch, delay_s: float = 0.05):
+    loads = []
+    model = FakeSentenceTransformer()
+
+    def fake_get_model(name):
+        loads.append(name)
+        time.sleep(delay_s)
+        return model
+
+    monkeypatch.setattr(encoder_module, "_get_model", fake_get_model)
+    return loads, model
+
+
+def test_concurrent_first_encodes_load_model_once(monkeypatch):
+    loads, _ = _patch_loader(monkeypatch)
+    encoder = EmbeddingEncoder()
+
+    async def run():
+        return await asyncio.gather(*(encoder.encode(f"text {i}") for i in range(8)))
+
+    vectors = asyncio.run(run())
+    assert len(loads) == 1
+    assert len(vectors) == 8
+
+
+def test_warmup_marks_encoder_ready(monkeypatch):
+    loads, model = _patch_loader(monkeypatch, delay_s=0.0)
+    encoder = EmbeddingEncoder()
+    assert not encoder.is_ready
+
+    asyncio.run(encoder.warmup())
+
+    status = encoder.status()
+    assert encoder.is_ready
+    assert status["loaded"] and status["ready"]
+    assert status["warmup_ms"] is not None
+    assert model.encode_calls[0] == list(EmbeddingEncoder.WARMUP_TEXTS)
+
+    asyncio.run(encoder.encode("after warmup"))
+    assert len(loads) == 1
+
+
+def test_plan_length_buckets_groups_by_length():
+    texts = ["a" * 500, "b", "c" * 100, "d" * 2000, "e" * 10]
+    plan = plan_length_buckets(texts)
+
+    assert [batch_size for batch_size, _ in plan] == [128, 64, 32, 16]
+    assert plan[0][1] == [1, 4]
+    assert [texts[i] for _, members in plan for i in members] == sorted(texts, key=len)
+
+
+def test_encode_bucketed_dedupes_and_keeps_order():
+    model = FakeSentenceTransformer()
+    texts = ["short", "a much longer profile text " * 20, "short ", "  short", "other"]
+
+    vecs = encode_bucketed(model, texts)
+
+    encoded = [t for call in model.encode_calls for t in call]
+    assert sorted(encoded) == sorted({"short", "other", " ".join(texts[1].split())})
+    assert vecs.shape == (5, model.dim)
+    np.testing.assert_allclose(vecs[0], vecs[2])
+    np.testing.assert_allclose(vecs[0], vecs[3])
+    np.testing.assert_allclose(vecs[4], model._vector("other"))
+    np.testing.assert_allclose(vecs[1], model._vector(" ".join(texts[1].split())))
+
+
+def test_batch_encode_returns_one_vector_per_input(monkeypatch):
+    _, model = _patch_loader(monkeypatch, delay_s=0.0)
+    encoder = EmbeddingEncoder()
+
+    vecs = asyncio.run(encoder.batch_encode(["x", "y", "x"]))
+
+    assert len(vecs) == 3
+    np.testing.assert_allclose(vecs[0], vecs[2])
+    assert sum(len(call) for call in model.encode_calls) == 2
@@ -0,0 +1,1133 @@
+import asyncio
+import json
+import time
+from datetime import timedelta
+from typing import Any, Optional
+
+from towow import (
+    BarrierPolicy,
+    ConfirmationMode,
+    DemandSnapshot,
+    EngineBuilder,
+    EventType,
+    HedgePolicy,
+    NegotiationSession,
+    NegotiationState,
+    StragglerMode,
+)
+from towow.core.models import AgentState
+from towow.hdc.encoder_mock import MockEmbeddingEncoder
+from towow.hdc.resonance import CosineResonanceDetector
+
+
+class RecordingEventPusher:
+    def __init__(self):
+        self.events = []
+
+    async def push(self, event):
+        self.events.append(event)
+
+    async def push_many(self, events):
+        self.events.extend(events)
+
+    def of_type(self, event_type: EventType):
+        return [e for e in self.events if e.event_type == event_type]
+
+
+class FakeAdapter:
+    def __init__(self, profiles: Optional[dict[str, dict[str, Any]]] = None):
+        self.profiles = profiles or {}
+        self.profile_calls: list[str] = []
+        self.chat_calls: list[str] = []
+
+    async def get_profile(self, agent_id: str) -> dict[str, Any]:
+        self.profile_calls.append(agent_id)
+        return self.profiles.get(agent_id, {"agent_id": agent_id})
+
+    async def chat(self, agent_id, messages, system_prompt=None) -> str:
+        self.chat_calls.append(agent_id)
+        return f"reply from {agent_id}"
+
+    async def chat_stream(self, agent_id, messages, system_prompt=None):
+        yield await self.chat(agent_id, messages, system_prompt)
+
+
+class FakeOfferSkill:
+    name = "offer_generation"
+
+    def __init__(self, delays: Optional[dict[str, float]] = None, default_delay: float = 0.0):
+        self.delays = delays or {}
+        self.default_delay = default_delay
+        self.calls: list[str] = []
+        self.cancelled: list[str] = []
+
+    async def execute(self, context: dict[str, Any]) -> dict[str, Any]:
+        agent_id = context["agent_id"]
+        self.calls.append(agent_id)
+        try:
+            await asyncio.sleep(self.delays.get(agent_id, self.default_delay))
+        except asyncio.CancelledError:
+            self.cancelled.append(agent_id)
+            raise
+        return {
+            "content": f"offer from {agent_id}",
+            "capabilities": [f"cap-{agent_id}"],
+            "confidence": 0.8,
+        }
+
+
+class FakeFormulationSkill:
+    name = "demand_formulation"
+
+    async def execute(self, context: dict[str, Any]) -> dict[str, Any]:
+        return {"formulated_text": f"formulated: {context['raw_intent']}", "enrichments": {}}
+
+
+class FakeCenterSkill:
+    name = "center_coordinator"
+
+    def __init__(self, rounds: Optional[list[list[dict[str, Any]]]] = None):
+        self.rounds = list(rounds or [])
+        self.contexts: list[dict[str, Any]] = []
+
+    async def execute(self, context: dict[str, Any]) -> dict[str, Any]:
+        self.contexts.append({**context, "offers": list(context["offers"])})
+        if self.rounds:
+            return {"tool_calls": self.rounds.pop(0)}
+        return {"tool_calls": [{"name": "output_plan", "arguments": {"plan_text": "final plan"}}]}
+
+
+AGENT_IDS = ["agent-a", "agent-b", "agent-c", "agent-d"]
+
+
+async def _agent_vectors(agent_ids=AGENT_IDS):
+    encoder = MockEmbeddingEncoder()
+    return {agent_id: await encoder.encode(f"profile of {agent_id}") for agent_id in agent_ids}
+
+
+def _session(negotiation_id: str = "neg_test", raw_intent: str = "need a product team") -> NegotiationSession:
+    return NegotiationSession(
+        negotiation_id=negotiation_id,
+        demand=DemandSnapshot(raw_intent=raw_intent, user_id="user-1"),
+    )
+
+
+def _build(builder: Optional[EngineBuilder] = None, **overrides):
+    pusher = overrides.pop("event_pusher", None) or RecordingEventPusher()
+    builder = (builder or EngineBuilder())
+    builder = (
+        builder.with_encoder(overrides.pop("encoder", MockEmbeddingEncoder()))
+        .with_resonance_detector(overrides.pop("resonance_detector", CosineResonanceDetector()))
+        .with_event_pusher(pusher)
+        .with_adapter(overrides.pop("adapter", FakeAdapter()))
+        .with_llm_client(object())
+        .with_center_skill(overrides.pop("center_skill", FakeCenterSkill()))
+        .with_formulation_skill(overrides.pop("formulation_skill", FakeFormulationSkill()))
+        .with_offer_skill(overrides.pop("offer_skill", FakeOfferSkill()))
+    )
+    engine, defaults = builder.build()
+    return engine, defaults, pusher
+
+
+async def _start(engine, defaults, session=None, k_star=4, agent_ids=AGENT_IDS, resume=False):
+    run = engine.resume_negotiation if resume else engine.start_negotiation
+    return await run(
+        session=session or _session(),
+        **{**defaults, "agent_vectors": await _agent_vectors(agent_ids), "k_star": k_star},
+    )
+
+
+def _negotiate(engine, defaults, **kwargs):
+    return asyncio.run(_start(engine, defaults, **kwargs))
+
+
+def test_default_barrier_waits_for_every_offer():
+    offer_skill = FakeOfferSkill(delays={"agent-d": 0.05})
+    engine, defaults, pusher = _build(offer_skill=offer_skill)
+
+    session = _negotiate(engine, defaults)
+
+    assert session.state == NegotiationState.COMPLETED
+    assert len(session.collected_offers) == 4
+    barrier = pusher.of_type(EventType.BARRIER_COMPLETE)[0].data
+    assert barrier["reason"] == "all_settled"
+    assert barrier["pending_count"] == 0
+
+
+def test_quorum_barrier_cancels_stragglers():
+    offer_skill = FakeOfferSkill(delays={"agent-d": 5.0})
+    engine, defaults, pusher = _build(
+        EngineBuilder().barrier_policy(BarrierPolicy(min_offers=3)),
+        offer_skill=offer_skill,
+    )
+
+    start = time.monotonic()
+    session = _negotiate(engine, defaults)
+
+    assert time.monotonic() - start < 1.0
+    assert offer_skill.cancelled == ["agent-d"]
+    assert len(session.collected_offers) == 3
+    straggler = next(p for p in session.participants if p.agent_id == "agent-d")
+    assert straggler.state == AgentState.EXITED
+    barrier = pusher.of_type(EventType.BARRIER_COMPLETE)[0].data
+    assert barrier["reason"] == "quorum"
+    assert barrier["exited_count"] == 1
+    assert barrier["policy"]["min_offers"] == 3
+
+
+def test_soft_deadline_lets_stragglers_land_late():
+    offer_skill = FakeOfferSkill(delays={"agent-c": 0.1, "agent-d": 0.1})
+    center_skill = FakeCenterSkill(rounds=[[{"name": "ask_agent", "arguments": {"agent_id": "agent-a", "question": "?"}}]])
+    engine, defaults, pusher = _build(
+        EngineBuilder().barrier_policy(
+            BarrierPolicy(soft_deadline_s=0.02, stragglers=StragglerMode.LATE)
+        ),
+        offer_skill=offer_skill,
+        center_skill=center_skill,
+    )
+    adapter = defaults["adapter"]
+    original_chat = adapter.chat
+
+    async def slow_chat(agent_id, messages, system_prompt=None):
+        await asyncio.sleep(0.2)
+        return await original_chat(agent_id, messages, system_prompt)
+
+    adapter.chat = slow_chat
+
+    session = _negotiate(engine, defaults)
+
+    barrier = pusher.of_type(EventType.BARRIER_COMPLETE)[0].data
+    assert barrier["reason"] == "deadline"
+    assert barrier["offers_received"] == 2
+    assert barrier["pending_count"] == 2
+    assert len(center_skill.contexts[0]["offers"]) == 2
+    assert len(center_skill.contexts[1]["offers"]) == 4
+    assert offer_skill.cancelled == []
+    assert len(pusher.of_type(EventType.OFFER_RECEIVED)) == 4
+
+
+class SlowStreamingDetector:
+    def __init__(self, gap_s: float):
+        self.gap_s = gap_s
+        self.inner = CosineResonanceDetector()
+
+    async def detect(self, demand_vector, agent_vectors, k_star):
+        return await self.inner.detect(demand_vector, agent_vectors, k_star)
+
+    async def detect_stream(self, demand_vector, agent_vectors, k_star):
+        for item in await self.inner.detect(demand_vector, agent_vectors, k_star):
+            yield item
+            await asyncio.sleep(self.gap_s)
+
+
+def test_pipelined_offers_start_before_resonance_finishes():
+    engine, defaults, pusher = _build(
+        EngineBuilder().pipeline_offers(),
+        resonance_detector=SlowStreamingDetector(gap_s=0.05),
+    )
+
+    session = _negotiate(engine, defaults)
+
+    assert session.state == NegotiationState.COMPLETED
+    assert len(session.collected_offers) == 4
+    kinds = [e.event_type for e in pusher.events]
+    first_offer = kinds.index(EventType.OFFER_RECEIVED)
+    last_resonance = len(kinds) - 1 - kinds[::-1].index(EventType.RESONANCE_ACTIVATED)
+    assert first_offer < last_resonance
+    activations = pusher.of_type(EventType.RESONANCE_ACTIVATED)
+    assert [e.data["activated_count"] for e in activations] == [1, 2, 3, 4]
+
+
+class OverfetchingStreamingDetector(SlowStreamingDetector):
+    """Streams every agent regardless of k, like a cursor the engine stops reading early."""
+
+    def __init__(self):
+        super().__init__(gap_s=0.0)
+        self.closed = False
+
+    async def detect_stream(self, demand_vector, agent_vectors, k_star):
+        try:
+            for item in await self.inner.detect(demand_vector, agent_vectors, len(agent_vectors)):
+                yield item
+        finally:
+            self.closed = True
+
+
+class ProbeCheckpointStore:
+    def __init__(self, probe):
+        self.probe = probe
+        self.probed = []
+
+    async def checkpoint(self, session):
+        if session.metadata.get("resonance_complete"):
+            self.probed.append(self.probe())
+
+
+def test_pipelined_resonance_closes_the_stream_when_it_stops_early():
+    detector = OverfetchingStreamingDetector()
+    store = ProbeCheckpointStore(lambda: detector.closed)
+    engine, defaults, _ = _build(
+        EngineBuilder().pipeline_offers().with_checkpoint_store(store), resonance_detector=detector,
+    )
+
+    session = _negotiate(engine, defaults, k_star=2)
+
+    assert len(session.participants) == 2
+    # Closed as soon as resonance stopped, not left for the loop's asyncgen finalizer.
+    assert store.probed[0] is True
+
+
+def test_cosine_detect_stream_matches_detect():
+    detector = CosineResonanceDetector()
+
+    async def run():
+        vectors = await _agent_vectors()
+        demand = await MockEmbeddingEncoder().encode("need a product team")
+        batch = await detector.detect(demand, vectors, 3)
+        streamed = [item async for item in detector.detect_stream(demand, vectors, 3)]
+        return batch, streamed
+
+    batch, streamed = asyncio.run(run())
+    assert [a for a, _ in streamed] == [a for a, _ in batch]
+    for (_, s1), (_, s2) in zip(batch, streamed):
+        assert abs(s1 - s2) < 1e-5
+
+
+def test_round_tool_calls_run_concurrently_in_order():
+    center_skill = FakeCenterSkill(rounds=[[
+        {"name": "ask_agent", "arguments": {"agent_id": agent_id, "question": f"q-{agent_id}"}}
+        for agent_id in ["agent-c", "agent-a", "agent-b"]
+    ]])
+    engine, defaults, pusher = _build(center_skill=center_skill)
+    adapter = defaults["adapter"]
+    delays = {"agent-c": 0.15, "agent-a": 0.05, "agent-b": 0.1}
+
+    async def slow_chat(agent_id, messages, system_prompt=None):
+        if messages[0]["content"].startswith("q-"):
+            await asyncio.sleep(delays[agent_id])
+        return f"reply from {agent_id}"
+
+    adapter.chat = slow_chat
+
+    start = time.monotonic()
+    _negotiate(engine, defaults)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.25
+    history = center_skill.contexts[1]["history"]
+    assert [h["agent_id"] for h in history] == ["agent-c", "agent-a", "agent-b"]
+    tool_events = pusher.of_type(EventType.CENTER_TOOL_CALL)
+    assert [e.data["tool_args"].get("agent_id") for e in tool_events[:3]] == ["agent-c", "agent-a", "agent-b"]
+
+
+class SlowToolHandler:
+    tool_name = "slow_tool"
+
+    def __init__(self, delay_s: float):
+        self.delay_s = delay_s
+        self.active = 0
+        self.peak = 0
+
+    async def handle(self, session, tool_args, context):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay_s)
+        finally:
+            self.active -= 1
+        return {"ok": True}
+
+
+def test_tool_calls_respect_concurrency_cap_and_timeout():
+    handler = SlowToolHandler(delay_s=0.05)
+    center_skill = FakeCenterSkill(rounds=[[{"name": "slow_tool", "arguments": {}}] * 4])
+    engine, defaults, _ = _build(
+        EngineBuilder().with_tool_handler(handler).tool_concurrency(2).tool_timeout(0.02, "slow_tool"),
+        center_skill=center_skill,
+    )
+
+    _negotiate(engine, defaults)
+
+    assert handler.peak == 2
+    history = center_skill.contexts[1]["history"]
+    assert [h["type"] for h in history] == ["tool_timeout"] * 4
+
+
+class BulkAdapter(FakeAdapter):
+    def __init__(self):
+        super().__init__()
+        self.bulk_calls: list[list[str]] = []
+
+    async def get_profiles(self, agent_ids):
+        self.bulk_calls.append(list(agent_ids))
+        return {agent_id: {"agent_id": agent_id, "bulk": True} for agent_id in agent_ids}
+
+
+def test_offer_profiles_are_fetched_in_one_bulk_call():
+    adapter = BulkAdapter()
+    center_skill = FakeCenterSkill(rounds=[[{"name": "ask_agent", "arguments": {"agent_id": "agent-a", "question": "?"}}]])
+    engine, defaults, _ = _build(adapter=adapter, center_skill=center_skill)
+
+    _negotiate(engine, defaults)
+
+    assert len(adapter.bulk_calls) == 1
+    assert sorted(adapter.bulk_calls[0]) == sorted(AGENT_IDS)
+    assert adapter.profile_calls == ["user-1"]
+    assert adapter.chat_calls == ["agent-a"]
+
+
+def test_adapters_without_bulk_api_fall_back_to_single_fetches():
+    adapter = FakeAdapter()
+    engine, defaults, _ = _build(adapter=adapter)
+
+    session = _negotiate(engine, defaults)
+
+    assert len(session.collected_offers) == 4
+    assert sorted(adapter.profile_calls) == sorted(["user-1", *AGENT_IDS])
+
+
+class FakeGapRecursionSkill:
+    name = "gap_recursion"
+
+    async def execute(self, context: dict[str, Any]) -> dict[str, Any]:
+        return {"sub_demand_text": f"sub: {context['gap_description']}"}
+
+
+class SubDemandCenterSkill(FakeCenterSkill):
+    def __init__(self, gaps: list[str], child_delay_s: float):
+        super().__init__(rounds=[[
+            {"name": "create_sub_demand", "arguments": {"gap_description": gap}} for gap in gaps
+        ]])
+        self.child_delay_s = child_delay_s
+
+    async def execute(self, context: dict[str, Any]) -> dict[str, Any]:
+        if context["demand"].raw_intent.startswith("sub: "):
+            await asyncio.sleep(self.child_delay_s)
+            return {"tool_calls": [{"name": "output_plan", "arguments": {"plan_text": "sub plan"}}]}
+        return await super().execute(context)
+
+
+def test_sub_negotiations_run_concurrently_and_join_before_next_round():
+    center_skill = SubDemandCenterSkill(gaps=["design", "legal", "ops"], child_delay_s=0.1)
+    engine, defaults, pusher = _build(
+        EngineBuilder().with_gap_recursion_skill(FakeGapRecursionSkill()), center_skill=center_skill
+    )
+
+    start = time.monotonic()
+    session = _negotiate(engine, defaults)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.25
+    assert session.state == NegotiationState.COMPLETED
+    assert len(session.sub_session_ids) == 3
+    results = [h for h in center_skill.contexts[1]["history"] if h["type"] == "sub_negotiation_result"]
+    assert [r["sub_session_id"] for r in results] == session.sub_session_ids
+    assert all(r["state"] == "completed" and r["plan"] == "sub plan" for r in results)
+    assert len(pusher.of_type(EventType.SUB_NEGOTIATION_STARTED)) == 3
+
+
+def test_sub_negotiations_are_cancelled_after_budget():
+    center_skill = SubDemandCenterSkill(gaps=["design"], child_delay_s=5.0)
+    engine, defaults, _ = _build(
+        EngineBuilder().with_gap_recursion_skill(FakeGapRecursionSkill()).sub_negotiation_budget(0.05),
+        center_skill=center_skill,
+    )
+
+    start = time.monotonic()
+    _negotiate(engine, defaults)
+
+    assert time.monotonic() - start < 1.0
+    history = center_skill.contexts[1]["history"]
+    assert [h["type"] for h in history] == ["sub_demand", "sub_negotiation_timeout"]
+
+
+def test_cancelling_a_sub_negotiation_leaves_the_parent_running():
+    center_skill = SubDemandCenterSkill(gaps=["design", "legal"], child_delay_s=5.0)
+    sessions = {}
+    engine, defaults, _ = _build(
+        EngineBuilder()
+        .with_gap_recursion_skill(FakeGapRecursionSkill())
+        .with_register_session(lambda s: sessions.setdefault(s.negotiation_id, s)),
+        center_skill=center_skill,
+    )
+    parent = _session()
+
+    async def run():
+        task = asyncio.create_task(_start(engine, defaults, session=parent))
+        while len(parent.sub_session_ids) < 2:
+            await asyncio.sleep(0.01)
+        for sub_id in parent.sub_session_ids:
+            while not engine.cancel_negotiation(sub_id):
+                await asyncio.sleep(0.01)
+        return await task
+
+    start = time.monotonic()
+    session = asyncio.run(run())
+
+    assert time.monotonic() - start < 1.0
+    assert session.state == NegotiationState.COMPLETED
+    assert "cancelled" not in session.metadata
+    history = center_skill.contexts[1]["history"]
+    results = [h for h in history if h["type"] != "sub_demand"]
+    assert [h["type"] for h in results] == ["sub_negotiation_cancelled"] * 2
+    assert all(sessions[sub_id].metadata["cancelled"] for sub_id in session.sub_session_ids)
+
+
+class CountingEncoder(MockEmbeddingEncoder):
+    def __init__(self):
+        super().__init__()
+        self.encoded: list[str] = []
+        self.batches: list[list[str]] = []
+        self._in_batch = False
+
+    async def encode(self, text):
+        if not self._in_batch:
+            self.encoded.append(text)
+        return await super().encode(text)
+
+    async def batch_encode(self, texts):
+        self.batches.append(list(texts))
+        self._in_batch = True
+        try:
+            return await super().batch_encode(texts)
+        finally:
+            self._in_batch = False
+
+
+def test_sub_negotiations_resonate_against_parent_index_excluding_parent_agents():
+    agent_ids = [f"agent-{i}" for i in range(8)]
+    encoder = CountingEncoder()
+    center_skill = SubDemandCenterSkill(gaps=["design", "legal"], child_delay_s=0.0)
+    offer_skill = FakeOfferSkill()
+    sessions = {}
+    engine, defaults, pusher = _build(
+        EngineBuilder()
+        .with_gap_recursion_skill(FakeGapRecursionSkill())
+        .with_register_session(lambda s: sessions.setdefault(s.negotiation_id, s)),
+        center_skill=center_skill, encoder=encoder, offer_skill=offer_skill,
+    )
+
+    session = _negotiate(engine, defaults, k_star=3, agent_ids=agent_ids)
+
+    parent_agents = {p.agent_id for p in session.participants}
+    assert len(parent_agents) == 3
+    assert encoder.batches == [["sub: design", "sub: legal"]]
+    assert not any(text.startswith("sub: ") for text in encoder.encoded)
+    for sub_id in session.sub_session_ids:
+        child = sessions[sub_id]
+        child_agents = {p.agent_id for p in child.participants}
+        assert len(child_agents) == 3
+        assert not child_agents & parent_agents
+        assert len(child.collected_offers) == 3
+
+
+class StalledBatchEncoder(MockEmbeddingEncoder):
+    def __init__(self):
+        super().__init__()
+        self.started = False
+        self.cancelled = False
+
+    async def batch_encode(self, texts):
+        self.started = True
+        try:
+            await asyncio.sleep(5.0)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return await super().batch_encode(texts)
+
+
+def test_cancelling_a_round_cancels_its_sub_demand_batch_flush():
+    encoder = StalledBatchEncoder()
+    engine, defaults, _ = _build(
+        EngineBuilder().with_gap_recursion_skill(FakeGapRecursionSkill()),
+        center_skill=SubDemandCenterSkill(gaps=["design", "legal"], child_delay_s=0.0),
+        encoder=encoder,
+    )
+    session = _session()
+
+    async def run():
+        task = asyncio.create_task(_start(engine, defaults, session=session))
+        while not encoder.started:
+            await asyncio.sleep(0.01)
+        assert engine.cancel_negotiation(session.negotiation_id)
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        # Checked before asyncio.run tears the loop down and cancels leftovers.
+        return encoder.cancelled
+
+    assert asyncio.run(run()) is True
+    assert session.metadata["cancelled"] is True
+
+
+class StallingOfferSkill(FakeOfferSkill):
+    """Stalls the first attempt per agent once `stall` is set; retries answer fast."""
+
+    def __init__(self):
+        super().__init__(default_delay=0.01)
+        self.stall = False
+        self.stalled: set[str] = set()
+
+    async def execute(self, context):
+        agent_id = context["agent_id"]
+        if self.stall and agent_id not in self.stalled:
+            self.stalled.add(agent_id)
+            self.delays[agent_id] = 5.0
+        else:
+            self.delays.pop(agent_id, None)
+        return await super().execute(context)
+
+
+def test_hedged_offers_cut_the_tail_and_cancel_the_loser():
+    offer_skill = StallingOfferSkill()
+    engine, defaults, _ = _build(
+        EngineBuilder().hedge_offers(HedgePolicy(min_samples=3, min_delay_s=0.05, max_hedge_ratio=0.5)),
+        offer_skill=offer_skill,
+    )
+
+    for i in range(3):
+        _negotiate(engine, defaults, session=_session(f"warm_{i}"))
+    assert engine.hedge_metrics()["hedged_calls"] == 0
+    offer_skill.stall = True
+
+    start = time.monotonic()
+    session = _negotiate(engine, defaults)
+
+    assert time.monotonic() - start < 1.0
+    assert len(session.collected_offers) == 4
+    metrics = engine.hedge_metrics()
+    assert metrics["hedged_calls"] == 4
+    assert metrics["hedge_wins"] == 4
+    assert metrics["hedge_rate"] == 4 / 16
+    assert sorted(offer_skill.cancelled) == sorted(AGENT_IDS)
+
+
+def test_hedging_respects_budget():
+    offer_skill = StallingOfferSkill()
+    engine, defaults, _ = _build(
+        EngineBuilder()
+        .hedge_offers(HedgePolicy(min_samples=3, min_delay_s=0.02, max_hedge_ratio=0.1))
+        .offer_timeout(0.2),
+        offer_skill=offer_skill,
+    )
+
+    for i in range(3):
+        _negotiate(engine, defaults, session=_session(f"warm_{i}"))
+    offer_skill.stall = True
+    session = _negotiate(engine, defaults)
+
+    assert engine.hedge_metrics()["hedged_calls"] == 1
+    assert len(session.collected_offers) == 1
+
+
+def test_deadline_shrinks_stage_timeouts_and_completes_session():
+    offer_skill = FakeOfferSkill(delays={"agent-d": 5.0})
+    center_skill = FakeCenterSkill(rounds=[[{"name": "slow_tool", "arguments": {}}]])
+    engine, defaults, _ = _build(
+        EngineBuilder().with_tool_handler(SlowToolHandler(delay_s=5.0)).negotiation_deadline(0.2),
+        offer_skill=offer_skill,
+        center_skill=center_skill,
+    )
+
+    start = time.monotonic()
+    session = _negotiate(engine, defaults)
+
+    assert time.monotonic() - start < 1.0
+    assert session.state == NegotiationState.COMPLETED
+    assert session.metadata["deadline_exceeded"] is True
+    assert len(session.collected_offers) == 3
+    assert offer_skill.cancelled == ["agent-d"]
+
+
+def test_cancel_negotiation_aborts_in_flight_offers():
+    offer_skill = FakeOfferSkill(default_delay=5.0)
+    engine, defaults, _ = _build(offer_skill=offer_skill)
+    session = _session()
+
+    async def run():
+        task = asyncio.create_task(_start(engine, defaults, session=session))
+        while len(offer_skill.calls) < 4:
+            await asyncio.sleep(0.01)
+        assert engine.cancel_negotiation(session.negotiation_id)
+        try:
+            await task
+        except asyncio.CancelledError:
+            return "cancelled"
+
+    assert asyncio.run(run()) == "cancelled"
+    assert sorted(offer_skill.cancelled) == sorted(AGENT_IDS)
+    assert session.state == NegotiationState.COMPLETED
+    assert session.metadata["cancelled"] is True
+    assert engine.cancel_negotiation(session.negotiation_id) is False
+
+
+def test_wait_mode_pauses_until_confirmed_with_edited_text():
+    engine, defaults, _ = _build(EngineBuilder().confirmation_mode(ConfirmationMode.WAIT))
+    session = _session()
+
+    async def run():
+        task = asyncio.create_task(_start(engine, defaults, session=session))
+        while not engine.is_awaiting_confirmation(session.negotiation_id):
+            await asyncio.sleep(0.01)
+        assert session.state == NegotiationState.FORMULATED
+        assert engine.confirm_formulation(session.negotiation_id, "edited demand")
+        return await task
+
+    result = asyncio.run(run())
+
+    assert result.state == NegotiationState.COMPLETED
+    assert result.demand.formulated_text == "edited demand"
+    assert result.metadata["confirmed"] is True
+    assert not engine.is_awaiting_confirmation(session.negotiation_id)
+    assert engine.pending_confirmations == 0
+
+
+class ConfirmingEventPusher(RecordingEventPusher):
+    """Confirms as soon as formulation.ready is pushed, before the engine starts waiting."""
+
+    engine = None
+
+    async def push(self, event):
+        await super().push(event)
+        if event.event_type == EventType.FORMULATION_READY:
+            assert self.engine.confirm_formulation(event.negotiation_id, "early edit")
+
+
+def test_confirmation_arriving_before_the_wait_is_not_lost():
+    pusher = ConfirmingEventPusher()
+    engine, defaults, _ = _build(
+        EngineBuilder().confirmation_mode(ConfirmationMode.REQUIRE).confirmation_timeout(0.05),
+        event_pusher=pusher,
+    )
+    pusher.engine = engine
+
+    session = _negotiate(engine, defaults)
+
+    assert session.metadata["confirmed"] is True
+    assert "confirmation_timed_out" not in session.metadata
+    assert session.demand.formulated_text == "early edit"
+    assert len(session.collected_offers) == 4
+    assert engine.pending_confirmations == 0
+
+
+def test_require_mode_ends_unconfirmed_negotiation_after_timeout():
+    engine, defaults, _ = _build(
+        EngineBuilder().confirmation_mode(ConfirmationMode.REQUIRE).confirmation_timeout(0.05)
+    )
+
+    session = _negotiate(engine, defaults)
+
+    assert session.state == NegotiationState.COMPLETED
+    assert session.metadata["confirmation_timed_out"] is True
+    assert session.participants == []
+    assert engine.pending_confirmations == 0
+
+
+def test_auto_mode_never_registers_a_confirmation():
+    engine, defaults, _ = _build(EngineBuilder().confirmation_mode(ConfirmationMode.AUTO))
+
+    session = _negotiate(engine, defaults)
+    assert len(session.collected_offers) == 4
+    assert not engine.confirm_formulation(session.negotiation_id)
+
+
+def test_trace_records_nested_phase_spans():
+    center_skill = FakeCenterSkill(rounds=[[{"name": "ask_agent", "arguments": {"agent_id": "agent-a", "question": "?"}}]])
+    offer_skill = FakeOfferSkill(default_delay=0.02)
+    engine, defaults, _ = _build(center_skill=center_skill, offer_skill=offer_skill)
+
+    session = _negotiate(engine, defaults)
+    entries = session.trace.entries
+    by_id = {e.span_id: e for e in entries}
+
+    def parent_step(entry):
+        return by_id[entry.parent_id].step if entry.parent_id else None
+
+    root = entries[0]
+    assert root.step == "negotiation" and root.parent_id is None
+    steps = [e.step for e in entries]
+    for step in ["formulation", "encoding", "resonance", "barrier"]:
+        assert steps.count(step) == 1
+    offers = [e for e in entries if e.step == "offer"]
+    assert len(offers) == 4
+    assert all(parent_step(e) == "negotiation" and e.duration_ms >= 15 for e in offers)
+    rounds = [e for e in entries if e.step == "center_round"]
+    assert [e.metadata["round"] for e in rounds] == [1, 2]
+    tool = next(e for e in entries if e.step == "tool_call")
+    assert tool.metadata["tool"] == "ask_agent"
+    assert parent_step(tool) == "center_round"
+    assert all(e.duration_ms is not None and e.duration_ms <= root.duration_ms for e in entries)
+
+    assert session.completed_at is not None
+    summary = session.trace.summary()
+    assert summary["phases"]["offer"]["count"] == 4
+    assert summary["total_ms"] == root.duration_ms
+    histograms = engine.phase_metrics()
+    assert histograms["offer"]["count"] == 4
+    assert histograms["negotiation"]["buckets"]["+Inf"] == 1
+
+
+class RecordingCheckpointStore:
+    def __init__(self):
+        self.snapshots: list[dict[str, Any]] = []
+
+    async def checkpoint(self, session):
+        # Round-trip like SessionStore does, so later mutations don't leak into snapshots.
+        self.snapshots.append(json.loads(json.dumps(session.to_dict(), default=str)))
+
+    def last(self, state: NegotiationState) -> NegotiationSession:
+        data = [s for s in self.snapshots if s["state"] == state.value][-1]
+        return NegotiationSession.from_dict(data)
+
+
+class CountingFormulationSkill(FakeFormulationSkill):
+    def __init__(self):
+        self.calls = 0
+
+    async def execute(self, context: dict[str, Any]) -> dict[str, Any]:
+        self.calls += 1
+        return await super().execute(context)
+
+
+def _checkpointed_run(center_rounds=None, pipelined=False):
+    store = RecordingCheckpointStore()
+    engine, defaults, _ = _build(
+        EngineBuilder().with_checkpoint_store(store).pipeline_offers(pipelined),
+        center_skill=FakeCenterSkill(rounds=center_rounds),
+    )
+    _negotiate(engine, defaults)
+    return store
+
+
+def _resume(snapshot: NegotiationSession, center_skill=None):
+    formulation_skill = CountingFormulationSkill()
+    offer_skill = FakeOfferSkill()
+    center_skill = center_skill or FakeCenterSkill()
+    engine, defaults, _ = _build(
+        formulation_skill=formulation_skill, offer_skill=offer_skill, center_skill=center_skill,
+    )
+    session = _negotiate(engine, defaults, session=snapshot, resume=True)
+    return session, formulation_skill, offer_skill, center_skill
+
+
+def test_every_transition_is_checkpointed():
+    store = _checkpointed_run()
+    states = [s["state"] for s in store.snapshots]
+    assert states == [
+        "formulating", "formulated", "encoding", "offering",
+        "barrier_waiting", "synthesizing", "completed",
+    ]
+    barrier = store.last(NegotiationState.BARRIER_WAITING)
+    assert barrier.demand.formulated_text == "formulated: need a product team"
+    assert len(barrier.collected_offers) == 4
+
+
+def test_resume_after_barrier_skips_formulation_and_offers():
+    snapshot = _checkpointed_run().last(NegotiationState.BARRIER_WAITING)
+
+    session, formulation_skill, offer_skill, center_skill = _resume(snapshot)
+
+    assert session.state == NegotiationState.COMPLETED
+    assert session.plan_output == "final plan"
+    assert formulation_skill.calls == 0
+    assert offer_skill.calls == []
+    assert len(center_skill.contexts[0]["offers"]) == 4
+    assert "resume" in [e.step for e in session.trace.entries]
+
+
+def test_resumed_trace_keeps_its_timeline_and_observes_spans_once():
+    snapshot = _checkpointed_run().last(NegotiationState.BARRIER_WAITING)
+    data = snapshot.to_dict()
+    data["trace"]["started_at"] = (snapshot.trace.started_at - timedelta(seconds=30)).isoformat()
+    data["trace"]["observed"] = len(snapshot.trace.entries)
+    engine, defaults, _ = _build()
+
+    session = _negotiate(engine, defaults, session=NegotiationSession.from_dict(data), resume=True)
+
+    trace = session.trace
+    resumed = trace.entries[data["trace"]["observed"]:]
+    assert resumed[0].step == "resume"
+    assert all(e.start_ms >= 30_000 for e in resumed if e.start_ms is not None)
+    assert (trace.completed_at - trace.started_at).total_seconds() >= 30
+    assert trace.observed == len(trace.entries)
+    histograms = engine.phase_metrics()
+    assert "offer" not in histograms and "barrier" not in histograms
+    assert histograms["negotiation"]["count"] == 1
+
+
+def test_resume_mid_offering_only_requests_missing_offers():
+    snapshot = _checkpointed_run().last(NegotiationState.BARRIER_WAITING)
+    snapshot.state = NegotiationState.OFFERING
+    for participant in snapshot.participants[2:]:
+        participant.offer = None
+        participant.state = AgentState.ACTIVE
+    missing = sorted(p.agent_id for p in snapshot.participants[2:])
+
+    session, formulation_skill, offer_skill, _ = _resume(snapshot)
+
+    assert formulation_skill.calls == 0
+    assert sorted(offer_skill.calls) == missing
+    assert len(session.collected_offers) == 4
+
+
+def test_resume_mid_pipelined_resonance_resonates_again():
+    store = _checkpointed_run(pipelined=True)
+    offering = [NegotiationSession.from_dict(s) for s in store.snapshots if s["state"] == "offering"]
+    assert len(offering[0].participants) < 4
+    assert "resonance_complete" not in offering[0].metadata
+    assert offering[-1].metadata["resonance_complete"] is True
+
+    session, formulation_skill, offer_skill, _ = _resume(offering[0])
+
+    assert formulation_skill.calls == 0
+    assert sorted(offer_skill.calls) == AGENT_IDS
+    assert len(session.collected_offers) == 4
+
+
+def test_resume_mid_synthesis_keeps_finished_rounds():
+    store = _checkpointed_run(center_rounds=[[
+        {"name": "ask_agent", "arguments": {"agent_id": "agent-a", "question": "q"}},
+    ]])
+    after_round = [
+        s for s in store.snapshots if s["state"] == "synthesizing" and s["center_rounds"] == 1
+    ]
+    snapshot = NegotiationSession.from_dict(after_round[-1])
+    assert [h["agent_id"] for h in snapshot.event_history] == ["agent-a"]
+
+    session, _, offer_skill, center_skill = _resume(snapshot)
+
+    assert offer_skill.calls == []
+    assert len(center_skill.contexts) == 1
+    assert center_skill.contexts[0]["round_number"] == 2
+    assert [h["agent_id"] for h in center_skill.contexts[0]["history"]] == ["agent-a"]
+    assert session.center_rounds == 2
+
+
+def test_session_index_and_counters_follow_participant_mutations():
+    from towow.core.models import AgentParticipant, Offer
+
+    session = _session()
+    assert not hasattr(session, "__dict__")
+    for agent_id in AGENT_IDS[:3]:
+        session.add_participant(AgentParticipant(agent_id=agent_id, display_name=agent_id))
+
+    a, b, c = (session.get_participant(agent_id) for agent_id in AGENT_IDS[:3])
+    a.offer = Offer(agent_id="agent-a", content="offer")
+    a.state = AgentState.REPLIED
+    b.state = AgentState.EXITED
+    assert (session.replied_count, session.exited_count, session.offer_count) == (1, 1, 1)
+    assert not session.is_barrier_met
+
+    offers = session.collected_offers
+    assert offers is session.collected_offers and [o.agent_id for o in offers] == ["agent-a"]
+    assert session.active_participants == [c]
+
+    c.state = AgentState.REPLIED
+    assert session.is_barrier_met
+    assert session.active_participants == []
+    c.offer = Offer(agent_id="agent-c", content="late offer")
+    assert [o.agent_id for o in session.collected_offers] == ["agent-a", "agent-c"]
+
+    # Replacing the list directly (as resonance does) rebuilds the index lazily.
+    session.participants = [AgentParticipant(agent_id="agent-d", display_name="agent-d")]
+    a.state = AgentState.EXITED
+    assert session.get_participant("agent-a") is None
+    assert (session.replied_count, session.exited_count, session.offer_count) == (0, 0, 0)
+    assert session.collected_offers == []
+
+
+class CountingCenterSkill(FakeCenterSkill):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def execute(self, context: dict[str, Any]) -> dict[str, Any]:
+        self.calls += 1
+        return {"tool_calls": [{"name": "output_plan", "arguments": {"plan_text": f"plan #{self.calls}"}}]}
+
+
+def _cached_engine(adapter=None, **builder_kwargs):
+    from towow import ResultCache
+
+    cache = ResultCache(**builder_kwargs)
+    offer_skill = FakeOfferSkill()
+    center_skill = CountingCenterSkill()
+    engine, defaults, pusher = _build(
+        EngineBuilder().with_result_cache(cache).pipeline_offers(),
+        offer_skill=offer_skill, center_skill=center_skill, adapter=adapter or FakeAdapter(),
+    )
+    return engine, defaults, pusher, offer_skill, center_skill
+
+
+def _run_twice(engine, defaults, between=None, second_intent="need a product team"):
+    first = _negotiate(engine, defaults, session=_session("neg_1"))
+    if between:
+        between()
+    second = _negotiate(engine, defaults, session=_session("neg_2", raw_intent=second_intent))
+    return first, second
+
+
+def test_result_cache_replays_identical_demand_without_llm_calls():
+    engine, defaults, pusher, offer_skill, center_skill = _cached_engine()
+
+    first, second = _run_twice(engine, defaults)
+
+    assert len(offer_skill.calls) == 4
+    assert center_skill.calls == 1
+    assert second.plan_output == first.plan_output == "plan #1"
+    assert second.metadata["result_cache"]["source_negotiation_id"] == "neg_1"
+    assert sorted(o.agent_id for o in second.collected_offers) == sorted(AGENT_IDS)
+    assert second.state == NegotiationState.COMPLETED
+    replayed = [e for e in pusher.of_type(EventType.OFFER_RECEIVED) if e.negotiation_id == "neg_2"]
+    assert len(replayed) == 4
+    assert [e.negotiation_id for e in pusher.of_type(EventType.PLAN_READY)][-1] == "neg_2"
+    assert engine.result_cache.metrics()["hits"] == 1
+
+
+def test_result_cache_misses_on_different_demand_and_changed_profile():
+    adapter = FakeAdapter()
+    engine, defaults, _, offer_skill, center_skill = _cached_engine(adapter=adapter)
+
+    _run_twice(engine, defaults, second_intent="looking for a lawyer to review a lease")
+    assert center_skill.calls == 2
+
+    def bump_profile():
+        adapter.profiles["agent-a"] = {"agent_id": "agent-a", "version": 2}
+
+    engine, defaults, _, offer_skill, center_skill = _cached_engine(adapter=adapter)
+    adapter.profiles.clear()
+    _run_twice(engine, defaults, between=bump_profile)
+    assert center_skill.calls == 2
+    assert len(offer_skill.calls) == 8
+    assert engine.result_cache.metrics()["stale"] == 1
+
+
+def test_offer_cache_reuses_offers_for_near_duplicate_demands():
+    from towow import OfferCache
+
+    adapter = FakeAdapter()
+    offer_skill = FakeOfferSkill()
+    center_skill = CountingCenterSkill()
+    engine, defaults, pusher = _build(
+        EngineBuilder().with_offer_cache(OfferCache(similarity=0.95)).pipeline_offers(),
+        offer_skill=offer_skill, center_skill=center_skill, adapter=adapter,
+    )
+
+    def bump_profile():
+        adapter.profiles["agent-b"] = {"agent_id": "agent-b", "version": 2}
+
+    first, second = _run_twice(engine, defaults, between=bump_profile)
+
+    assert center_skill.calls == 2
+    # Only agent-b's profile changed, so only its offer is generated again.
+    assert len(offer_skill.calls) == 5
+    assert offer_skill.calls[4:] == ["agent-b"]
+    assert {o.agent_id: o.content for o in second.collected_offers} == {
+        o.agent_id: o.content for o in first.collected_offers
+    }
+
+    events = [e for e in pusher.of_type(EventType.OFFER_RECEIVED) if e.negotiation_id == "neg_2"]
+    hits = {e.data["agent_id"]: e.data["offer_cache"]["hit"] for e in events}
+    assert hits == {"agent-a": True, "agent-b": False, "agent-c": True, "agent-d": True}
+    assert events[-1].data["offer_cache"]["hits"] + events[-1].data["offer_cache"]["misses"] == 8
+    assert engine.offer_cache.metrics()["hits"] == 3
+
+
+def test_offer_cache_is_bounded_per_agent():
+    from towow import OfferCache
+
+    cache = OfferCache(similarity=0.99, max_per_agent=2)
+    for i in range(3):
+        vector = [0.0] * 3
+        vector[i] = 1.0
+        cache.store("agent-a", "v1", vector, {"content": f"offer {i}"})
+
+    assert cache.lookup("agent-a", "v1", [1.0, 0.0, 0.0]) is None
+    offer, similarity = cache.lookup("agent-a", "v1", [0.0, 0.0, 1.0])
+    assert offer["content"] == "offer 2" and similarity > 0.99
+    assert cache.lookup("agent-a", "v2", [0.0, 0.0, 1.0]) is None
+    assert cache.metrics()["entries"] == 0
+
+
+class UniformOfferSkill(FakeOfferSkill):
+    async def execute(self, context: dict[str, Any]) -> dict[str, Any]:
+        offer = await super().execute(context)
+        return {**offer, "content": "offer from the team", "capabilities": ["design"]}
+
+
+def _speculative_run(offer_skill, session=None, **overrides):
+    from towow import SpeculationPolicy
+
+    center_skill = FakeCenterSkill()
+    engine, defaults, _ = _build(
+        EngineBuilder().speculate_center(SpeculationPolicy(min_fraction=0.75)),
+        offer_skill=offer_skill, center_skill=center_skill, **overrides,
+    )
+    return _negotiate(engine, defaults, session=session), engine, center_skill
+
+
+def test_speculative_center_round_is_kept_when_late_offers_add_nothing():
+    session, engine, center_skill = _speculative_run(UniformOfferSkill(delays={"agent-d": 0.1}))
+
+    assert session.state == NegotiationState.COMPLETED
+    assert len(center_skill.contexts) == 1
+    assert len(center_skill.contexts[0]["offers"]) == 3
+    assert len(session.collected_offers) == 4
+    assert session.metadata["speculation"] == {
+        "used_offers": 3, "late_offers": 1, "kept": True, "rerun_reason": None,
+    }
+    rounds = [e for e in session.trace.entries if e.step == "center_round"]
+    assert rounds[0].metadata["speculative"] is True
+    assert engine.speculation_metrics()["kept"] == 1
+
+
+def test_speculative_center_round_reruns_when_late_offers_add_capabilities():
+    session, engine, center_skill = _speculative_run(FakeOfferSkill(delays={"agent-d": 0.1}))
+
+    assert session.state == NegotiationState.COMPLETED
+    assert [len(c["offers"]) for c in center_skill.contexts] == [3, 4]
+    assert session.metadata["speculation"]["rerun_reason"] == "capability_coverage"
+    assert engine.speculation_metrics() | {"policy": None} == {
+        "enabled": True, "policy": None, "speculative_rounds": 1, "kept": 0, "rerun": 1,
+    }
+
+
+class BlankStragglerOfferSkill(UniformOfferSkill):
+    async def execute(self, context: dict[str, Any]) -> dict[str, Any]:
+        offer = await super().execute(context)
+        return {**offer, "content": ""} if context["agent_id"] == "agent-d" else offer
+
+
+class FailingBatchEncoder(MockEmbeddingEncoder):
+    async def batch_encode(self, texts):
+        from towow import EncodingError
+
+        raise EncodingError("encoder unavailable")
+
+
+def test_speculation_check_failures_never_fail_the_run():
+    session, _, center_skill = _speculative_run(BlankStragglerOfferSkill(delays={"agent-d": 0.1}))
+    assert session.state == NegotiationState.COMPLETED
+    assert session.metadata["speculation"]["kept"] is True
+    assert len(center_skill.contexts) == 1
+
+    session, _, center_skill = _speculative_run(
+        UniformOfferSkill(delays={"agent-d": 0.1}), encoder=FailingBatchEncoder()
+    )
+    assert session.state == NegotiationState.COMPLETED
+    assert session.metadata["speculation"]["rerun_reason"] == "comparison_failed"
+    assert [len(c["offers"]) for c in center_skill.contexts] == [3, 4]
+
+
+def test_speculative_round_asks_the_same_question_as_round_one():
+    session = _session()
+    session.max_center_rounds = 1
+
+    session, _, center_skill = _speculative_run(UniformOfferSkill(delays={"agent-d": 0.1}), session=session)
+
+    assert session.metadata["speculation"]["kept"] is True
+    assert len(center_skill.contexts) == 1
+    assert center_skill.contexts[0]["tools_restricted"] is True
+    assert center_skill.contexts[0]["round_number"] == 1
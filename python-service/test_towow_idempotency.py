@@ -0,0 +1,39 @@
+import time
+
+from towow.infra.idempotency import IdempotencyIndex
+
+
+def test_equivalent_requests_share_a_key():
+    key = IdempotencyIndex.key_for("u1", "  Need a  UI designer\n", 5)
+    assert key == IdempotencyIndex.key_for("u1", "need a ui designer", 5)
+    assert key != IdempotencyIndex.key_for("u2", "need a ui designer", 5)
+    assert key != IdempotencyIndex.key_for("u1", "need a ui designer", 3)
+
+    explicit = IdempotencyIndex.key_for("u1", "need a ui designer", 5, "retry-123")
+    assert explicit == IdempotencyIndex.key_for("u1", "something else", 8, "retry-123")
+    assert explicit != key
+
+
+def test_index_attaches_within_window_then_expires():
+    index = IdempotencyIndex(window_s=0.05)
+    key = IdempotencyIndex.key_for("u1", "need a designer", 5)
+    assert index.lookup(key) is None
+
+    index.remember(key, "neg_1")
+    assert index.lookup(key) == "neg_1"
+
+    time.sleep(0.06)
+    assert index.lookup(key) is None
+    assert index.metrics() == {"window_s": 0.05, "tracked": 0, "hits": 1, "misses": 2}
+
+
+def test_forget_and_disabled_window():
+    index = IdempotencyIndex(window_s=60)
+    index.remember("k", "neg_1")
+    index.forget("k")
+    assert index.lookup("k") is None
+
+    disabled = IdempotencyIndex(window_s=0)
+    assert not disabled.enabled
+    disabled.remember("k", "neg_1")
+    assert disabled.lookup("k") is None
@@ -0,0 +1,131 @@
+import asyncio
+import contextlib
+import os
+
+import numpy as np
+import pytest
+
+from towow.core.errors import ConfigError
+from towow.hdc.pgvector import (
+    EMBEDDING_SPACE_SCHEMA,
+    EMBEDDING_SPACE_TABLE,
+    PgVectorResonanceDetector,
+    decode_vector_binary,
+    encode_vector_binary,
+)
+
+PG_DSN = os.getenv("TOWOW_TEST_PG_DSN")
+
+
+def test_vector_binary_round_trip():
+    vec = np.array([0.25, -1.5, 3.0], dtype=np.float32)
+
+    data = encode_vector_binary(vec)
+
+    assert data[:4] == b"\x00\x03\x00\x00"
+    assert len(data) == 4 + 3 * 4
+    np.testing.assert_array_equal(decode_vector_binary(data), vec)
+
+
+def test_rejects_unsafe_identifiers():
+    with pytest.raises(ConfigError):
+        PgVectorResonanceDetector("postgresql://localhost/x", table="agents; DROP TABLE agents")
+
+
+@pytest.mark.skipif(not PG_DSN, reason="TOWOW_TEST_PG_DSN not set")
+def test_detect_against_local_postgres():
+    asyncpg = pytest.importorskip("asyncpg")
+    table = "towow_test_agents"
+
+    async def run():
+        conn = await asyncpg.connect(PG_DSN)
+        try:
+            await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+            await conn.execute(f"DROP TABLE IF EXISTS {table}")
+            await conn.execute(
+                f"CREATE TABLE {table} (id TEXT PRIMARY KEY, is_active BOOLEAN, profile_vector vector(3))"
+            )
+            await conn.execute(
+                f"""INSERT INTO {table} VALUES
+                    ('a', true, '[1,0,0]'), ('b', true, '[0.8,0.6,0]'),
+                    ('c', false, '[1,0,0]'), ('d', true, '[0,0,1]'), ('e', true, NULL)"""
+            )
+        finally:
+            await conn.close()
+
+        detector = PgVectorResonanceDetector(PG_DSN, table=table, max_pool_size=2)
+        try:
+            demand = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+            top = await detector.detect(demand, {}, 3)
+            filtered = await detector.detect(demand, {"b": demand, "d": demand}, 3)
+            concurrent = await asyncio.gather(*(detector.detect(demand, {}, 1) for _ in range(5)))
+            streamed = [item async for item in detector.detect_stream(demand, {}, 3)]
+            async with contextlib.aclosing(detector.detect_stream(demand, {}, 3)) as stream:
+                async for _ in stream:
+                    break
+            idle_after_early_stop = detector._pool.get_idle_size() == detector._pool.get_size()
+        finally:
+            await detector.close()
+            conn = await asyncpg.connect(PG_DSN)
+            await conn.execute(f"DROP TABLE IF EXISTS {table}")
+            await conn.close()
+        return top, filtered, concurrent, streamed, idle_after_early_stop
+
+    top, filtered, concurrent, streamed, idle_after_early_stop = asyncio.run(run())
+    assert [agent_id for agent_id, _ in top] == ["a", "b", "d"]
+    assert top[0][1] == pytest.approx(1.0)
+    assert [agent_id for agent_id, _ in filtered] == ["b", "d"]
+    assert all(result[0][0] == "a" for result in concurrent)
+    assert [agent_id for agent_id, _ in streamed] == ["a", "b", "d"]
+    assert idle_after_early_stop
+
+
+@pytest.mark.skipif(not PG_DSN, reason="TOWOW_TEST_PG_DSN not set")
+def test_verify_embedding_space_rejects_mismatched_encoder():
+    asyncpg = pytest.importorskip("asyncpg")
+    table = "towow_test_space_agents"
+
+    async def run():
+        conn = await asyncpg.connect(PG_DSN)
+        try:
+            await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+            await conn.execute(f"DROP TABLE IF EXISTS {table}")
+            await conn.execute(f"CREATE TABLE {table} (id TEXT PRIMARY KEY, profile_vector vector(4))")
+            await conn.execute(EMBEDDING_SPACE_SCHEMA)
+            await conn.execute(f"DELETE FROM {EMBEDDING_SPACE_TABLE} WHERE table_name = $1", table)
+        finally:
+            await conn.close()
+
+        async def record(dimension):
+            conn = await asyncpg.connect(PG_DSN)
+            try:
+                await conn.execute(
+                    f"INSERT INTO {EMBEDDING_SPACE_TABLE} (table_name, model, dimension, projection) "
+                    "VALUES ($1, 'text2vec', $2, 'abc') ON CONFLICT (table_name) DO UPDATE SET dimension = $2",
+                    table, dimension,
+                )
+            finally:
+                await conn.close()
+
+        detector = PgVectorResonanceDetector(PG_DSN, table=table, active_column=None, max_pool_size=1)
+        try:
+            with pytest.raises(ConfigError, match="re-run agent_sync"):
+                await detector.verify_embedding_space("text2vec", 4, "abc")
+            await record(4)
+            space = await detector.verify_embedding_space("text2vec", 4, "abc")
+            for args in [("MiniLM", 4, "abc"), ("text2vec", 4, None), ("text2vec", 8, "abc")]:
+                with pytest.raises(ConfigError):
+                    await detector.verify_embedding_space(*args)
+            await record(8)
+            with pytest.raises(ConfigError, match="vector\\(4\\)"):
+                await detector.verify_embedding_space("text2vec", None, "abc")
+        finally:
+            await detector.close()
+            conn = await asyncpg.connect(PG_DSN)
+            await conn.execute(f"DELETE FROM {EMBEDDING_SPACE_TABLE} WHERE table_name = $1", table)
+            await conn.execute(f"DROP TABLE IF EXISTS {table}")
+            await conn.close()
+        return space
+
+    space = asyncio.run(run())
+    assert space == {"model": "text2vec", "dimension": 4, "projection": "abc"}
@@ -0,0 +1,110 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from towow.core.errors import ConfigError, EncodingError
+from towow.hdc.encoder_mock import MockEmbeddingEncoder
+from towow.hdc.projection import (
+    PCAProjector,
+    ProjectedEncoder,
+    RandomProjector,
+    create_projector,
+    load_projector,
+    neighbour_recall,
+)
+
+
+def _clustered_vectors(n: int = 300, dim: int = 96, rank: int = 12, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((rank, dim))
+    vecs = rng.standard_normal((n, rank)) @ basis + 0.01 * rng.standard_normal((n, dim))
+    return (vecs / np.linalg.norm(vecs, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_pca_reports_variance_and_recall():
+    vectors = _clustered_vectors()
+    projector = PCAProjector(target_dim=24)
+
+    report = projector.fit(vectors)
+
+    assert report.source_dim == 96 and report.target_dim == 24
+    assert report.compression_ratio == 4
+    assert report.explained_variance > 0.99
+    assert report.recall_at_k > 0.9
+    projected = projector.transform_many(vectors)
+    assert projected.shape == (300, 24)
+    np.testing.assert_allclose(np.linalg.norm(projected, axis=1), 1.0, rtol=1e-5)
+
+
+def test_random_projection_keeps_most_neighbours():
+    vectors = _clustered_vectors()
+    projector = RandomProjector(target_dim=48, seed=3)
+
+    report = projector.fit(vectors)
+
+    assert report.explained_variance is None
+    assert report.recall_at_k > 0.6
+    assert neighbour_recall(vectors, vectors) == 1.0
+
+
+def test_projector_round_trips_through_disk(tmp_path):
+    vectors = _clustered_vectors()
+    projector = PCAProjector(target_dim=16)
+    projector.fit(vectors)
+    path = str(tmp_path / "projection.npz")
+
+    projector.save(path)
+    loaded = load_projector(path)
+
+    assert isinstance(loaded, PCAProjector)
+    assert loaded.fingerprint == projector.fingerprint
+    assert loaded.report.recall_at_k == projector.report.recall_at_k
+    np.testing.assert_allclose(loaded.transform_many(vectors), projector.transform_many(vectors), atol=1e-6)
+
+
+def test_create_projector_builds_by_method():
+    vectors = _clustered_vectors()
+    a, b = create_projector("random", 16, seed=5), create_projector("random", 16, seed=5)
+    a.fit(vectors)
+    b.fit(vectors)
+    assert isinstance(a, RandomProjector)
+    assert a.fingerprint == b.fingerprint
+    assert create_projector("pca", 16).method == "pca"
+    with pytest.raises(ConfigError):
+        create_projector("umap", 16)
+
+
+def test_projection_rejects_bad_shapes():
+    with pytest.raises(ConfigError):
+        PCAProjector(target_dim=64).fit(_clustered_vectors(n=20))
+    projector = RandomProjector(target_dim=8)
+    projector.fit(_clustered_vectors(n=20))
+    with pytest.raises(EncodingError):
+        projector.transform(np.ones(10, dtype=np.float32))
+
+
+def test_projected_encoder_normalizes_dimension():
+    base = MockEmbeddingEncoder()
+
+    async def run():
+        sample = await base.batch_encode([f"agent profile {i}" for i in range(40)])
+        projector = RandomProjector(target_dim=384)
+        projector.fit(sample)
+        encoder = ProjectedEncoder(base, projector)
+        single = await encoder.encode("需要一个设计师")
+        batch = await encoder.batch_encode(["需要一个设计师", "data scientist"])
+        return encoder, single, batch
+
+    encoder, single, batch = asyncio.run(run())
+    assert encoder.dimension == 384
+    assert single.shape == (384,)
+    np.testing.assert_allclose(single, batch[0], atol=1e-6)
+
+
+def test_projected_encoder_warmup_rejects_a_projection_for_another_model():
+    projector = RandomProjector(target_dim=8)
+    projector.fit(_clustered_vectors(n=20))
+
+    with pytest.raises(ConfigError, match="96-dim"):
+        asyncio.run(ProjectedEncoder(MockEmbeddingEncoder(), projector).warmup())
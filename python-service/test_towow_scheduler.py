@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+from towow import EngineBuilder, LLMScheduler, Priority, TokenBucket
+from towow.core.scheduler import PROVIDER_AGENT, PROVIDER_PLATFORM
+
+from test_towow_engine import _agent_vectors, _build, _session
+
+
+def test_scheduler_caps_concurrency():
+    scheduler = LLMScheduler(max_concurrency=2)
+    active = 0
+    peak = 0
+
+    async def call():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+
+    async def run():
+        await asyncio.gather(*(scheduler.run(call) for _ in range(6)))
+
+    asyncio.run(run())
+    assert peak == 2
+    assert scheduler.running == 0
+    assert scheduler.metrics()["by_priority"]["offer"]["admitted"] == 6
+
+
+def test_scheduler_admits_by_priority_then_interactivity():
+    scheduler = LLMScheduler(max_concurrency=1)
+    order = []
+
+    def call(label):
+        async def fn():
+            order.append(label)
+            await asyncio.sleep(0.01)
+        return fn
+
+    async def run():
+        blocker = asyncio.create_task(scheduler.run(call("blocker")))
+        await asyncio.sleep(0)
+        waiting = [
+            scheduler.run(call("batch-center"), Priority.CENTER, interactive=False),
+            scheduler.run(call("offer"), Priority.OFFER),
+            scheduler.run(call("center"), Priority.CENTER),
+            scheduler.run(call("formulation"), Priority.FORMULATION),
+        ]
+        await asyncio.gather(blocker, *waiting)
+
+    asyncio.run(run())
+    assert order == ["blocker", "center", "formulation", "offer", "batch-center"]
+
+
+def test_scheduler_applies_provider_rate_limit():
+    scheduler = LLMScheduler(
+        max_concurrency=8,
+        rate_limits={PROVIDER_AGENT: (20.0, 1)},
+    )
+
+    async def noop():
+        return None
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*(scheduler.run(noop, provider=PROVIDER_AGENT) for _ in range(3)))
+        limited = time.monotonic() - start
+        start = time.monotonic()
+        await asyncio.gather(*(scheduler.run(noop, provider=PROVIDER_PLATFORM) for _ in range(3)))
+        return limited, time.monotonic() - start
+
+    limited, unlimited = asyncio.run(run())
+    assert limited >= 0.09
+    assert unlimited < 0.05
+
+
+def test_token_bucket_reports_wait():
+    bucket = TokenBucket(rate_per_s=10.0, burst=1)
+    assert bucket.try_acquire() == 0.0
+    assert 0.0 < bucket.try_acquire() <= 0.1
+
+
+def test_cancelled_waiter_leaves_queue():
+    scheduler = LLMScheduler(max_concurrency=1)
+
+    async def run():
+        hold = asyncio.Event()
+        blocker = asyncio.create_task(scheduler.run(hold.wait))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(scheduler.run(asyncio.sleep, Priority.CENTER))
+        await asyncio.sleep(0)
+        assert scheduler.queued == 1
+        waiter.cancel()
+        await asyncio.sleep(0)
+        hold.set()
+        await blocker
+
+    asyncio.run(run())
+    assert scheduler.queued == 0
+    assert scheduler.running == 0
+
+
+def test_engine_routes_skill_calls_through_scheduler():
+    scheduler = LLMScheduler(max_concurrency=2)
+    engine, defaults, _ = _build(EngineBuilder().with_llm_scheduler(scheduler))
+
+    async def run():
+        vectors = await _agent_vectors()
+        return await engine.start_negotiation(
+            session=_session(), **{**defaults, "agent_vectors": vectors, "k_star": 4}
+        )
+
+    asyncio.run(run())
+    admitted = {k: v["admitted"] for k, v in scheduler.metrics()["by_priority"].items()}
+    assert admitted == {"formulation": 1, "offer": 4, "center": 1}
@@ -0,0 +1,189 @@
+import asyncio
+import threading
+
+from towow.core.models import (
+    AgentParticipant,
+    DemandSnapshot,
+    NegotiationSession,
+    NegotiationState,
+    Offer,
+    TraceChain,
+)
+from towow.infra.session_store import SessionStore
+
+
+def _session(negotiation_id: str, **kwargs) -> NegotiationSession:
+    session = NegotiationSession(
+        negotiation_id=negotiation_id,
+        demand=DemandSnapshot(raw_intent="need a designer", formulated_text="UI designer"),
+        trace=TraceChain(negotiation_id=negotiation_id),
+        **kwargs,
+    )
+    with session.trace.span("negotiation"):
+        session.trace.add_entry("formulation")
+    session.participants.append(AgentParticipant(
+        agent_id="a1",
+        display_name="Alice",
+        resonance_score=0.9,
+        offer=Offer(agent_id="a1", content="I can help", capabilities=["figma"]),
+    ))
+    session.state = NegotiationState.COMPLETED
+    session.plan_output = "plan"
+    return session
+
+
+def test_completed_sessions_offload_and_rehydrate(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    store = SessionStore(path, max_completed=2, completed_ttl_s=3600)
+    originals = {}
+    for i in range(5):
+        originals[f"s{i}"] = _session(f"s{i}")
+        store.put(originals[f"s{i}"])
+        store.complete(f"s{i}")
+
+    metrics = store.metrics()
+    assert metrics["active"] == 0
+    assert metrics["completed_in_memory"] == 2
+    assert metrics["stored"] == 3
+
+    restored = store.get("s0")
+    assert restored is not None and restored is not originals["s0"]
+    assert restored.to_dict() == originals["s0"].to_dict()
+    assert restored.participants[0].offer.capabilities == ["figma"]
+    assert [e.step for e in restored.trace.entries] == ["negotiation", "formulation"]
+    assert store.metrics()["rehydrated"] == 1
+    # s0 pushed s3 out of the LRU; s0 itself is already on disk and is not rewritten.
+    assert store.metrics()["offloaded"] == 4
+    store.flush()
+    assert store.metrics()["offloaded"] == 5
+
+    store.close()
+    reopened = SessionStore(path)
+    assert {f"s{i}" for i in range(5) if f"s{i}" in reopened} == {f"s{i}" for i in range(5)}
+    reopened.close()
+
+
+def test_ttl_evicts_idle_sessions_and_cascades_to_subs():
+    store = SessionStore(completed_ttl_s=0.0)
+    parent = _session("parent", sub_session_ids=["child"])
+    store.put(parent)
+    store.put(_session("child", parent_negotiation_id="parent", depth=1))
+    store.put(_session("running"))
+
+    store.complete("parent")
+
+    metrics = store.metrics()
+    assert metrics["active"] == 1
+    assert metrics["completed_in_memory"] == 0
+    assert metrics["stored"] == 2
+    assert store.get("child").parent_negotiation_id == "parent"
+    assert store.get("running") is store._active["running"]
+    assert store.get("missing") is None
+
+    store.discard("parent")
+    assert store.get("parent") is None
+
+
+def test_checkpoints_survive_restart_as_unfinished(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    store = SessionStore(path)
+    running = _session("running")
+    running.state = NegotiationState.OFFERING
+    done = _session("done")
+
+    async def checkpoint():
+        await store.checkpoint(running)
+        await store.checkpoint(done)
+
+    asyncio.run(checkpoint())
+    assert store.metrics()["checkpoints"] == 2
+    store._db.close()  # simulate a crash: nothing else gets flushed
+
+    restarted = SessionStore(path)
+    unfinished = restarted.unfinished()
+    assert [s.negotiation_id for s in unfinished] == ["running"]
+    assert unfinished[0].state == NegotiationState.OFFERING
+    assert unfinished[0].participants[0].offer.content == "I can help"
+    assert restarted.get("done").plan_output == "plan"
+    restarted.close()
+
+
+def test_cancelled_and_failed_sessions_are_not_resumed(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    store = SessionStore(path, completed_ttl_s=0.0)
+    cancelled = _session("cancelled")
+    cancelled.state = NegotiationState.CREATED
+    cancelled.metadata["cancelled"] = True
+    failed = _session("failed")
+    failed.state = NegotiationState.ENCODING
+    failed.metadata["error"] = "encoder down"
+    running = _session("running")
+    running.state = NegotiationState.OFFERING
+
+    async def checkpoint():
+        await store.checkpoint(running)
+
+    asyncio.run(checkpoint())
+    for session in (cancelled, failed):
+        store.put(session)
+        store.complete(session.negotiation_id)
+    store.close()
+
+    restarted = SessionStore(path)
+    assert [s.negotiation_id for s in restarted.unfinished()] == ["running"]
+    assert restarted.get("failed").metadata["error"] == "encoder down"
+    restarted.close()
+
+
+def test_writes_run_off_the_event_loop(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"), completed_ttl_s=0.0)
+    threads = []
+    write_rows = store._write_rows
+
+    def recording_write(rows):
+        threads.append(threading.get_ident())
+        write_rows(rows)
+
+    store._write_rows = recording_write
+
+    async def run():
+        loop_thread = threading.get_ident()
+        session = _session("s0")
+        store.put(session)
+        store.complete("s0")
+        # Evicted, but its write may still be in flight: it is served from memory.
+        assert store.get("s0") is session
+        await store.drain()
+        assert store.metrics()["stored"] == 1
+
+        store.discard("s0")
+        await store.drain()
+        assert store.metrics()["stored"] == 0
+        return loop_thread
+
+    loop_thread = asyncio.run(run())
+    assert threads and loop_thread not in threads
+    store.close()
+
+
+def test_reads_do_not_wait_behind_the_writer(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"), completed_ttl_s=0.0)
+    store.put(_session("s0"))
+    store.complete("s0")
+    store.flush()
+    results = {}
+
+    def read():
+        results["session"] = store.get("s0")
+        results["stored"] = store.metrics()["stored"]
+
+    # Hold the writer's lock as a long commit would.
+    with store._lock:
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join(timeout=2.0)
+        assert not reader.is_alive()
+
+    assert results["session"].plan_output == "plan"
+    assert results["stored"] == 1
+    store.close()
@@ -0,0 +1,70 @@
+import json
+
+from towow.core.models import TraceChain
+from towow.infra.trace_export import load_traces, main, to_chrome_trace, to_folded_stacks
+
+
+def _trace(negotiation_id="neg_a", started_at="2026-01-01T00:00:00+00:00"):
+    return {
+        "negotiation_id": negotiation_id,
+        "started_at": started_at,
+        "completed_at": None,
+        "entries": [
+            {"step": "negotiation", "span_id": "root", "parent_id": None, "start_ms": 0.0, "duration_ms": 100.0, "metadata": {}},
+            {"step": "offer", "span_id": "o1", "parent_id": "root", "start_ms": 10.0, "duration_ms": 50.0, "metadata": {"agent_id": "a"}},
+            {"step": "offer", "span_id": "o2", "parent_id": "root", "start_ms": 20.0, "duration_ms": 50.0, "metadata": {"agent_id": "b"}},
+            {"step": "center_round", "span_id": "c1", "parent_id": "root", "start_ms": 70.0, "duration_ms": 30.0, "metadata": {}},
+            {"step": "tool_call", "span_id": "t1", "parent_id": "c1", "start_ms": 80.0, "duration_ms": 10.0, "metadata": {}},
+            {"step": "unfinished", "span_id": "u1", "parent_id": "root", "start_ms": 90.0, "duration_ms": None, "metadata": {}},
+        ],
+    }
+
+
+def test_chrome_trace_puts_overlapping_siblings_on_separate_lanes():
+    events = to_chrome_trace([_trace()])["traceEvents"]
+    slices = {e["args"]["span_id"]: e for e in events if e["ph"] == "X"}
+
+    assert set(slices) == {"root", "o1", "o2", "c1", "t1"}
+    assert slices["o1"]["tid"] == slices["root"]["tid"]
+    assert slices["o2"]["tid"] != slices["o1"]["tid"]
+    assert slices["t1"]["tid"] == slices["c1"]["tid"]
+    assert slices["o1"]["ts"] == 10_000 and slices["o1"]["dur"] == 50_000
+    assert slices["o1"]["args"]["agent_id"] == "a"
+
+
+def test_chrome_trace_aligns_merged_sessions_on_wall_clock():
+    later = _trace("neg_b", started_at="2026-01-01T00:00:01+00:00")
+    events = to_chrome_trace([_trace(), later])["traceEvents"]
+    roots = {e["pid"]: e["ts"] for e in events if e["ph"] == "X" and e["name"] == "negotiation"}
+    assert roots == {1: 0.0, 2: 1_000_000.0}
+    names = {e["pid"]: e["args"]["name"] for e in events if e["name"] == "process_name"}
+    assert names == {1: "neg_a", 2: "neg_b"}
+
+
+def test_folded_stacks_report_self_time():
+    stacks = dict(line.rsplit(" ", 1) for line in to_folded_stacks([_trace()]))
+    assert stacks["negotiation;center_round;tool_call"] == "10000"
+    assert stacks["negotiation;center_round"] == "20000"
+    assert stacks["negotiation;offer"] == "100000"
+    assert "negotiation" not in stacks
+
+
+def test_cli_reads_sessions_and_jsonl(tmp_path, capsys):
+    chain = TraceChain(negotiation_id="neg_live")
+    with chain.span("negotiation"):
+        with chain.span("offer", agent_id="a"):
+            pass
+    session_file = tmp_path / "session.json"
+    session_file.write_text(json.dumps({"negotiation_id": "neg_live", "trace": chain.to_dict()}))
+    jsonl_file = tmp_path / "more.jsonl"
+    jsonl_file.write_text("\n".join(json.dumps(_trace(f"neg_{i}")) for i in range(2)))
+
+    assert len(load_traces([str(session_file), str(jsonl_file)])) == 3
+
+    out = tmp_path / "timeline.json"
+    assert main([str(session_file), str(jsonl_file), "-o", str(out)]) == 0
+    timeline = json.loads(out.read_text())
+    assert {e["pid"] for e in timeline["traceEvents"]} == {1, 2, 3}
+
+    assert main([str(jsonl_file), "--format", "folded"]) == 0
+    assert "negotiation;offer" in capsys.readouterr().out
@@ -35,10 +35,24 @@ from towow.core.protocols import (
     ProfileDataSource,
     ResonanceDetector,
     Skill,
+    StreamingResonanceDetector,
+    BulkProfileDataSource,
+    CheckpointStore,
     Vector,
 )
 
 from towow.core.engine import NegotiationEngine
+from towow.core.deadline import Deadline
+from towow.core.cache import OfferCache, ResultCache
+
+from towow.core.policies import (
+    BarrierPolicy,
+    ConfirmationMode,
+    HedgePolicy,
+    SpeculationPolicy,
+    StragglerMode,
+)
+from towow.core.scheduler import LLMScheduler, Priority, TokenBucket
 
 from towow.core.errors import (
     AdapterError,
@@ -69,6 +83,17 @@ from towow.skills.gap_recursion import GapRecursionSkill
 __all__ = [
     "NegotiationEngine",
     "EngineBuilder",
+    "Deadline",
+    "OfferCache",
+    "ResultCache",
+    "BarrierPolicy",
+    "StragglerMode",
+    "HedgePolicy",
+    "SpeculationPolicy",
+    "ConfirmationMode",
+    "LLMScheduler",
+    "Priority",
+    "TokenBucket",
     "NegotiationSession",
     "NegotiationState",
     "DemandSnapshot",
@@ -89,11 +114,14 @@ __all__ = [
     "sub_negotiation_started",
     "Encoder",
     "ResonanceDetector",
+    "StreamingResonanceDetector",
+    "BulkProfileDataSource",
     "ProfileDataSource",
     "PlatformLLMClient",
     "Skill",
     "EventPusher",
     "CenterToolHandler",
+    "CheckpointStore",
     "Vector",
     "BaseSkill",
     "BaseAdapter",
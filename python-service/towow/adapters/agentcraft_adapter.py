@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Optional, Union
 
 from towow.core.errors import AdapterError
 from .base import BaseAdapter
@@ -9,13 +9,23 @@ from agents_db import REAL_AGENTS, get_agent_profile_text
 
 logger = logging.getLogger(__name__)
 
+AgentProfiles = Union[dict[str, dict[str, Any]], list[dict[str, Any]]]
+
+def _index_profiles(profiles: AgentProfiles) -> dict[str, dict[str, Any]]:
+    if isinstance(profiles, dict):
+        return profiles
+    return {p["id"]: p for p in profiles if p.get("id")}
+
 class AgentcraftAdapter(BaseAdapter):
-    def __init__(self, agent_profiles: dict[str, dict[str, Any]] | None = None):
-        self._profiles = agent_profiles if agent_profiles is not None else REAL_AGENTS
+    def __init__(self, agent_profiles: AgentProfiles | None = None):
+        self._profiles = _index_profiles(agent_profiles if agent_profiles is not None else REAL_AGENTS)
 
     async def get_profile(self, agent_id: str) -> dict[str, Any]:
         return self._profiles.get(agent_id, {"agent_id": agent_id})
 
+    async def get_profiles(self, agent_ids: list[str]) -> dict[str, dict[str, Any]]:
+        return {a: self._profiles.get(a, {"agent_id": a}) for a in agent_ids}
+
     async def chat(
         self,
         agent_id: str,
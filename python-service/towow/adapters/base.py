@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from abc import ABC, abstractmethod
 from typing import Any, AsyncGenerator, Optional
@@ -11,6 +12,10 @@ class BaseAdapter(ABC):
     async def get_profile(self, agent_id: str) -> dict[str, Any]:
         ...
 
+    async def get_profiles(self, agent_ids: list[str]) -> dict[str, dict[str, Any]]:
+        profiles = await asyncio.gather(*(self.get_profile(a) for a in agent_ids))
+        return dict(zip(agent_ids, profiles))
+
     @abstractmethod
     async def chat(
         self,
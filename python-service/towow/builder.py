@@ -3,10 +3,14 @@ from __future__ import annotations
 import logging
 from typing import Any, Callable, Optional
 
+from towow.core.cache import OfferCache, ResultCache
 from towow.core.engine import NegotiationEngine
 from towow.core.models import NegotiationSession
+from towow.core.policies import BarrierPolicy, ConfirmationMode, HedgePolicy, SpeculationPolicy
+from towow.core.scheduler import LLMScheduler
 from towow.core.protocols import (
     CenterToolHandler,
+    CheckpointStore,
     Encoder,
     EventPusher,
     PlatformLLMClient,
@@ -26,7 +30,21 @@ class EngineBuilder:
         self._event_pusher: EventPusher | None = None
         self._offer_timeout_s: float = 30.0
         self._confirmation_timeout_s: float = 300.0
+        self._confirmation_mode: ConfirmationMode = ConfirmationMode.AUTO
+        self._barrier_policy: BarrierPolicy | None = None
+        self._pipeline_offers: bool = False
+        self._tool_concurrency: int = 4
+        self._tool_timeout_s: float = 60.0
+        self._tool_timeouts: dict[str, float] = {}
         self._tool_handlers: list[Any] = []
+        self._llm_scheduler: LLMScheduler | None = None
+        self._sub_negotiation_budget_s: float = 180.0
+        self._hedge_policy: HedgePolicy | None = None
+        self._negotiation_deadline_s: float | None = None
+        self._checkpoint_store: CheckpointStore | None = None
+        self._result_cache: ResultCache | None = None
+        self._offer_cache: OfferCache | None = None
+        self._speculation_policy: SpeculationPolicy | None = None
 
         self._adapter: ProfileDataSource | None = None
         self._llm_client: PlatformLLMClient | None = None
@@ -60,6 +78,61 @@ class EngineBuilder:
         self._confirmation_timeout_s = seconds
         return self
 
+    def confirmation_mode(self, mode: ConfirmationMode) -> EngineBuilder:
+        self._confirmation_mode = mode
+        return self
+
+    def negotiation_deadline(self, seconds: float | None) -> EngineBuilder:
+        self._negotiation_deadline_s = seconds
+        return self
+
+    def barrier_policy(self, policy: BarrierPolicy) -> EngineBuilder:
+        self._barrier_policy = policy
+        return self
+
+    def pipeline_offers(self, enabled: bool = True) -> EngineBuilder:
+        self._pipeline_offers = enabled
+        return self
+
+    def hedge_offers(self, policy: HedgePolicy | None = None) -> EngineBuilder:
+        self._hedge_policy = policy or HedgePolicy()
+        return self
+
+    def speculate_center(self, policy: SpeculationPolicy | None = None) -> EngineBuilder:
+        self._speculation_policy = policy or SpeculationPolicy()
+        return self
+
+    def tool_concurrency(self, limit: int) -> EngineBuilder:
+        self._tool_concurrency = limit
+        return self
+
+    def tool_timeout(self, seconds: float, tool_name: str | None = None) -> EngineBuilder:
+        if tool_name is None:
+            self._tool_timeout_s = seconds
+        else:
+            self._tool_timeouts[tool_name] = seconds
+        return self
+
+    def with_llm_scheduler(self, scheduler: LLMScheduler) -> EngineBuilder:
+        self._llm_scheduler = scheduler
+        return self
+
+    def sub_negotiation_budget(self, seconds: float) -> EngineBuilder:
+        self._sub_negotiation_budget_s = seconds
+        return self
+
+    def with_checkpoint_store(self, store: CheckpointStore) -> EngineBuilder:
+        self._checkpoint_store = store
+        return self
+
+    def with_result_cache(self, cache: ResultCache) -> EngineBuilder:
+        self._result_cache = cache
+        return self
+
+    def with_offer_cache(self, cache: OfferCache) -> EngineBuilder:
+        self._offer_cache = cache
+        return self
+
     def with_tool_handler(self, handler: CenterToolHandler) -> EngineBuilder:
         self._tool_handlers.append(handler)
         return self
@@ -136,6 +209,20 @@ class EngineBuilder:
             event_pusher=pusher,
             offer_timeout_s=self._offer_timeout_s,
             confirmation_timeout_s=self._confirmation_timeout_s,
+            confirmation_mode=self._confirmation_mode,
+            barrier_policy=self._barrier_policy,
+            pipeline_offers=self._pipeline_offers,
+            tool_concurrency=self._tool_concurrency,
+            tool_timeout_s=self._tool_timeout_s,
+            tool_timeouts=self._tool_timeouts,
+            llm_scheduler=self._llm_scheduler,
+            sub_negotiation_budget_s=self._sub_negotiation_budget_s,
+            hedge_policy=self._hedge_policy,
+            negotiation_deadline_s=self._negotiation_deadline_s,
+            checkpoint_store=self._checkpoint_store,
+            result_cache=self._result_cache,
+            offer_cache=self._offer_cache,
+            speculation_policy=self._speculation_policy,
         )
 
         for handler in self._tool_handlers:
@@ -3,3 +3,7 @@ from towow.core.models import *
 from towow.core.events import *
 from towow.core.protocols import *
 from towow.core.errors import *
+from towow.core.policies import *
+from towow.core.scheduler import LLMScheduler, Priority, TokenBucket
+from towow.core.deadline import Deadline
+from towow.core.cache import OfferCache, ResultCache, profile_version
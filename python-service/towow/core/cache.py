@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import numpy as np
+
+from .events import EventType
+from .protocols import Vector
+
+def profile_version(profile: dict[str, Any]) -> str:
+    """An explicit ``version``/``updated_at`` if the profile has one, else a content hash."""
+    for key in ("version", "updated_at"):
+        if profile.get(key) is not None:
+            return str(profile[key])
+    payload = json.dumps(profile, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+def _unit(vector: Vector) -> Optional[np.ndarray]:
+    arr = np.asarray(vector, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(arr))
+    if norm < 1e-10:
+        return None
+    return arr / norm
+
+@dataclass(slots=True, eq=False)
+class CachedResult:
+    negotiation_id: str
+    demand_vector: np.ndarray
+    profile_versions: dict[str, str]
+    offers: dict[str, dict[str, Any]]
+    plan_output: str
+    center_rounds: int
+    event_history: list[dict[str, Any]]
+    events: list[tuple[EventType, dict[str, Any]]]
+    stored_at: float = field(default_factory=time.monotonic)
+
+class ResultCache:
+    """Finished negotiations keyed by demand embedding, participant set and profile versions.
+
+    A lookup hits when a fresh entry's demand vector is within ``similarity``
+    (cosine) of the new one and it was produced by exactly the same
+    participants at the same profile versions. Entries whose participants
+    match but whose profiles have since changed are dropped on sight.
+    """
+
+    def __init__(self, ttl_s: float = 1800.0, similarity: float = 0.97, max_entries: int = 256):
+        if not 0.0 < similarity <= 1.0:
+            raise ValueError("similarity must be in (0, 1]")
+        self._ttl = ttl_s
+        self._similarity = similarity
+        self._max_entries = max(1, max_entries)
+        self._entries: OrderedDict[str, CachedResult] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._invalidated = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _fresh(self) -> list[CachedResult]:
+        cutoff = time.monotonic() - self._ttl
+        for key in [k for k, e in self._entries.items() if e.stored_at < cutoff]:
+            del self._entries[key]
+        return list(self._entries.values())
+
+    def _near(self, unit: np.ndarray) -> list[tuple[CachedResult, float]]:
+        matches = []
+        for entry in self._fresh():
+            score = float(np.dot(unit, entry.demand_vector))
+            if score >= self._similarity:
+                matches.append((entry, score))
+        matches.sort(key=lambda m: m[1], reverse=True)
+        return matches
+
+    def has_near(self, demand_vector: Vector) -> bool:
+        unit = _unit(demand_vector)
+        return unit is not None and bool(self._near(unit))
+
+    def lookup(
+        self, demand_vector: Vector, profile_versions: dict[str, str]
+    ) -> Optional[tuple[CachedResult, float]]:
+        unit = _unit(demand_vector)
+        if unit is None:
+            self._misses += 1
+            return None
+        for entry, score in self._near(unit):
+            if entry.profile_versions.keys() != profile_versions.keys():
+                continue
+            if entry.profile_versions != profile_versions:
+                self._entries.pop(entry.negotiation_id, None)
+                self._stale += 1
+                continue
+            self._entries.move_to_end(entry.negotiation_id)
+            self._hits += 1
+            return entry, score
+        self._misses += 1
+        return None
+
+    def store(
+        self,
+        negotiation_id: str,
+        demand_vector: Vector,
+        profile_versions: dict[str, str],
+        offers: dict[str, dict[str, Any]],
+        plan_output: str,
+        center_rounds: int,
+        event_history: list[dict[str, Any]],
+        events: list[tuple[EventType, dict[str, Any]]],
+    ) -> None:
+        unit = _unit(demand_vector)
+        if unit is None:
+            return
+        self._entries[negotiation_id] = CachedResult(
+            negotiation_id=negotiation_id,
+            demand_vector=unit,
+            profile_versions=dict(profile_versions),
+            offers=offers,
+            plan_output=plan_output,
+            center_rounds=center_rounds,
+            event_history=list(event_history),
+            events=list(events),
+        )
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_agent(self, agent_id: str) -> int:
+        stale = [k for k, e in self._entries.items() if agent_id in e.profile_versions]
+        for key in stale:
+            del self._entries[key]
+        self._invalidated += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self._invalidated += len(self._entries)
+        self._entries.clear()
+
+    def metrics(self) -> dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._fresh()),
+            "ttl_s": self._ttl,
+            "similarity": self._similarity,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "stale": self._stale,
+            "invalidated": self._invalidated,
+        }
+
+@dataclass(slots=True, eq=False)
+class _CachedOffer:
+    version: str
+    demand_vector: np.ndarray
+    offer: dict[str, Any]
+    stored_at: float = field(default_factory=time.monotonic)
+
+class OfferCache:
+    """Per-agent offers reused for near-duplicate demands.
+
+    Keyed by (agent_id, profile version, demand embedding): an offer is reused
+    when the agent's profile is unchanged and the new demand is within
+    ``similarity`` (cosine) of the one it answered. Each agent keeps at most
+    ``max_per_agent`` offers, least recently used evicted first.
+    """
+
+    def __init__(self, similarity: float = 0.95, max_per_agent: int = 32, ttl_s: float = 86400.0):
+        if not 0.0 < similarity <= 1.0:
+            raise ValueError("similarity must be in (0, 1]")
+        self._similarity = similarity
+        self._max_per_agent = max(1, max_per_agent)
+        self._ttl = ttl_s
+        self._agents: dict[str, list[_CachedOffer]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def _entries(self, agent_id: str, version: str) -> list[_CachedOffer]:
+        cutoff = time.monotonic() - self._ttl
+        entries = [
+            e for e in self._agents.get(agent_id, [])
+            if e.version == version and e.stored_at >= cutoff
+        ]
+        if entries:
+            self._agents[agent_id] = entries
+        else:
+            self._agents.pop(agent_id, None)
+        return entries
+
+    def lookup(
+        self, agent_id: str, version: str, demand_vector: Vector
+    ) -> Optional[tuple[dict[str, Any], float]]:
+        unit = _unit(demand_vector)
+        best: Optional[_CachedOffer] = None
+        best_score = self._similarity
+        if unit is not None:
+            for entry in self._entries(agent_id, version):
+                score = float(np.dot(unit, entry.demand_vector))
+                if score >= best_score:
+                    best, best_score = entry, score
+        if best is None:
+            self._misses += 1
+            return None
+        entries = self._agents[agent_id]
+        entries.remove(best)
+        entries.append(best)
+        self._hits += 1
+        return dict(best.offer), best_score
+
+    def store(self, agent_id: str, version: str, demand_vector: Vector, offer: dict[str, Any]) -> None:
+        unit = _unit(demand_vector)
+        if unit is None:
+            return
+        entries = self._entries(agent_id, version)
+        entries.append(_CachedOffer(version=version, demand_vector=unit, offer=dict(offer)))
+        del entries[:-self._max_per_agent]
+        self._agents[agent_id] = entries
+
+    def invalidate_agent(self, agent_id: str) -> None:
+        self._agents.pop(agent_id, None)
+
+    def clear(self) -> None:
+        self._agents.clear()
+
+    def metrics(self) -> dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "agents": len(self._agents),
+            "entries": sum(len(e) for e in self._agents.values()),
+            "similarity": self._similarity,
+            "max_per_agent": self._max_per_agent,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+        }
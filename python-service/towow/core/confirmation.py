@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class ConfirmationRegistry:
+    """One future per negotiation awaiting formulation confirmation; entries never outlive the wait."""
+
+    def __init__(self) -> None:
+        self._pending: dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, negotiation_id: str) -> bool:
+        return negotiation_id in self._pending
+
+    def open(self, negotiation_id: str) -> asyncio.Future:
+        # A confirmation may land before anyone waits on it; keep it until `wait` consumes it.
+        future = self._pending.get(negotiation_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[negotiation_id] = future
+        return future
+
+    def resolve(self, negotiation_id: str, confirmed_text: Optional[str] = None) -> bool:
+        future = self._pending.get(negotiation_id)
+        if future is None or future.done():
+            return False
+        future.set_result({"confirmed_text": confirmed_text})
+        return True
+
+    async def wait(self, negotiation_id: str, timeout: Optional[float]) -> Optional[dict[str, Any]]:
+        """Return the confirmation data, or None if the timeout elapsed first."""
+        future = self._pending.get(negotiation_id) or self.open(negotiation_id)
+        if future.done() and not future.cancelled():
+            self._pending.pop(negotiation_id, None)
+            return future.result()
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.info(f"Confirmation for {negotiation_id} timed out after {timeout}s")
+            return None
+        finally:
+            self.discard(negotiation_id)
+
+    def discard(self, negotiation_id: str) -> None:
+        future = self._pending.pop(negotiation_id, None)
+        if future is not None and not future.done():
+            future.cancel()
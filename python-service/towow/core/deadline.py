@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Optional
+
+class Deadline:
+    """Monotonic whole-negotiation budget shared by a session and its sub-negotiations."""
+
+    def __init__(self, budget_s: Optional[float] = None):
+        self.budget_s = budget_s
+        self._expires_at = time.monotonic() + budget_s if budget_s is not None else None
+
+    @property
+    def remaining(self) -> Optional[float]:
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining
+        return remaining is not None and remaining <= 0.0
+
+    def clamp(self, timeout: Optional[float]) -> Optional[float]:
+        remaining = self.remaining
+        if remaining is None:
+            return timeout
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"budget_s": self.budget_s, "remaining_s": self.remaining}
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import logging
 import time
-from typing import Any, Callable, Optional
+from typing import Any, AsyncIterator, Callable, Optional
 
 import numpy as np
 
@@ -18,6 +19,7 @@ from .models import (
     generate_id,
 )
 from .events import (
+    EventType,
     NegotiationEvent,
     barrier_complete,
     center_tool_call,
@@ -27,7 +29,14 @@ from .events import (
     resonance_activated,
     sub_negotiation_started,
 )
+from .cache import OfferCache, ResultCache, profile_version
+from .confirmation import ConfirmationRegistry
+from .deadline import Deadline
+from .latency import LatencyTracker, PhaseHistograms
+from .policies import BarrierPolicy, ConfirmationMode, HedgePolicy, SpeculationPolicy, StragglerMode
+from .scheduler import PROVIDER_AGENT, PROVIDER_PLATFORM, LLMScheduler, Priority
 from .protocols import (
+    CheckpointStore,
     Encoder,
     EventPusher,
     PlatformLLMClient,
@@ -40,16 +49,91 @@ from .protocols import (
 logger = logging.getLogger(__name__)
 
 VALID_TRANSITIONS: dict[NegotiationState, set[NegotiationState]] = {
-    NegotiationState.CREATED: {NegotiationState.FORMULATING, NegotiationState.COMPLETED},
+    NegotiationState.CREATED: {
+        NegotiationState.FORMULATING, NegotiationState.ENCODING, NegotiationState.COMPLETED,
+    },
     NegotiationState.FORMULATING: {NegotiationState.FORMULATED, NegotiationState.COMPLETED},
     NegotiationState.FORMULATED: {NegotiationState.ENCODING, NegotiationState.COMPLETED},
-    NegotiationState.ENCODING: {NegotiationState.OFFERING, NegotiationState.COMPLETED},
+    NegotiationState.ENCODING: {
+        NegotiationState.OFFERING, NegotiationState.SYNTHESIZING, NegotiationState.COMPLETED,
+    },
     NegotiationState.OFFERING: {NegotiationState.BARRIER_WAITING, NegotiationState.COMPLETED},
     NegotiationState.BARRIER_WAITING: {NegotiationState.SYNTHESIZING, NegotiationState.COMPLETED},
     NegotiationState.SYNTHESIZING: {NegotiationState.SYNTHESIZING, NegotiationState.COMPLETED},
     NegotiationState.COMPLETED: set(),
 }
 
+# Events between resonance and the plan that a result-cache hit replays.
+CACHED_EVENT_TYPES = frozenset({
+    EventType.OFFER_RECEIVED,
+    EventType.BARRIER_COMPLETE,
+    EventType.CENTER_TOOL_CALL,
+})
+
+DEFAULT_TOOL_TIMEOUTS: dict[str, float] = {
+    "create_sub_demand": 180.0,
+}
+
+class _EncodeBatch:
+    """Collects sibling sub-demand texts from one center round into one batch_encode call."""
+
+    def __init__(self, encoder: Encoder, expected: int, max_batch: int):
+        self._encoder = encoder
+        self._remaining = expected
+        self._max_batch = max(1, max_batch)
+        self._texts: list[str] = []
+        self._futures: list[asyncio.Future] = []
+        self._flushes: set[asyncio.Task] = set()
+
+    async def encode(self, text: str) -> Vector:
+        future = asyncio.get_running_loop().create_future()
+        self._texts.append(text)
+        self._futures.append(future)
+        self._remaining -= 1
+        self._maybe_flush()
+        return await future
+
+    def withdraw(self) -> None:
+        self._remaining -= 1
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if not self._texts:
+            return
+        if self._remaining > 0 and len(self._texts) < self._max_batch:
+            return
+        texts, futures = self._texts, self._futures
+        self._texts, self._futures = [], []
+        task = asyncio.create_task(self._flush(texts, futures))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, texts: list[str], futures: list[asyncio.Future]) -> None:
+        try:
+            vectors = await self._encoder.batch_encode(texts)
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, vector in zip(futures, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    async def close(self) -> None:
+        """Cancel flushes still in flight, e.g. when the round itself was cancelled."""
+        for future in self._futures:
+            future.cancel()
+        self._texts, self._futures = [], []
+        for task in self._flushes:
+            task.cancel()
+        if self._flushes:
+            await asyncio.gather(*list(self._flushes), return_exceptions=True)
+
 class NegotiationEngine:
     def __init__(
         self,
@@ -58,15 +142,99 @@ class NegotiationEngine:
         event_pusher: EventPusher,
         offer_timeout_s: float = 30.0,
         confirmation_timeout_s: float = 300.0,
+        barrier_policy: Optional[BarrierPolicy] = None,
+        pipeline_offers: bool = False,
+        tool_concurrency: int = 4,
+        tool_timeout_s: float = 60.0,
+        tool_timeouts: Optional[dict[str, float]] = None,
+        llm_scheduler: Optional[LLMScheduler] = None,
+        sub_negotiation_budget_s: float = 180.0,
+        hedge_policy: Optional[HedgePolicy] = None,
+        negotiation_deadline_s: Optional[float] = None,
+        confirmation_mode: ConfirmationMode = ConfirmationMode.AUTO,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        result_cache: Optional[ResultCache] = None,
+        offer_cache: Optional[OfferCache] = None,
+        speculation_policy: Optional[SpeculationPolicy] = None,
     ):
         self._encoder = encoder
         self._resonance_detector = resonance_detector
         self._event_pusher = event_pusher
         self._offer_timeout = offer_timeout_s
         self._confirmation_timeout = confirmation_timeout_s
+        self._barrier_policy = barrier_policy or BarrierPolicy()
+        self._pipeline_offers = pipeline_offers
+        self._tool_concurrency = max(1, tool_concurrency)
+        self._tool_timeout = tool_timeout_s
+        self._tool_timeouts = {**DEFAULT_TOOL_TIMEOUTS, **(tool_timeouts or {})}
+        self._llm_scheduler = llm_scheduler
+        self._late_offer_tasks: dict[str, set[asyncio.Task]] = {}
+        self._session_profiles: dict[str, dict[str, dict[str, Any]]] = {}
+        self._sub_negotiation_budget = sub_negotiation_budget_s
+        self._child_tasks: dict[str, dict[asyncio.Task, NegotiationSession]] = {}
+        self._child_deadlines: dict[str, float] = {}
+        self._session_runs: dict[str, dict[str, Any]] = {}
+        self._hedge_policy = hedge_policy
+        self._negotiation_deadline = negotiation_deadline_s
+        self._running: dict[str, asyncio.Task] = {}
+        self._offer_latency = LatencyTracker()
+        self._phase_latency = PhaseHistograms()
+        self._offer_calls = 0
+        self._hedged_calls = 0
+        self._hedge_wins = 0
         self._tool_handlers: dict[str, Any] = {}
-        self._confirmation_events: dict[str, asyncio.Event] = {}
-        self._confirmation_data: dict[str, dict[str, Any]] = {}
+        self._confirmation_mode = confirmation_mode
+        self._confirmations = ConfirmationRegistry()
+        self._checkpoint_store = checkpoint_store
+        self._result_cache = result_cache
+        self._offer_cache = offer_cache
+        self._speculation = speculation_policy
+        self._speculative_rounds = 0
+        self._speculation_kept = 0
+
+    @property
+    def llm_scheduler(self) -> Optional[LLMScheduler]:
+        return self._llm_scheduler
+
+    def cancel_negotiation(self, negotiation_id: str) -> bool:
+        task = self._running.get(negotiation_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    @property
+    def result_cache(self) -> Optional[ResultCache]:
+        return self._result_cache
+
+    @property
+    def offer_cache(self) -> Optional[OfferCache]:
+        return self._offer_cache
+
+    def phase_metrics(self) -> dict[str, Any]:
+        return self._phase_latency.snapshot()
+
+    def hedge_metrics(self) -> dict[str, Any]:
+        return {
+            "enabled": self._hedge_policy is not None,
+            "policy": self._hedge_policy.to_dict() if self._hedge_policy else None,
+            "offer_calls": self._offer_calls,
+            "hedged_calls": self._hedged_calls,
+            "hedge_wins": self._hedge_wins,
+            "hedge_rate": self._hedged_calls / self._offer_calls if self._offer_calls else 0.0,
+            "latency": self._offer_latency.snapshot(
+                self._hedge_policy.percentile if self._hedge_policy else 0.95
+            ),
+        }
+
+    def speculation_metrics(self) -> dict[str, Any]:
+        return {
+            "enabled": self._speculation is not None,
+            "policy": self._speculation.to_dict() if self._speculation else None,
+            "speculative_rounds": self._speculative_rounds,
+            "kept": self._speculation_kept,
+            "rerun": self._speculative_rounds - self._speculation_kept,
+        }
 
     def register_tool_handler(self, handler: Any) -> None:
         name = handler.tool_name
@@ -75,14 +243,14 @@ class NegotiationEngine:
         self._tool_handlers[name] = handler
 
     def confirm_formulation(self, negotiation_id: str, confirmed_text: str | None = None) -> bool:
-        if negotiation_id not in self._confirmation_events:
-            return False
-        self._confirmation_data[negotiation_id] = {"confirmed_text": confirmed_text}
-        self._confirmation_events[negotiation_id].set()
-        return True
+        return self._confirmations.resolve(negotiation_id, confirmed_text)
 
     def is_awaiting_confirmation(self, negotiation_id: str) -> bool:
-        return negotiation_id in self._confirmation_events
+        return negotiation_id in self._confirmations
+
+    @property
+    def pending_confirmations(self) -> int:
+        return len(self._confirmations)
 
     async def start_negotiation(
         self,
@@ -98,32 +266,199 @@ class NegotiationEngine:
         k_star: int = 5,
         agent_display_names: Optional[dict[str, str]] = None,
         register_session: Optional[Callable[[NegotiationSession], None]] = None,
+        demand_vector: Optional[Vector] = None,
+        deadline: Optional[Deadline] = None,
     ) -> NegotiationSession:
         logger.info(f"Starting negotiation {session.negotiation_id}")
 
         if session.state != NegotiationState.CREATED:
             raise ValueError(f"Session must be in CREATED state, got {session.state}")
 
-        if formulation_skill:
-            await self._run_formulation(session, adapter, formulation_skill)
-
-        await self._run_encoding(session, agent_vectors or {}, k_star, llm_client)
+        return await self._drive(
+            session, adapter, llm_client, center_skill, formulation_skill, offer_skill,
+            sub_negotiation_skill, gap_recursion_skill, agent_vectors, k_star,
+            agent_display_names, register_session, demand_vector, deadline,
+        )
 
-        if offer_skill:
-            await self._run_offers(session, adapter, offer_skill, agent_display_names or {})
+    async def resume_negotiation(
+        self,
+        session: NegotiationSession,
+        adapter: ProfileDataSource,
+        llm_client: PlatformLLMClient,
+        center_skill: Skill,
+        formulation_skill: Optional[Skill] = None,
+        offer_skill: Optional[Skill] = None,
+        sub_negotiation_skill: Optional[Skill] = None,
+        gap_recursion_skill: Optional[Skill] = None,
+        agent_vectors: Optional[dict[str, Vector]] = None,
+        k_star: int = 5,
+        agent_display_names: Optional[dict[str, str]] = None,
+        register_session: Optional[Callable[[NegotiationSession], None]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> NegotiationSession:
+        """Continue a checkpointed session from its last completed phase.
+
+        Work already recorded in the checkpoint (formulated text, participants,
+        collected offers, finished center rounds) is kept; only the phase that
+        was in flight when the process stopped is run again.
+        """
+        if session.state == NegotiationState.COMPLETED:
+            return session
+
+        interrupted = session.state
+        session.state = self._resume_point(session)
+        if (
+            session.state == NegotiationState.FORMULATED
+            and self._confirmation_mode != ConfirmationMode.AUTO
+            and not session.metadata.get("confirmed")
+        ):
+            self._confirmations.open(session.negotiation_id)
+        if session.trace is not None:
+            session.trace.add_entry(
+                "resume",
+                metadata={"interrupted": interrupted.value, "resumed_from": session.state.value},
+            )
+        logger.info(
+            f"Resuming negotiation {session.negotiation_id}: "
+            f"interrupted in {interrupted.value}, continuing from {session.state.value}"
+        )
 
-        await self._run_synthesis(
-            session,
-            adapter,
-            llm_client,
-            center_skill,
-            sub_negotiation_skill,
-            gap_recursion_skill,
-            register_session,
-            agent_display_names or {},
+        return await self._drive(
+            session, adapter, llm_client, center_skill, formulation_skill, offer_skill,
+            sub_negotiation_skill, gap_recursion_skill, agent_vectors, k_star,
+            agent_display_names, register_session, None, deadline,
         )
 
-        session.completed_at = session.trace.completed_at if session.trace else None
+    @staticmethod
+    def _resume_point(session: NegotiationSession) -> NegotiationState:
+        state = session.state
+        if state in (NegotiationState.BARRIER_WAITING, NegotiationState.SYNTHESIZING):
+            return state
+        if state == NegotiationState.OFFERING and session.metadata.get("resonance_complete"):
+            # Resonance is done; only the missing offers are requested again.
+            return NegotiationState.ENCODING
+        # Pipelined offers reach OFFERING while resonance is still streaming, so a
+        # participant list without the marker may be partial: resonate again.
+        session.participants = []
+        session.metadata.pop("resonance_complete", None)
+        if state == NegotiationState.FORMULATING or not session.demand.formulated_text:
+            return NegotiationState.CREATED
+        return NegotiationState.FORMULATED
+
+    async def _drive(
+        self,
+        session: NegotiationSession,
+        adapter: ProfileDataSource,
+        llm_client: PlatformLLMClient,
+        center_skill: Skill,
+        formulation_skill: Optional[Skill],
+        offer_skill: Optional[Skill],
+        sub_negotiation_skill: Optional[Skill],
+        gap_recursion_skill: Optional[Skill],
+        agent_vectors: Optional[dict[str, Vector]],
+        k_star: int,
+        agent_display_names: Optional[dict[str, str]],
+        register_session: Optional[Callable[[NegotiationSession], None]],
+        demand_vector: Optional[Vector],
+        deadline: Optional[Deadline],
+    ) -> NegotiationSession:
+        deadline = deadline or Deadline(self._negotiation_deadline)
+        self._session_profiles[session.negotiation_id] = {}
+        self._session_runs[session.negotiation_id] = {
+            "agent_vectors": agent_vectors or {},
+            "k_star": k_star,
+            "offer_skill": offer_skill,
+            "deadline": deadline,
+            "events": [] if self._result_cache is not None else None,
+        }
+        task = asyncio.current_task()
+        if task is not None:
+            self._running[session.negotiation_id] = task
+        if session.trace is None:
+            session.trace = TraceChain(negotiation_id=session.negotiation_id)
+        try:
+            with session.trace.span("negotiation", depth=session.depth):
+                try:
+                    if session.state == NegotiationState.CREATED and formulation_skill:
+                        await self._run_formulation(session, adapter, formulation_skill)
+                    if session.state == NegotiationState.FORMULATED:
+                        if not await self._await_confirmation(session):
+                            await self._transition_state(session, NegotiationState.COMPLETED)
+                            return session
+
+                    use_cache = self._result_cache is not None and k_star > 0
+                    pipelined = offer_skill is not None and self._pipeline_offers
+                    if use_cache and session.state in (NegotiationState.CREATED, NegotiationState.FORMULATED):
+                        if demand_vector is None:
+                            demand_vector = await self._encode_demand(session)
+                        # A likely hit needs the full participant set before any offer starts.
+                        pipelined = pipelined and not self._result_cache.has_near(demand_vector)
+
+                    if self._speculation is not None and session.center_rounds == 0:
+                        self._session_runs[session.negotiation_id]["speculate"] = (
+                            lambda offers: self._speculative_round(session, llm_client, center_skill, offers)
+                        )
+
+                    if session.state in (NegotiationState.CREATED, NegotiationState.FORMULATED):
+                        if pipelined:
+                            await self._run_pipelined_offers(
+                                session, agent_vectors or {}, k_star, adapter, offer_skill,
+                                agent_display_names or {}, demand_vector,
+                            )
+                        else:
+                            await self._run_encoding(session, agent_vectors or {}, k_star, llm_client, demand_vector)
+
+                    if (
+                        use_cache
+                        and demand_vector is not None
+                        and session.state == NegotiationState.ENCODING
+                        and await self._serve_cached_result(session, adapter, demand_vector)
+                    ):
+                        return session
+
+                    if session.state == NegotiationState.ENCODING and offer_skill:
+                        await self._run_offers(session, adapter, offer_skill, agent_display_names or {})
+
+                    await self._run_synthesis(
+                        session,
+                        adapter,
+                        llm_client,
+                        center_skill,
+                        sub_negotiation_skill,
+                        gap_recursion_skill,
+                        register_session,
+                        agent_display_names or {},
+                    )
+                    if use_cache and demand_vector is not None:
+                        self._remember_result(session, demand_vector)
+                except asyncio.TimeoutError:
+                    if not deadline.expired:
+                        raise
+                    logger.warning(f"Negotiation {session.negotiation_id} exceeded its {deadline.budget_s}s deadline")
+                    session.metadata["deadline_exceeded"] = True
+                    if not session.plan_output:
+                        session.plan_output = "No plan generated. Negotiation deadline exceeded."
+                    if session.state != NegotiationState.COMPLETED:
+                        await self._transition_state(session, NegotiationState.COMPLETED)
+                except asyncio.CancelledError:
+                    logger.info(f"Negotiation {session.negotiation_id} cancelled in state {session.state.value}")
+                    session.metadata["cancelled"] = True
+                    if session.state != NegotiationState.COMPLETED:
+                        await self._transition_state(session, NegotiationState.COMPLETED)
+                    raise
+                finally:
+                    self._running.pop(session.negotiation_id, None)
+                    self._confirmations.discard(session.negotiation_id)
+                    await self._discard_speculation(session)
+                    await self._cancel_sub_negotiations(session)
+                    await self._cancel_late_offers(session)
+                    self._session_profiles.pop(session.negotiation_id, None)
+                    self._session_runs.pop(session.negotiation_id, None)
+        finally:
+            session.trace.complete()
+            session.completed_at = session.trace.completed_at
+            self._observe_trace(session.trace)
+
         return session
 
     async def _transition_state(
@@ -138,13 +473,91 @@ class NegotiationEngine:
             )
         session.state = new_state
         logger.debug(f"Session {session.negotiation_id}: {current} -> {new_state}")
+        await self._checkpoint(session)
+
+    async def _checkpoint(self, session: NegotiationSession) -> None:
+        if self._checkpoint_store is None:
+            return
+        try:
+            await self._checkpoint_store.checkpoint(session)
+        except Exception as e:
+            logger.error(f"Failed to checkpoint {session.negotiation_id}: {e}")
 
     async def _push_event(self, event: NegotiationEvent) -> None:
+        if event.event_type in CACHED_EVENT_TYPES:
+            events = self._session_runs.get(event.negotiation_id, {}).get("events")
+            if events is not None:
+                events.append((event.event_type, event.data))
         try:
             await self._event_pusher.push(event)
         except Exception as e:
             logger.error(f"Failed to push event {event.event_type}: {e}")
 
+    def _span(self, session: NegotiationSession, step: str, **metadata: Any) -> Any:
+        if session.trace is None:
+            return contextlib.nullcontext(None)
+        return session.trace.span(step, **metadata)
+
+    def _observe_trace(self, trace: TraceChain) -> None:
+        for entry in trace.entries[trace.observed:]:
+            if entry.duration_ms is not None:
+                self._phase_latency.observe(entry.step, entry.duration_ms)
+        trace.observed = len(trace.entries)
+
+    def _remaining(self, session: NegotiationSession, timeout: Optional[float]) -> Optional[float]:
+        deadline: Optional[Deadline] = self._session_runs.get(session.negotiation_id, {}).get("deadline")
+        return deadline.clamp(timeout) if deadline is not None else timeout
+
+    async def _scheduled(
+        self,
+        session: NegotiationSession,
+        priority: Priority,
+        provider: str,
+        fn: Callable[[], Any],
+    ) -> Any:
+        if self._llm_scheduler is None:
+            return await fn()
+        return await self._llm_scheduler.run(
+            fn,
+            priority=priority,
+            provider=provider,
+            interactive=not session.metadata.get("batch", False),
+        )
+
+    async def _prefetch_profiles(
+        self,
+        session: NegotiationSession,
+        adapter: ProfileDataSource,
+        agent_ids: list[str],
+    ) -> None:
+        profiles = self._session_profiles.setdefault(session.negotiation_id, {})
+        missing = [a for a in dict.fromkeys(agent_ids) if a not in profiles]
+        if not missing:
+            return
+        try:
+            get_profiles = getattr(adapter, "get_profiles", None)
+            if get_profiles is not None:
+                fetched = await get_profiles(missing)
+            else:
+                fetched = dict(zip(missing, await asyncio.gather(
+                    *(adapter.get_profile(a) for a in missing)
+                )))
+        except Exception as e:
+            logger.warning(f"Profile prefetch failed for {session.negotiation_id}: {e}")
+            return
+        profiles.update(fetched)
+
+    async def _get_profile(
+        self,
+        session: NegotiationSession,
+        adapter: ProfileDataSource,
+        agent_id: str,
+    ) -> dict[str, Any]:
+        profiles = self._session_profiles.setdefault(session.negotiation_id, {})
+        if agent_id not in profiles:
+            profiles[agent_id] = await adapter.get_profile(agent_id)
+        return profiles[agent_id]
+
     async def _run_formulation(
         self,
         session: NegotiationSession,
@@ -153,35 +566,152 @@ class NegotiationEngine:
     ) -> None:
         await self._transition_state(session, NegotiationState.FORMULATING)
 
-        try:
-            user_agent_id = session.demand.user_id or "user_default"
-            profile = await adapter.get_profile(user_agent_id)
-
-            result = await formulation_skill.execute({
-                "raw_intent": session.demand.raw_intent,
-                "agent_id": user_agent_id,
-                "profile_data": profile,
-                "adapter": adapter,
-            })
+        with self._span(session, "formulation"):
+            try:
+                user_agent_id = session.demand.user_id or "user_default"
+                profile = await self._get_profile(session, adapter, user_agent_id)
+
+                result = await asyncio.wait_for(
+                    self._scheduled(
+                        session, Priority.FORMULATION, PROVIDER_AGENT,
+                        lambda: formulation_skill.execute({
+                            "raw_intent": session.demand.raw_intent,
+                            "agent_id": user_agent_id,
+                            "profile_data": profile,
+                            "adapter": adapter,
+                        }),
+                    ),
+                    timeout=self._remaining(session, None),
+                )
 
-            session.demand.formulated_text = result.get("formulated_text", session.demand.raw_intent)
-            session.demand.metadata["enrichments"] = result.get("enrichments", {})
+                session.demand.formulated_text = result.get("formulated_text", session.demand.raw_intent)
+                session.demand.metadata["enrichments"] = result.get("enrichments", {})
 
-            await self._push_event(
-                formulation_ready(
-                    negotiation_id=session.negotiation_id,
-                    raw_intent=session.demand.raw_intent,
-                    formulated_text=session.demand.formulated_text,
-                    enrichments=result.get("enrichments"),
+                if self._confirmation_mode != ConfirmationMode.AUTO:
+                    self._confirmations.open(session.negotiation_id)
+
+                await self._push_event(
+                    formulation_ready(
+                        negotiation_id=session.negotiation_id,
+                        raw_intent=session.demand.raw_intent,
+                        formulated_text=session.demand.formulated_text,
+                        enrichments=result.get("enrichments"),
+                    )
                 )
+
+                await self._transition_state(session, NegotiationState.FORMULATED)
+
+            except Exception as e:
+                logger.error(f"Formulation failed: {e}")
+                self._confirmations.discard(session.negotiation_id)
+                session.demand.formulated_text = session.demand.raw_intent
+                await self._transition_state(session, NegotiationState.FORMULATED)
+
+    async def _await_confirmation(self, session: NegotiationSession) -> bool:
+        if session.negotiation_id not in self._confirmations:
+            return True
+
+        timeout = self._remaining(session, self._confirmation_timeout)
+        with self._span(session, "confirmation"):
+            data = await self._confirmations.wait(session.negotiation_id, timeout)
+        if data is None:
+            session.metadata["confirmation_timed_out"] = True
+            if self._confirmation_mode == ConfirmationMode.REQUIRE:
+                logger.warning(f"Formulation for {session.negotiation_id} was not confirmed, ending")
+                return False
+            return True
+
+        if data.get("confirmed_text"):
+            session.demand.formulated_text = data["confirmed_text"]
+        session.metadata["confirmed"] = True
+        return True
+
+    async def _encode_demand(self, session: NegotiationSession) -> Vector:
+        demand_text = session.demand.formulated_text or session.demand.raw_intent
+        with self._span(session, "encoding"):
+            return await asyncio.wait_for(
+                self._encoder.encode(demand_text), timeout=self._remaining(session, None)
             )
 
-            await self._transition_state(session, NegotiationState.FORMULATED)
+    async def _serve_cached_result(
+        self,
+        session: NegotiationSession,
+        adapter: ProfileDataSource,
+        demand_vector: Vector,
+    ) -> bool:
+        if not session.participants:
+            return False
+        ids = [p.agent_id for p in session.participants]
+        await self._prefetch_profiles(session, adapter, ids)
+        profiles = self._session_profiles.get(session.negotiation_id, {})
+        versions = {agent_id: profile_version(profiles.get(agent_id, {})) for agent_id in ids}
 
-        except Exception as e:
-            logger.error(f"Formulation failed: {e}")
-            session.demand.formulated_text = session.demand.raw_intent
-            await self._transition_state(session, NegotiationState.FORMULATED)
+        match = self._result_cache.lookup(demand_vector, versions)
+        if match is None:
+            return False
+        cached, similarity = match
+
+        for participant in session.participants:
+            offer = cached.offers.get(participant.agent_id)
+            if offer is not None:
+                participant.offer = Offer.from_dict(offer)
+                participant.state = AgentState.REPLIED
+            else:
+                participant.state = AgentState.EXITED
+        session.plan_output = cached.plan_output
+        session.center_rounds = cached.center_rounds
+        session.event_history = list(cached.event_history)
+        session.metadata["result_cache"] = {
+            "hit": True,
+            "source_negotiation_id": cached.negotiation_id,
+            "similarity": round(similarity, 4),
+        }
+        logger.info(
+            f"Result cache hit for {session.negotiation_id} "
+            f"(from {cached.negotiation_id}, similarity {similarity:.3f})"
+        )
+
+        for event_type, data in cached.events:
+            await self._push_event(NegotiationEvent(
+                event_type=event_type, negotiation_id=session.negotiation_id, data=dict(data),
+            ))
+        await self._push_event(
+            plan_ready(
+                negotiation_id=session.negotiation_id,
+                plan_text=session.plan_output,
+                center_rounds=session.center_rounds,
+                participating_agents=[p.agent_id for p in session.participants if p.offer],
+            )
+        )
+        await self._transition_state(session, NegotiationState.COMPLETED)
+        return True
+
+    def _remember_result(self, session: NegotiationSession, demand_vector: Vector) -> None:
+        """Cache a clean result: every participant answered and no sub-negotiations ran."""
+        if (
+            not session.plan_output
+            or not session.participants
+            or session.sub_session_ids
+            or session.offer_count != len(session.participants)
+            or any(h.get("type") in ("tool_timeout", "tool_error") for h in session.event_history)
+        ):
+            return
+        profiles = self._session_profiles.get(session.negotiation_id, {})
+        if any(p.agent_id not in profiles for p in session.participants):
+            return
+        run = self._session_runs.get(session.negotiation_id, {})
+        self._result_cache.store(
+            negotiation_id=session.negotiation_id,
+            demand_vector=demand_vector,
+            profile_versions={
+                p.agent_id: profile_version(profiles[p.agent_id]) for p in session.participants
+            },
+            offers={p.agent_id: p.offer.to_dict() for p in session.participants},
+            plan_output=session.plan_output,
+            center_rounds=session.center_rounds,
+            event_history=session.event_history,
+            events=run.get("events") or [],
+        )
 
     async def _run_encoding(
         self,
@@ -189,26 +719,31 @@ class NegotiationEngine:
         agent_vectors: dict[str, Vector],
         k_star: int,
         llm_client: PlatformLLMClient,
+        demand_vector: Optional[Vector] = None,
     ) -> None:
         await self._transition_state(session, NegotiationState.ENCODING)
 
-        demand_text = session.demand.formulated_text or session.demand.raw_intent
-        demand_vector = await self._encoder.encode(demand_text)
+        if demand_vector is None:
+            demand_vector = await self._encode_demand(session)
+        self._session_runs.get(session.negotiation_id, {})["demand_vector"] = demand_vector
 
-        if agent_vectors:
-            results = await self._resonance_detector.detect(
-                demand_vector, agent_vectors, k_star
-            )
+        if k_star > 0:
+            with self._span(session, "resonance", k_star=k_star):
+                results = await asyncio.wait_for(
+                    self._detect(session, demand_vector, agent_vectors, k_star),
+                    timeout=self._remaining(session, None),
+                )
 
             session.participants = []
             for agent_id, score in results:
-                session.participants.append(
+                session.add_participant(
                     AgentParticipant(
                         agent_id=agent_id,
                         display_name=agent_id,
                         resonance_score=score,
                     )
                 )
+            session.metadata["resonance_complete"] = True
 
             await self._push_event(
                 resonance_activated(
@@ -231,20 +766,160 @@ class NegotiationEngine:
         await self._transition_state(session, NegotiationState.OFFERING)
 
         demand_text = session.demand.formulated_text or session.demand.raw_intent
+        await self._prefetch_profiles(session, adapter, [p.agent_id for p in session.participants])
 
-        tasks = []
+        tasks: dict[asyncio.Task, AgentParticipant] = {}
         for participant in session.participants:
-            task = self._generate_single_offer(
-                session, participant, adapter, offer_skill, demand_text, display_names
+            if participant.offer is not None or participant.state != AgentState.ACTIVE:
+                continue
+            task = asyncio.create_task(
+                self._generate_single_offer(
+                    session, participant, adapter, offer_skill, demand_text, display_names
+                )
             )
-            tasks.append(task)
+            tasks[task] = participant
+
+        await self._complete_barrier(session, tasks)
+
+    async def _run_pipelined_offers(
+        self,
+        session: NegotiationSession,
+        agent_vectors: dict[str, Vector],
+        k_star: int,
+        adapter: ProfileDataSource,
+        offer_skill: Skill,
+        display_names: dict[str, str],
+        demand_vector: Optional[Vector] = None,
+    ) -> None:
+        await self._transition_state(session, NegotiationState.ENCODING)
+
+        demand_text = session.demand.formulated_text or session.demand.raw_intent
+        if demand_vector is None:
+            demand_vector = await self._encode_demand(session)
+        self._session_runs.get(session.negotiation_id, {})["demand_vector"] = demand_vector
+
+        session.participants = []
+        session.metadata.pop("resonance_complete", None)
+        tasks: dict[asyncio.Task, AgentParticipant] = {}
+        try:
+            with self._span(session, "resonance", k_star=k_star, streaming=True):
+                if k_star > 0:
+                    async with contextlib.aclosing(
+                        self._stream_resonance(session, demand_vector, agent_vectors, k_star)
+                    ) as stream:
+                        async for agent_id, score in stream:
+                            participant = AgentParticipant(
+                                agent_id=agent_id,
+                                display_name=agent_id,
+                                resonance_score=score,
+                            )
+                            session.add_participant(participant)
+                            if session.state == NegotiationState.ENCODING:
+                                await self._transition_state(session, NegotiationState.OFFERING)
+
+                            task = asyncio.create_task(
+                                self._generate_single_offer(
+                                    session, participant, adapter, offer_skill, demand_text, display_names
+                                )
+                            )
+                            tasks[task] = participant
+
+                            await self._push_event(
+                                resonance_activated(
+                                    negotiation_id=session.negotiation_id,
+                                    activated_count=len(session.participants),
+                                    agents=[{
+                                        "agent_id": participant.agent_id,
+                                        "display_name": participant.display_name,
+                                        "resonance_score": participant.resonance_score,
+                                    }],
+                                )
+                            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        session.metadata["resonance_complete"] = True
+        if session.state == NegotiationState.ENCODING:
+            await self._transition_state(session, NegotiationState.OFFERING)
+        else:
+            await self._checkpoint(session)
+
+        await self._complete_barrier(session, tasks)
+
+    async def _detect(
+        self,
+        session: NegotiationSession,
+        demand_vector: Vector,
+        agent_vectors: dict[str, Vector],
+        k_star: int,
+    ) -> list[tuple[str, float]]:
+        exclude = set(session.metadata.get("exclude_agent_ids", ()))
+        results = await self._resonance_detector.detect(
+            demand_vector, agent_vectors, k_star + len(exclude)
+        )
+        return [r for r in results if r[0] not in exclude][:k_star]
+
+    async def _stream_resonance(
+        self,
+        session: NegotiationSession,
+        demand_vector: Vector,
+        agent_vectors: dict[str, Vector],
+        k_star: int,
+    ) -> AsyncIterator[tuple[str, float]]:
+        exclude = set(session.metadata.get("exclude_agent_ids", ()))
+        detect_stream = getattr(self._resonance_detector, "detect_stream", None)
+        if detect_stream is None:
+            for item in await self._detect(session, demand_vector, agent_vectors, k_star):
+                yield item
+            return
+        yielded = 0
+        # Close the detector's stream as soon as we stop, so it releases its
+        # connection/cursor now rather than whenever the generator is collected.
+        async with contextlib.aclosing(
+            detect_stream(demand_vector, agent_vectors, k_star + len(exclude))
+        ) as stream:
+            async for agent_id, score in stream:
+                if agent_id in exclude:
+                    continue
+                yield agent_id, score
+                yielded += 1
+                if yielded >= k_star:
+                    return
 
-        await asyncio.gather(*tasks, return_exceptions=True)
+    async def _complete_barrier(
+        self,
+        session: NegotiationSession,
+        tasks: dict[asyncio.Task, AgentParticipant],
+    ) -> None:
+        policy = self._barrier_policy
+        try:
+            with self._span(session, "barrier", participants=len(tasks)):
+                reason = await self._await_barrier(session, tasks, policy)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        pending = [t for t in tasks if not t.done()]
+        if pending and policy.stragglers == StragglerMode.CANCEL:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for task in pending:
+                participant = tasks[task]
+                if participant.state == AgentState.ACTIVE:
+                    participant.state = AgentState.EXITED
+            logger.info(f"Cancelled {len(pending)} straggling offers for {session.negotiation_id}")
+            pending = []
+        elif pending:
+            self._late_offer_tasks[session.negotiation_id] = set(pending)
 
         await self._transition_state(session, NegotiationState.BARRIER_WAITING)
 
-        exited_count = sum(1 for p in session.participants if p.state == AgentState.EXITED)
-        offers_received = len(session.collected_offers)
+        exited_count = session.exited_count
+        offers_received = session.offer_count
 
         await self._push_event(
             barrier_complete(
@@ -252,9 +927,75 @@ class NegotiationEngine:
                 total_participants=len(session.participants),
                 offers_received=offers_received,
                 exited_count=exited_count,
+                reason=reason,
+                pending_count=len(pending),
+                policy=policy.to_dict(),
             )
         )
 
+    async def _await_barrier(
+        self,
+        session: NegotiationSession,
+        tasks: dict[asyncio.Task, AgentParticipant],
+        policy: BarrierPolicy,
+    ) -> str:
+        loop = asyncio.get_running_loop()
+        quorum = policy.quorum(len(tasks))
+        deadline = (
+            loop.time() + policy.soft_deadline_s
+            if policy.soft_deadline_s is not None
+            else None
+        )
+        pending = set(tasks)
+        # Participants outside `tasks` (offers restored from a checkpoint) do not
+        # change state during the barrier, so the session counter tracks ours.
+        baseline = session.replied_count - sum(
+            1 for p in tasks.values() if p.state == AgentState.REPLIED
+        )
+
+        run = self._session_runs.get(session.negotiation_id, {})
+        speculate_at = (
+            self._speculation.quorum(len(tasks))
+            if self._speculation is not None and "speculate" in run
+            else None
+        )
+
+        while pending:
+            replied = session.replied_count - baseline
+            if replied >= quorum:
+                return "quorum"
+            if speculate_at is not None and replied >= speculate_at and "speculation" not in run:
+                offers = session.collected_offers
+                logger.info(
+                    f"Speculating center round 1 for {session.negotiation_id} "
+                    f"on {len(offers)}/{len(session.participants)} offers"
+                )
+                run["speculation"] = (
+                    asyncio.create_task(run["speculate"](offers)),
+                    {o.agent_id for o in offers},
+                )
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    return "deadline"
+            _, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+
+        return "all_settled"
+
+    async def _cancel_late_offers(self, session: NegotiationSession) -> None:
+        late = self._late_offer_tasks.pop(session.negotiation_id, set())
+        pending = [t for t in late if not t.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            for participant in session.participants:
+                if participant.state == AgentState.ACTIVE:
+                    participant.state = AgentState.EXITED
+
     async def _generate_single_offer(
         self,
         session: NegotiationSession,
@@ -264,43 +1005,138 @@ class NegotiationEngine:
         demand_text: str,
         display_names: dict[str, str],
     ) -> None:
-        try:
-            profile = await adapter.get_profile(participant.agent_id)
-
-            result = await asyncio.wait_for(
-                offer_skill.execute({
-                    "agent_id": participant.agent_id,
-                    "demand_text": demand_text,
-                    "profile_data": profile,
-                    "adapter": adapter,
-                }),
-                timeout=self._offer_timeout,
-            )
+        with self._span(session, "offer", agent_id=participant.agent_id) as span:
+            try:
+                profile = await self._get_profile(session, adapter, participant.agent_id)
+
+                cache_info: Optional[dict[str, Any]] = None
+                result: Optional[dict[str, Any]] = None
+                demand_vector = self._session_runs.get(session.negotiation_id, {}).get("demand_vector")
+                if self._offer_cache is not None and demand_vector is not None:
+                    version = profile_version(profile)
+                    cached = self._offer_cache.lookup(participant.agent_id, version, demand_vector)
+                    if cached is not None:
+                        result, similarity = cached
+                    cache_info = {
+                        "hit": cached is not None,
+                        "similarity": round(similarity, 4) if cached is not None else None,
+                    }
+
+                if result is None:
+                    result = await asyncio.wait_for(
+                        self._execute_offer(
+                            session,
+                            participant.agent_id,
+                            lambda: offer_skill.execute({
+                                "agent_id": participant.agent_id,
+                                "demand_text": demand_text,
+                                "profile_data": profile,
+                                "adapter": adapter,
+                            }),
+                        ),
+                        timeout=self._remaining(session, self._offer_timeout),
+                    )
+                    if cache_info is not None:
+                        self._offer_cache.store(participant.agent_id, version, demand_vector, result)
 
-            participant.offer = Offer(
-                agent_id=participant.agent_id,
-                content=result.get("content", ""),
-                capabilities=result.get("capabilities", []),
-                confidence=result.get("confidence", 0.0),
-            )
-            participant.state = AgentState.REPLIED
+                if cache_info is not None:
+                    cache_info["hits"] = self._offer_cache.hits
+                    cache_info["misses"] = self._offer_cache.misses
+                    if span is not None:
+                        span.metadata["cache_hit"] = cache_info["hit"]
 
-            await self._push_event(
-                offer_received(
-                    negotiation_id=session.negotiation_id,
+                participant.offer = Offer(
                     agent_id=participant.agent_id,
-                    display_name=display_names.get(participant.agent_id, participant.agent_id),
-                    content=participant.offer.content,
-                    capabilities=participant.offer.capabilities,
+                    content=result.get("content", ""),
+                    capabilities=result.get("capabilities", []),
+                    confidence=result.get("confidence", 0.0),
                 )
+                participant.state = AgentState.REPLIED
+
+                await self._push_event(
+                    offer_received(
+                        negotiation_id=session.negotiation_id,
+                        agent_id=participant.agent_id,
+                        display_name=display_names.get(participant.agent_id, participant.agent_id),
+                        content=participant.offer.content,
+                        capabilities=participant.offer.capabilities,
+                        offer_cache=cache_info,
+                    )
+                )
+
+            except asyncio.TimeoutError:
+                participant.state = AgentState.EXITED
+                logger.warning(f"Offer from {participant.agent_id} timed out")
+            except Exception as e:
+                participant.state = AgentState.EXITED
+                logger.error(f"Offer generation failed for {participant.agent_id}: {e}")
+
+            if span is not None:
+                span.metadata["state"] = participant.state.value
+
+    def _hedge_delay(self, agent_id: str) -> Optional[float]:
+        policy = self._hedge_policy
+        if policy is None:
+            return None
+        if self._hedged_calls + 1 > policy.max_hedge_ratio * self._offer_calls:
+            return None
+        delay = self._offer_latency.percentile(
+            f"agent:{agent_id}", policy.percentile, policy.min_samples
+        )
+        if delay is None:
+            delay = self._offer_latency.percentile(
+                f"provider:{PROVIDER_AGENT}", policy.percentile, policy.min_samples
             )
+        if delay is None:
+            return None
+        return max(delay, policy.min_delay_s)
 
-        except asyncio.TimeoutError:
-            participant.state = AgentState.EXITED
-            logger.warning(f"Offer from {participant.agent_id} timed out")
-        except Exception as e:
-            participant.state = AgentState.EXITED
-            logger.error(f"Offer generation failed for {participant.agent_id}: {e}")
+    async def _execute_offer(
+        self,
+        session: NegotiationSession,
+        agent_id: str,
+        call: Callable[[], Any],
+    ) -> dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self._offer_calls += 1
+
+        def attempt() -> asyncio.Task:
+            return asyncio.ensure_future(
+                self._scheduled(session, Priority.OFFER, PROVIDER_AGENT, call)
+            )
+
+        primary = attempt()
+        attempts = {primary}
+        try:
+            delay = self._hedge_delay(agent_id)
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done and self._hedge_delay(agent_id) is not None:
+                    self._hedged_calls += 1
+                    attempts.add(attempt())
+                    logger.info(f"Hedging offer from {agent_id} after {delay:.2f}s")
+
+            error: Optional[BaseException] = None
+            while attempts:
+                done, _ = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    attempts.discard(task)
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    if task is not primary:
+                        self._hedge_wins += 1
+                    elapsed = loop.time() - started
+                    self._offer_latency.record(f"agent:{agent_id}", elapsed)
+                    self._offer_latency.record(f"provider:{PROVIDER_AGENT}", elapsed)
+                    return task.result()
+            raise error
+        finally:
+            for task in attempts:
+                task.cancel()
+            if attempts:
+                await asyncio.gather(*attempts, return_exceptions=True)
 
     async def _run_synthesis(
         self,
@@ -315,84 +1151,80 @@ class NegotiationEngine:
     ) -> None:
         await self._transition_state(session, NegotiationState.SYNTHESIZING)
 
-        history: list[dict[str, Any]] = []
-        center_round = 0
+        history = session.event_history
+        center_round = session.center_rounds
 
         while session.center_rounds < session.max_center_rounds:
+            await self._join_sub_negotiations(session, history)
             center_round += 1
             session.center_rounds = center_round
 
-            tools_restricted = session.tools_restricted
-
-            context = {
-                "demand": session.demand,
-                "offers": [p.offer for p in session.participants if p.offer],
-                "llm_client": llm_client,
-                "participants": session.participants,
-                "round_number": center_round,
-                "history": history,
-                "tools_restricted": tools_restricted,
-            }
-
-            result = await center_skill.execute(context)
-            tool_calls = result.get("tool_calls", [])
-
-            if not tool_calls:
-                logger.warning("Center returned no tool calls, treating as output_plan")
-                session.plan_output = result.get("content", "")
-                break
-
-            for tool_call in tool_calls:
-                tool_name = tool_call.get("name")
-                tool_args = tool_call.get("arguments", {})
+            with self._span(session, "center_round", round=center_round):
+                context = self._center_context(
+                    session, llm_client, center_round, [p.offer for p in session.participants if p.offer],
+                )
 
-                await self._push_event(
-                    center_tool_call(
-                        negotiation_id=session.negotiation_id,
-                        tool_name=tool_name,
-                        tool_args=tool_args,
-                        round_number=center_round,
+                result = await self._take_speculation(session) if center_round == 1 else None
+                if result is None:
+                    result = await asyncio.wait_for(
+                        self._scheduled(
+                            session, Priority.CENTER, PROVIDER_PLATFORM,
+                            lambda: center_skill.execute(context),
+                        ),
+                        timeout=self._remaining(session, None),
+                    )
+                tool_calls = result.get("tool_calls", [])
+
+                if not tool_calls:
+                    logger.warning("Center returned no tool calls, treating as output_plan")
+                    session.plan_output = result.get("content", "")
+                    break
+
+                plan_call = None
+                work_calls = []
+                for tool_call in tool_calls:
+                    await self._push_event(
+                        center_tool_call(
+                            negotiation_id=session.negotiation_id,
+                            tool_name=tool_call.get("name"),
+                            tool_args=tool_call.get("arguments", {}),
+                            round_number=center_round,
+                        )
+                    )
+                    if tool_call.get("name") == "output_plan":
+                        plan_call = tool_call
+                        break
+                    work_calls.append(tool_call)
+
+                sub_demands = sum(1 for c in work_calls if c.get("name") == "create_sub_demand")
+                if sub_demands and session.negotiation_id in self._session_runs:
+                    self._session_runs[session.negotiation_id]["sub_demand_batch"] = _EncodeBatch(
+                        self._encoder, sub_demands, self._tool_concurrency
                     )
-                )
 
-                if tool_name == "output_plan":
-                    session.plan_output = tool_args.get("plan_text", "")
+                semaphore = asyncio.Semaphore(self._tool_concurrency)
+                try:
+                    round_entries = await asyncio.gather(*(
+                        self._run_tool_call(
+                            session, tool_call, semaphore, adapter, llm_client, center_skill,
+                            sub_negotiation_skill, gap_recursion_skill, register_session, display_names,
+                        )
+                        for tool_call in work_calls
+                    ))
+                finally:
+                    batch = self._session_runs.get(session.negotiation_id, {}).pop("sub_demand_batch", None)
+                    if batch is not None:
+                        await batch.close()
+                for entries in round_entries:
+                    history.extend(entries)
+
+                if plan_call is not None:
+                    session.plan_output = plan_call.get("arguments", {}).get("plan_text", "")
                     await self._transition_state(session, NegotiationState.COMPLETED)
                     return
 
-                elif tool_name == "ask_agent":
-                    await self._handle_ask_agent(session, tool_args, adapter, center_skill, display_names, history)
-
-                elif tool_name == "start_discovery" and sub_negotiation_skill:
-                    await self._handle_start_discovery(session, tool_args, llm_client, sub_negotiation_skill, history)
-
-                elif tool_name == "create_sub_demand" and gap_recursion_skill:
-                    sub_session = await self._handle_create_sub_demand(
-                        session, tool_args, adapter, llm_client, center_skill,
-                        sub_negotiation_skill, gap_recursion_skill, register_session, display_names, history
-                    )
-
-                elif tool_name in self._tool_handlers:
-                    handler = self._tool_handlers[tool_name]
-                    handler_result = await handler.handle(
-                        session, tool_args, {
-                            "adapter": adapter,
-                            "llm_client": llm_client,
-                            "display_names": display_names,
-                            "neg_context": {
-                                "center_skill": center_skill,
-                                "sub_negotiation_skill": sub_negotiation_skill,
-                                "gap_recursion_skill": gap_recursion_skill,
-                            },
-                            "engine": self,
-                        }
-                    )
-                    history.append({
-                        "type": "custom_tool",
-                        "tool": tool_name,
-                        "args": tool_args,
-                        "result": handler_result,
-                    })
+            # Re-entering SYNTHESIZING checkpoints the finished round and its history.
+            await self._transition_state(session, NegotiationState.SYNTHESIZING)
 
         if not session.plan_output:
             session.plan_output = "No plan generated. Center exhausted rounds without calling output_plan."
@@ -408,6 +1240,187 @@ class NegotiationEngine:
 
         await self._transition_state(session, NegotiationState.COMPLETED)
 
+    @staticmethod
+    def _center_context(
+        session: NegotiationSession,
+        llm_client: PlatformLLMClient,
+        round_number: int,
+        offers: list[Offer],
+    ) -> dict[str, Any]:
+        return {
+            "demand": session.demand,
+            "offers": offers,
+            "llm_client": llm_client,
+            "participants": session.participants,
+            "round_number": round_number,
+            "history": session.event_history,
+            # session.tools_restricted for the round being asked, even before it starts.
+            "tools_restricted": round_number >= session.max_center_rounds,
+        }
+
+    async def _speculative_round(
+        self,
+        session: NegotiationSession,
+        llm_client: PlatformLLMClient,
+        center_skill: Skill,
+        offers: list[Offer],
+    ) -> dict[str, Any]:
+        self._speculative_rounds += 1
+        # Same request as the real round 1; only the offer set differs.
+        context = self._center_context(session, llm_client, 1, offers)
+        with self._span(session, "center_round", round=1, speculative=True, offers=len(offers)):
+            return await asyncio.wait_for(
+                self._scheduled(
+                    session, Priority.CENTER, PROVIDER_PLATFORM,
+                    lambda: center_skill.execute(context),
+                ),
+                timeout=self._remaining(session, None),
+            )
+
+    async def _take_speculation(self, session: NegotiationSession) -> Optional[dict[str, Any]]:
+        """The speculative round-1 result, or None if it failed or late offers changed the picture."""
+        run = self._session_runs.get(session.negotiation_id, {})
+        run.pop("speculate", None)
+        speculation = run.pop("speculation", None)
+        if speculation is None:
+            return None
+        task, used_ids = speculation
+        try:
+            result = await asyncio.wait_for(task, timeout=self._remaining(session, None))
+        except asyncio.TimeoutError:
+            raise
+        except Exception as e:
+            logger.warning(f"Speculative center round failed for {session.negotiation_id}: {e}")
+            return None
+
+        used = [p.offer for p in session.participants if p.offer and p.agent_id in used_ids]
+        late = [p.offer for p in session.participants if p.offer and p.agent_id not in used_ids]
+        reason = await self._late_offers_material(used, late)
+        session.metadata["speculation"] = {
+            "used_offers": len(used),
+            "late_offers": len(late),
+            "kept": reason is None,
+            "rerun_reason": reason,
+        }
+        if reason is not None:
+            logger.info(f"Re-running center round 1 for {session.negotiation_id}: {reason}")
+            return None
+        self._speculation_kept += 1
+        return result
+
+    async def _late_offers_material(self, used: list[Offer], late: list[Offer]) -> Optional[str]:
+        if not late:
+            return None
+        policy = self._speculation
+        covered = {c.casefold() for offer in used for c in offer.capabilities}
+        added = {c.casefold() for offer in late for c in offer.capabilities} - covered
+        if len(added) >= policy.min_new_capabilities:
+            return "capability_coverage"
+
+        used_texts = [o.content for o in used if o.content and o.content.strip()]
+        late_texts = [o.content for o in late if o.content and o.content.strip()]
+        if not late_texts:
+            return None
+        if not used_texts:
+            return "embedding_distance"
+        try:
+            vectors = await self._encoder.batch_encode(used_texts + late_texts)
+        except Exception as e:
+            # The check must never fail the run; re-running round 1 is always safe.
+            logger.warning(f"Could not compare late offers, re-running center round 1: {e}")
+            return "comparison_failed"
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms < 1e-10, 1.0, norms)
+        similarity = matrix[len(used_texts):] @ matrix[:len(used_texts)].T
+        if float(similarity.max(axis=1).min()) < policy.novelty_similarity:
+            return "embedding_distance"
+        return None
+
+    async def _discard_speculation(self, session: NegotiationSession) -> None:
+        speculation = self._session_runs.get(session.negotiation_id, {}).pop("speculation", None)
+        if speculation is None:
+            return
+        task = speculation[0]
+        if not task.done():
+            task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    async def _run_tool_call(
+        self,
+        session: NegotiationSession,
+        tool_call: dict[str, Any],
+        semaphore: asyncio.Semaphore,
+        adapter: ProfileDataSource,
+        llm_client: PlatformLLMClient,
+        center_skill: Skill,
+        sub_negotiation_skill: Optional[Skill],
+        gap_recursion_skill: Optional[Skill],
+        register_session: Optional[Callable[[NegotiationSession], None]],
+        display_names: dict[str, str],
+    ) -> list[dict[str, Any]]:
+        tool_name = tool_call.get("name")
+        tool_args = tool_call.get("arguments", {})
+        entries: list[dict[str, Any]] = []
+
+        async def dispatch() -> None:
+            if tool_name == "ask_agent":
+                await self._handle_ask_agent(session, tool_args, adapter, center_skill, display_names, entries)
+
+            elif tool_name == "start_discovery" and sub_negotiation_skill:
+                await self._handle_start_discovery(session, tool_args, llm_client, sub_negotiation_skill, entries)
+
+            elif tool_name == "create_sub_demand" and gap_recursion_skill:
+                await self._handle_create_sub_demand(
+                    session, tool_args, adapter, llm_client, center_skill,
+                    sub_negotiation_skill, gap_recursion_skill, register_session, display_names, entries
+                )
+
+            elif tool_name in self._tool_handlers:
+                handler = self._tool_handlers[tool_name]
+                handler_result = await handler.handle(
+                    session, tool_args, {
+                        "adapter": adapter,
+                        "llm_client": llm_client,
+                        "display_names": display_names,
+                        "neg_context": {
+                            "center_skill": center_skill,
+                            "sub_negotiation_skill": sub_negotiation_skill,
+                            "gap_recursion_skill": gap_recursion_skill,
+                        },
+                        "engine": self,
+                    }
+                )
+                entries.append({
+                    "type": "custom_tool",
+                    "tool": tool_name,
+                    "args": tool_args,
+                    "result": handler_result,
+                })
+
+        timeout = self._remaining(session, self._tool_timeouts.get(tool_name, self._tool_timeout))
+        with self._span(session, "tool_call", tool=tool_name):
+            async with semaphore:
+                try:
+                    await asyncio.wait_for(dispatch(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Tool {tool_name} timed out after {timeout}s in {session.negotiation_id}")
+                    entries.append({
+                        "type": "tool_timeout",
+                        "tool": tool_name,
+                        "args": tool_args,
+                        "result": f"[Timeout after {timeout:.3g}s]",
+                    })
+                except Exception as e:
+                    logger.error(f"Tool {tool_name} failed in {session.negotiation_id}: {e}")
+                    entries.append({
+                        "type": "tool_error",
+                        "tool": tool_name,
+                        "args": tool_args,
+                        "result": f"[Error: {e}]",
+                    })
+        return entries
+
     async def _handle_ask_agent(
         self,
         session: NegotiationSession,
@@ -420,16 +1433,18 @@ class NegotiationEngine:
         agent_id = tool_args.get("agent_id")
         question = tool_args.get("question", "")
 
-        participant = next((p for p in session.participants if p.agent_id == agent_id), None)
+        participant = session.get_participant(agent_id)
         if not participant:
             logger.warning(f"Agent {agent_id} not found in participants")
             return
 
         try:
-            profile = await adapter.get_profile(agent_id)
-            response = await adapter.chat(
-                agent_id,
-                [{"role": "user", "content": question}],
+            response = await self._scheduled(
+                session, Priority.CENTER, PROVIDER_AGENT,
+                lambda: adapter.chat(
+                    agent_id,
+                    [{"role": "user", "content": question}],
+                ),
             )
 
             history.append({
@@ -460,30 +1475,35 @@ class NegotiationEngine:
         agent_b_id = tool_args.get("agent_b")
         reason = tool_args.get("reason", "")
 
-        participant_a = next((p for p in session.participants if p.agent_id == agent_a_id), None)
-        participant_b = next((p for p in session.participants if p.agent_id == agent_b_id), None)
+        participant_a = session.get_participant(agent_a_id)
+        participant_b = session.get_participant(agent_b_id)
 
         if not participant_a or not participant_b:
             logger.warning(f"One or both agents not found for discovery")
             return
 
         try:
-            result = await sub_negotiation_skill.execute({
+            profiles = self._session_profiles.get(session.negotiation_id, {})
+            discovery_context = {
                 "agent_a": {
                     "agent_id": participant_a.agent_id,
                     "display_name": participant_a.display_name,
                     "offer": participant_a.offer.content if participant_a.offer else None,
-                    "profile": {},
+                    "profile": profiles.get(participant_a.agent_id, {}),
                 },
                 "agent_b": {
                     "agent_id": participant_b.agent_id,
                     "display_name": participant_b.display_name,
                     "offer": participant_b.offer.content if participant_b.offer else None,
-                    "profile": {},
+                    "profile": profiles.get(participant_b.agent_id, {}),
                 },
                 "reason": reason,
                 "llm_client": llm_client,
-            })
+            }
+            result = await self._scheduled(
+                session, Priority.DISCOVERY, PROVIDER_PLATFORM,
+                lambda: sub_negotiation_skill.execute(discovery_context),
+            )
 
             history.append({
                 "type": "discovery",
@@ -509,30 +1529,48 @@ class NegotiationEngine:
         display_names: dict[str, str],
         history: list[dict[str, Any]],
     ) -> Optional[NegotiationSession]:
-        if session.depth >= 1:
-            logger.warning("Max recursion depth reached, cannot create sub-demand")
-            return None
-
-        gap_description = tool_args.get("gap_description", "")
+        run = self._session_runs.get(session.negotiation_id, {})
+        batch: Optional[_EncodeBatch] = run.get("sub_demand_batch")
+        submitted = False
 
         try:
-            result = await gap_recursion_skill.execute({
-                "gap_description": gap_description,
-                "demand_context": session.demand.formatted_text or session.demand.raw_intent,
-                "llm_client": llm_client,
-            })
+            if session.depth >= 1:
+                logger.warning("Max recursion depth reached, cannot create sub-demand")
+                return None
+
+            gap_description = tool_args.get("gap_description", "")
+
+            result = await self._scheduled(
+                session, Priority.DISCOVERY, PROVIDER_PLATFORM,
+                lambda: gap_recursion_skill.execute({
+                    "gap_description": gap_description,
+                    "demand_context": session.demand.formulated_text or session.demand.raw_intent,
+                    "llm_client": llm_client,
+                }),
+            )
 
             sub_demand_text = result.get("sub_demand_text", gap_description)
 
+            submitted = True
+            if batch is not None:
+                demand_vector = await batch.encode(sub_demand_text)
+            else:
+                demand_vector = await self._encoder.encode(sub_demand_text)
+
             sub_session = NegotiationSession(
                 negotiation_id=generate_id("sub"),
                 demand=DemandSnapshot(
                     raw_intent=sub_demand_text,
+                    formulated_text=sub_demand_text,
                     user_id=session.demand.user_id,
                     scene_id=session.demand.scene_id,
                 ),
                 parent_negotiation_id=session.negotiation_id,
                 depth=session.depth + 1,
+                metadata={
+                    "exclude_agent_ids": [p.agent_id for p in session.participants],
+                    **({"batch": True} if session.metadata.get("batch") else {}),
+                },
             )
 
             if register_session:
@@ -555,24 +1593,107 @@ class NegotiationEngine:
                 "result": result,
             })
 
-            try:
-                await self.start_negotiation(
+            self._spawn_sub_negotiation(
+                session,
+                sub_session,
+                self.start_negotiation(
                     session=sub_session,
                     adapter=adapter,
                     llm_client=llm_client,
                     center_skill=center_skill,
+                    offer_skill=run.get("offer_skill"),
                     sub_negotiation_skill=sub_negotiation_skill,
                     gap_recursion_skill=gap_recursion_skill,
-                    agent_vectors={},
-                    k_star=0,
+                    agent_vectors=run.get("agent_vectors", {}),
+                    k_star=run.get("k_star", 0),
                     agent_display_names=display_names,
                     register_session=register_session,
-                )
-            except Exception as e:
-                logger.error(f"Sub-negotiation failed: {e}")
+                    demand_vector=demand_vector,
+                    deadline=run.get("deadline"),
+                ),
+            )
 
             return sub_session
 
         except Exception as e:
             logger.error(f"create_sub_demand failed: {e}")
             return None
+        finally:
+            if batch is not None and not submitted:
+                batch.withdraw()
+
+    def _spawn_sub_negotiation(
+        self,
+        session: NegotiationSession,
+        sub_session: NegotiationSession,
+        run: Any,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        children = self._child_tasks.setdefault(session.negotiation_id, {})
+        if not children:
+            self._child_deadlines[session.negotiation_id] = loop.time() + self._sub_negotiation_budget
+        task = asyncio.create_task(run)
+        children[task] = sub_session
+        if session.trace is not None:
+            trace = session.trace
+            span = trace.start_span("sub_negotiation", sub_session_id=sub_session.negotiation_id)
+            task.add_done_callback(lambda _: trace.end_span(span))
+
+    async def _join_sub_negotiations(
+        self,
+        session: NegotiationSession,
+        history: list[dict[str, Any]],
+    ) -> None:
+        children = self._child_tasks.pop(session.negotiation_id, None)
+        deadline = self._child_deadlines.pop(session.negotiation_id, None)
+        if not children:
+            return
+
+        timeout = self._remaining(session, max(0.0, deadline - asyncio.get_running_loop().time()))
+        try:
+            _, pending = await asyncio.wait(children, timeout=timeout)
+        except asyncio.CancelledError:
+            for task in children:
+                task.cancel()
+            raise
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning(
+                f"Cancelled {len(pending)} sub-negotiations of {session.negotiation_id} "
+                f"after {self._sub_negotiation_budget}s budget"
+            )
+
+        for task, sub_session in children.items():
+            entry = {
+                "type": "sub_negotiation_result",
+                "sub_session_id": sub_session.negotiation_id,
+                "state": sub_session.state.value,
+                "plan": sub_session.plan_output,
+            }
+            if task in pending:
+                entry["type"] = "sub_negotiation_timeout"
+                entry["result"] = f"[Timeout after {self._sub_negotiation_budget}s]"
+            elif task.cancelled():
+                # Cancelled on its own (e.g. cancel_negotiation on the sub-session).
+                entry["type"] = "sub_negotiation_cancelled"
+                entry["result"] = "[Cancelled]"
+            elif task.exception() is not None:
+                logger.error(f"Sub-negotiation {sub_session.negotiation_id} failed: {task.exception()}")
+                entry["type"] = "sub_negotiation_error"
+                entry["result"] = f"[Error: {task.exception()}]"
+            history.append(entry)
+
+    async def _cancel_sub_negotiations(self, session: NegotiationSession) -> None:
+        children = self._child_tasks.pop(session.negotiation_id, {})
+        self._child_deadlines.pop(session.negotiation_id, None)
+        pending = [t for t in children if not t.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.info(f"Cancelled {len(pending)} sub-negotiations of {session.negotiation_id}")
+        for task in children:
+            if task.done() and not task.cancelled() and task.exception() is not None:
+                logger.error(f"Sub-negotiation of {session.negotiation_id} failed: {task.exception()}")
@@ -70,16 +70,20 @@ def offer_received(
     display_name: str,
     content: str,
     capabilities: list[str] | None = None,
+    offer_cache: dict[str, Any] | None = None,
 ) -> NegotiationEvent:
+    data = {
+        "agent_id": agent_id,
+        "display_name": display_name,
+        "content": content,
+        "capabilities": capabilities or [],
+    }
+    if offer_cache is not None:
+        data["offer_cache"] = offer_cache
     return NegotiationEvent(
         event_type=EventType.OFFER_RECEIVED,
         negotiation_id=negotiation_id,
-        data={
-            "agent_id": agent_id,
-            "display_name": display_name,
-            "content": content,
-            "capabilities": capabilities or [],
-        },
+        data=data,
     )
 
 def barrier_complete(
@@ -87,6 +91,9 @@ def barrier_complete(
     total_participants: int,
     offers_received: int,
     exited_count: int,
+    reason: str = "all_settled",
+    pending_count: int = 0,
+    policy: dict[str, Any] | None = None,
 ) -> NegotiationEvent:
     return NegotiationEvent(
         event_type=EventType.BARRIER_COMPLETE,
@@ -95,6 +102,9 @@ def barrier_complete(
             "total_participants": total_participants,
             "offers_received": offers_received,
             "exited_count": exited_count,
+            "reason": reason,
+            "pending_count": pending_count,
+            "policy": policy or {},
         },
     )
 
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any, Optional
+
+class LatencyTracker:
+    """Sliding-window latency samples per key, e.g. ``agent:<id>`` or ``provider:<name>``."""
+
+    def __init__(self, window: int = 200):
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, key: str, seconds: float) -> None:
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self._window)
+        samples.append(seconds)
+
+    def count(self, key: str) -> int:
+        return len(self._samples.get(key, ()))
+
+    def percentile(self, key: str, q: float, min_samples: int = 1) -> Optional[float]:
+        samples = self._samples.get(key)
+        if not samples or len(samples) < max(1, min_samples):
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+        return ordered[index]
+
+    def snapshot(self, q: float = 0.95) -> dict[str, Any]:
+        return {
+            key: {"count": len(samples), f"p{round(q * 100)}_ms": self.percentile(key, q) * 1000}
+            for key, samples in self._samples.items()
+        }
+
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+class PhaseHistograms:
+    """Cumulative fixed-bucket latency histograms per negotiation phase."""
+
+    def __init__(self, buckets_ms: tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self._buckets = tuple(sorted(buckets_ms))
+        self._counts: dict[str, list[int]] = {}
+        self._sums: dict[str, float] = {}
+
+    def observe(self, phase: str, duration_ms: float) -> None:
+        counts = self._counts.get(phase)
+        if counts is None:
+            counts = self._counts[phase] = [0] * (len(self._buckets) + 1)
+            self._sums[phase] = 0.0
+        index = next((i for i, b in enumerate(self._buckets) if duration_ms <= b), len(self._buckets))
+        counts[index] += 1
+        self._sums[phase] += duration_ms
+
+    def snapshot(self) -> dict[str, Any]:
+        result = {}
+        for phase, counts in self._counts.items():
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip((*self._buckets, "+Inf"), counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            result[phase] = {"count": cumulative, "sum_ms": self._sums[phase], "buckets": buckets}
+        return result
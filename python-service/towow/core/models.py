@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import time
 import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 def generate_id(prefix: str = "") -> str:
     uid = uuid.uuid4().hex[:12]
@@ -20,7 +23,7 @@ class SourceType(str, Enum):
     TEMPLATE = "template"
     CUSTOM = "custom"
 
-@dataclass
+@dataclass(slots=True)
 class AgentIdentity:
     agent_id: str
     display_name: str
@@ -39,7 +42,7 @@ class SceneStatus(str, Enum):
     ACTIVE = "active"
     ARCHIVED = "archived"
 
-@dataclass
+@dataclass(slots=True)
 class SceneDefinition:
     scene_id: str
     name: str
@@ -67,15 +70,48 @@ class AgentState(str, Enum):
     REPLIED = "replied"
     EXITED = "exited"
 
-@dataclass
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+def _parse_dt(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+@dataclass(slots=True)
 class AgentParticipant:
     agent_id: str
     display_name: str
     resonance_score: float = 0.0
     state: AgentState = AgentState.ACTIVE
     offer: Optional[Offer] = None
+    _session: Optional[NegotiationSession] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in ("state", "offer"):
+            session = getattr(self, "_session", None)
+            if session is not None:
+                session._participant_changed(self, name, getattr(self, name), value)
+        object.__setattr__(self, name, value)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "agent_id": self.agent_id,
+            "display_name": self.display_name,
+            "resonance_score": self.resonance_score,
+            "state": self.state.value,
+            "offer": self.offer.to_dict() if self.offer else None,
+        }
 
-@dataclass
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> AgentParticipant:
+        return cls(
+            agent_id=data["agent_id"],
+            display_name=data["display_name"],
+            resonance_score=data.get("resonance_score", 0.0),
+            state=AgentState(data.get("state", AgentState.ACTIVE.value)),
+            offer=Offer.from_dict(data["offer"]) if data.get("offer") else None,
+        )
+
+@dataclass(slots=True)
 class Offer:
     agent_id: str
     content: str
@@ -84,7 +120,28 @@ class Offer:
     metadata: dict[str, Any] = field(default_factory=dict)
     created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
 
-@dataclass
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "agent_id": self.agent_id,
+            "content": self.content,
+            "capabilities": list(self.capabilities),
+            "confidence": self.confidence,
+            "metadata": self.metadata,
+            "created_at": _iso(self.created_at),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Offer:
+        return cls(
+            agent_id=data["agent_id"],
+            content=data.get("content", ""),
+            capabilities=list(data.get("capabilities", [])),
+            confidence=data.get("confidence", 0.0),
+            metadata=data.get("metadata", {}),
+            created_at=_parse_dt(data.get("created_at")) or datetime.now(timezone.utc),
+        )
+
+@dataclass(slots=True)
 class DemandSnapshot:
     raw_intent: str
     formulated_text: Optional[str] = None
@@ -92,7 +149,26 @@ class DemandSnapshot:
     scene_id: Optional[str] = None
     metadata: dict[str, Any] = field(default_factory=dict)
 
-@dataclass
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "raw_intent": self.raw_intent,
+            "formulated_text": self.formulated_text,
+            "user_id": self.user_id,
+            "scene_id": self.scene_id,
+            "metadata": self.metadata,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> DemandSnapshot:
+        return cls(
+            raw_intent=data["raw_intent"],
+            formulated_text=data.get("formulated_text"),
+            user_id=data.get("user_id"),
+            scene_id=data.get("scene_id"),
+            metadata=data.get("metadata", {}),
+        )
+
+@dataclass(slots=True)
 class NegotiationSession:
     negotiation_id: str
     demand: DemandSnapshot
@@ -110,30 +186,150 @@ class NegotiationSession:
     event_history: list[dict[str, Any]] = field(default_factory=list)
     metadata: dict[str, Any] = field(default_factory=dict)
 
+    # Participant index and counters, kept in step by add_participant and by
+    # AgentParticipant.__setattr__; rebuilt if `participants` is replaced.
+    _index: dict[str, AgentParticipant] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _indexed: Optional[list[AgentParticipant]] = field(default=None, init=False, repr=False, compare=False)
+    _indexed_len: int = field(default=0, init=False, repr=False, compare=False)
+    _replied: int = field(default=0, init=False, repr=False, compare=False)
+    _exited: int = field(default=0, init=False, repr=False, compare=False)
+    _offers: int = field(default=0, init=False, repr=False, compare=False)
+    # Cached views, dropped whenever a participant, state or offer changes.
+    _offer_list: Optional[list[Offer]] = field(default=None, init=False, repr=False, compare=False)
+    _active_list: Optional[list[AgentParticipant]] = field(default=None, init=False, repr=False, compare=False)
+
+    def _sync(self) -> None:
+        if self._indexed is self.participants and self._indexed_len == len(self.participants):
+            return
+        self._index = {}
+        self._replied = self._exited = self._offers = 0
+        self._offer_list = self._active_list = None
+        for participant in self.participants:
+            self._track(participant)
+        self._indexed = self.participants
+        self._indexed_len = len(self.participants)
+
+    def _track(self, participant: AgentParticipant) -> None:
+        participant._session = self
+        self._offer_list = self._active_list = None
+        self._index[participant.agent_id] = participant
+        self._count(participant.state, 1)
+        if participant.offer is not None:
+            self._offers += 1
+
+    def _count(self, state: AgentState, delta: int) -> None:
+        if state == AgentState.REPLIED:
+            self._replied += delta
+        elif state == AgentState.EXITED:
+            self._exited += delta
+
+    def _participant_changed(
+        self, participant: AgentParticipant, name: str, old: Any, new: Any
+    ) -> None:
+        if self._index.get(participant.agent_id) is not participant:
+            return
+        if name == "state":
+            self._count(old, -1)
+            self._count(new, 1)
+            self._active_list = None
+        else:
+            self._offers += (new is not None) - (old is not None)
+            self._offer_list = None
+
+    def add_participant(self, participant: AgentParticipant) -> None:
+        self._sync()
+        self.participants.append(participant)
+        self._track(participant)
+        self._indexed_len += 1
+
+    def get_participant(self, agent_id: str) -> Optional[AgentParticipant]:
+        self._sync()
+        return self._index.get(agent_id)
+
+    @property
+    def replied_count(self) -> int:
+        self._sync()
+        return self._replied
+
+    @property
+    def exited_count(self) -> int:
+        self._sync()
+        return self._exited
+
+    @property
+    def offer_count(self) -> int:
+        self._sync()
+        return self._offers
+
+    # The list properties below return cached lists; treat them as read-only.
+
     @property
     def active_participants(self) -> list[AgentParticipant]:
-        return [p for p in self.participants if p.state == AgentState.ACTIVE]
+        self._sync()
+        if self._active_list is None:
+            self._active_list = [p for p in self.participants if p.state == AgentState.ACTIVE]
+        return self._active_list
 
     @property
     def pending_participants(self) -> list[AgentParticipant]:
-        return [p for p in self.participants if p.state == AgentState.ACTIVE]
+        return self.active_participants
 
     @property
     def collected_offers(self) -> list[Offer]:
-        return [p.offer for p in self.participants if p.offer is not None]
+        self._sync()
+        if self._offer_list is None:
+            self._offer_list = [p.offer for p in self.participants if p.offer is not None]
+        return self._offer_list
 
     @property
     def is_barrier_met(self) -> bool:
-        return all(
-            p.state in (AgentState.REPLIED, AgentState.EXITED)
-            for p in self.participants
-        )
+        self._sync()
+        return self._replied + self._exited == len(self.participants)
 
     @property
     def tools_restricted(self) -> bool:
         return self.center_rounds >= self.max_center_rounds
 
-@dataclass
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "negotiation_id": self.negotiation_id,
+            "demand": self.demand.to_dict(),
+            "state": self.state.value,
+            "participants": [p.to_dict() for p in self.participants],
+            "center_rounds": self.center_rounds,
+            "max_center_rounds": self.max_center_rounds,
+            "plan_output": self.plan_output,
+            "parent_negotiation_id": self.parent_negotiation_id,
+            "depth": self.depth,
+            "sub_session_ids": list(self.sub_session_ids),
+            "trace": self.trace.to_dict() if self.trace else None,
+            "created_at": _iso(self.created_at),
+            "completed_at": _iso(self.completed_at),
+            "event_history": self.event_history,
+            "metadata": self.metadata,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> NegotiationSession:
+        return cls(
+            negotiation_id=data["negotiation_id"],
+            demand=DemandSnapshot.from_dict(data["demand"]),
+            state=NegotiationState(data.get("state", NegotiationState.CREATED.value)),
+            participants=[AgentParticipant.from_dict(p) for p in data.get("participants", [])],
+            center_rounds=data.get("center_rounds", 0),
+            max_center_rounds=data.get("max_center_rounds", 2),
+            plan_output=data.get("plan_output"),
+            parent_negotiation_id=data.get("parent_negotiation_id"),
+            depth=data.get("depth", 0),
+            sub_session_ids=list(data.get("sub_session_ids", [])),
+            trace=TraceChain.from_dict(data["trace"]) if data.get("trace") else None,
+            created_at=_parse_dt(data.get("created_at")) or datetime.now(timezone.utc),
+            completed_at=_parse_dt(data.get("completed_at")),
+            event_history=data.get("event_history", []),
+            metadata=data.get("metadata", {}),
+        )
+
+@dataclass(slots=True)
 class TraceEntry:
     step: str
     timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
@@ -141,24 +337,78 @@ class TraceEntry:
     input_summary: Optional[str] = None
     output_summary: Optional[str] = None
     metadata: dict[str, Any] = field(default_factory=dict)
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    parent_id: Optional[str] = None
+    start_ms: Optional[float] = None
 
-@dataclass
+# (negotiation_id, span_id) of the innermost open span in the current task
+_current_span: ContextVar[Optional[tuple[str, str]]] = ContextVar("towow_current_span", default=None)
+
+@dataclass(slots=True)
 class TraceChain:
     negotiation_id: str
     entries: list[TraceEntry] = field(default_factory=list)
     started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     completed_at: Optional[datetime] = None
+    # Entries already fed into phase histograms, so a resumed run doesn't count them twice.
+    observed: int = 0
+    _origin: float = field(default_factory=time.monotonic, repr=False, compare=False)
 
     def add_entry(self, step: str, **kwargs) -> TraceEntry:
         entry = TraceEntry(step=step, **kwargs)
         self.entries.append(entry)
         return entry
 
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self._origin) * 1000
+
+    def start_span(self, step: str, **metadata: Any) -> TraceEntry:
+        current = _current_span.get()
+        parent_id = current[1] if current and current[0] == self.negotiation_id else None
+        return self.add_entry(step, start_ms=self.elapsed_ms(), parent_id=parent_id, metadata=metadata)
+
+    def end_span(self, entry: TraceEntry) -> None:
+        if entry.duration_ms is None and entry.start_ms is not None:
+            entry.duration_ms = self.elapsed_ms() - entry.start_ms
+
+    @contextmanager
+    def span(self, step: str, **metadata: Any) -> Iterator[TraceEntry]:
+        entry = self.start_span(step, **metadata)
+        token = _current_span.set((self.negotiation_id, entry.span_id))
+        try:
+            yield entry
+        except BaseException as e:
+            entry.metadata["error"] = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(entry)
+
+    def complete(self) -> None:
+        self.completed_at = self.started_at + timedelta(milliseconds=self.elapsed_ms())
+
+    def summary(self) -> dict[str, Any]:
+        phases: dict[str, dict[str, Any]] = {}
+        for e in self.entries:
+            if e.duration_ms is None:
+                continue
+            phase = phases.setdefault(e.step, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            phase["count"] += 1
+            phase["total_ms"] += e.duration_ms
+            phase["max_ms"] = max(phase["max_ms"], e.duration_ms)
+        root = next((e for e in self.entries if e.parent_id is None and e.step == "negotiation"), None)
+        return {
+            "total_ms": root.duration_ms if root else None,
+            "span_count": len(self.entries),
+            "phases": phases,
+        }
+
     def to_dict(self) -> dict[str, Any]:
         return {
             "negotiation_id": self.negotiation_id,
             "started_at": self.started_at.isoformat(),
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "observed": self.observed,
             "entries": [
                 {
                     "step": e.step,
@@ -167,7 +417,38 @@ class TraceChain:
                     "input_summary": e.input_summary,
                     "output_summary": e.output_summary,
                     "metadata": e.metadata,
+                    "span_id": e.span_id,
+                    "parent_id": e.parent_id,
+                    "start_ms": e.start_ms,
                 }
                 for e in self.entries
             ],
         }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> TraceChain:
+        now = datetime.now(timezone.utc)
+        started_at = _parse_dt(data.get("started_at")) or now
+        return cls(
+            negotiation_id=data["negotiation_id"],
+            started_at=started_at,
+            completed_at=_parse_dt(data.get("completed_at")),
+            observed=data.get("observed", 0),
+            # Keep measuring from the original start, so spans added after a resume
+            # land at their wall-clock offset instead of restarting from zero.
+            _origin=time.monotonic() - (now - started_at).total_seconds(),
+            entries=[
+                TraceEntry(
+                    step=e["step"],
+                    timestamp=_parse_dt(e.get("timestamp")) or datetime.now(timezone.utc),
+                    duration_ms=e.get("duration_ms"),
+                    input_summary=e.get("input_summary"),
+                    output_summary=e.get("output_summary"),
+                    metadata=e.get("metadata", {}),
+                    span_id=e.get("span_id") or uuid.uuid4().hex[:8],
+                    parent_id=e.get("parent_id"),
+                    start_ms=e.get("start_ms"),
+                )
+                for e in data.get("entries", [])
+            ],
+        )
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Optional
+
+class ConfirmationMode(str, Enum):
+    AUTO = "auto"
+    WAIT = "wait"
+    REQUIRE = "require"
+
+class StragglerMode(str, Enum):
+    CANCEL = "cancel"
+    LATE = "late"
+
+@dataclass
+class BarrierPolicy:
+    min_offers: Optional[int] = None
+    min_fraction: Optional[float] = None
+    soft_deadline_s: Optional[float] = None
+    stragglers: StragglerMode = StragglerMode.CANCEL
+
+    def quorum(self, total: int) -> int:
+        targets = [total]
+        if self.min_offers is not None:
+            targets.append(max(1, self.min_offers))
+        if self.min_fraction is not None:
+            targets.append(max(1, math.ceil(total * self.min_fraction)))
+        return min(targets)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "min_offers": self.min_offers,
+            "min_fraction": self.min_fraction,
+            "soft_deadline_s": self.soft_deadline_s,
+            "stragglers": self.stragglers.value,
+        }
+
+@dataclass
+class HedgePolicy:
+    percentile: float = 0.95
+    min_samples: int = 5
+    min_delay_s: float = 0.5
+    max_hedge_ratio: float = 0.1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "percentile": self.percentile,
+            "min_samples": self.min_samples,
+            "min_delay_s": self.min_delay_s,
+            "max_hedge_ratio": self.max_hedge_ratio,
+        }
+
+@dataclass
+class SpeculationPolicy:
+    """Run center round 1 on a partial offer set while stragglers finish.
+
+    The speculative result is kept unless the offers that arrived afterwards
+    are materially different: they bring at least ``min_new_capabilities``
+    capabilities the partial set lacked, or one of them is less than
+    ``novelty_similarity`` (cosine) similar to every offer the round saw.
+    """
+    min_fraction: float = 0.6
+    min_new_capabilities: int = 1
+    novelty_similarity: float = 0.8
+
+    def quorum(self, total: int) -> int:
+        return max(1, math.ceil(total * self.min_fraction))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "min_fraction": self.min_fraction,
+            "min_new_capabilities": self.min_new_capabilities,
+            "novelty_similarity": self.novelty_similarity,
+        }
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, AsyncGenerator, Optional, Protocol, runtime_checkable
+from typing import Any, AsyncGenerator, AsyncIterator, Optional, Protocol, runtime_checkable
 
 import numpy as np
 
@@ -34,6 +34,16 @@ class ResonanceDetector(Protocol):
     ) -> list[tuple[str, float]]:
         ...
 
+@runtime_checkable
+class StreamingResonanceDetector(ResonanceDetector, Protocol):
+    def detect_stream(
+        self,
+        demand_vector: Vector,
+        agent_vectors: dict[str, Vector],
+        k_star: int,
+    ) -> AsyncIterator[tuple[str, float]]:
+        ...
+
 @runtime_checkable
 class ProfileDataSource(Protocol):
     async def get_profile(self, agent_id: str) -> dict[str, Any]:
@@ -55,6 +65,11 @@ class ProfileDataSource(Protocol):
     ) -> AsyncGenerator[str, None]:
         ...
 
+@runtime_checkable
+class BulkProfileDataSource(ProfileDataSource, Protocol):
+    async def get_profiles(self, agent_ids: list[str]) -> dict[str, dict[str, Any]]:
+        ...
+
 @runtime_checkable
 class PlatformLLMClient(Protocol):
     async def chat(
@@ -82,6 +97,11 @@ class EventPusher(Protocol):
     async def push_many(self, events: list[NegotiationEvent]) -> None:
         ...
 
+@runtime_checkable
+class CheckpointStore(Protocol):
+    async def checkpoint(self, session: NegotiationSession) -> None:
+        ...
+
 @runtime_checkable
 class CenterToolHandler(Protocol):
     @property
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PROVIDER_PLATFORM = "platform"
+PROVIDER_AGENT = "agent"
+
+class Priority(IntEnum):
+    CENTER = 0
+    FORMULATION = 1
+    DISCOVERY = 2
+    OFFER = 3
+
+class TokenBucket:
+    def __init__(self, rate_per_s: float, burst: Optional[int] = None):
+        if rate_per_s <= 0:
+            raise ValueError("rate_per_s must be positive")
+        self.rate = rate_per_s
+        self.capacity = float(burst if burst is not None else max(1, int(rate_per_s)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+@dataclass(order=True)
+class _Waiter:
+    sort_key: tuple[int, int, int]
+    provider: str = field(compare=False)
+    priority: Priority = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False, default_factory=time.monotonic)
+
+@dataclass
+class _ClassStats:
+    admitted: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+
+    def record(self, wait_ms: float) -> None:
+        self.admitted += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "admitted": self.admitted,
+            "avg_wait_ms": self.total_wait_ms / self.admitted if self.admitted else 0.0,
+            "max_wait_ms": self.max_wait_ms,
+        }
+
+class LLMScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        rate_limits: Optional[dict[str, tuple[float, int]]] = None,
+    ):
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        self._max_concurrency = max_concurrency
+        self._buckets = {
+            provider: TokenBucket(rate, burst)
+            for provider, (rate, burst) in (rate_limits or {}).items()
+        }
+        self._queue: list[_Waiter] = []
+        self._running = 0
+        self._seq = itertools.count()
+        self._retry_handle: Optional[asyncio.TimerHandle] = None
+        self._stats: dict[str, _ClassStats] = {}
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    async def run(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        priority: Priority = Priority.OFFER,
+        provider: str = PROVIDER_PLATFORM,
+        interactive: bool = True,
+    ) -> T:
+        await self._acquire(priority, provider, interactive)
+        try:
+            return await fn()
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: Priority, provider: str, interactive: bool) -> None:
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(
+            sort_key=(0 if interactive else 1, int(priority), next(self._seq)),
+            provider=provider,
+            priority=priority,
+            future=loop.create_future(),
+        )
+        bisect.insort(self._queue, waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release()
+            elif waiter in self._queue:
+                self._queue.remove(waiter)
+            raise
+
+    def _release(self) -> None:
+        self._running -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        retry_in: Optional[float] = None
+        index = 0
+        while self._running < self._max_concurrency and index < len(self._queue):
+            waiter = self._queue[index]
+            if waiter.future.done():
+                self._queue.pop(index)
+                continue
+            bucket = self._buckets.get(waiter.provider)
+            wait = bucket.try_acquire() if bucket else 0.0
+            if wait > 0:
+                retry_in = wait if retry_in is None else min(retry_in, wait)
+                index += 1
+                continue
+            self._queue.pop(index)
+            self._running += 1
+            wait_ms = (time.monotonic() - waiter.enqueued_at) * 1000
+            self._stats.setdefault(waiter.priority.name.lower(), _ClassStats()).record(wait_ms)
+            waiter.future.set_result(None)
+
+        if retry_in is not None and self._retry_handle is None:
+            loop = asyncio.get_running_loop()
+            self._retry_handle = loop.call_later(retry_in, self._on_retry)
+
+    def _on_retry(self) -> None:
+        self._retry_handle = None
+        self._dispatch()
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "max_concurrency": self._max_concurrency,
+            "running": self._running,
+            "queued": len(self._queue),
+            "queued_by_priority": {
+                p.name.lower(): sum(1 for w in self._queue if w.priority == p)
+                for p in Priority
+            },
+            "by_priority": {name: stats.to_dict() for name, stats in self._stats.items()},
+        }
@@ -1,2 +1,11 @@
 from towow.hdc.encoder import EmbeddingEncoder
 from towow.hdc.resonance import CosineResonanceDetector
+from towow.hdc.projection import (
+    PCAProjector,
+    ProjectedEncoder,
+    ProjectionReport,
+    RandomProjector,
+    create_projector,
+    load_projector,
+)
+from towow.hdc.pgvector import PgVectorResonanceDetector
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import asyncio
 import os
-from typing import Optional
+import threading
+import time
+from typing import Any, Optional
 
 import numpy as np
 
@@ -18,23 +20,118 @@ def _get_model(model_name: str):
     except Exception as e:
         raise EncodingError(f"Failed to load SentenceTransformer: {e}. Try using MockEmbeddingEncoder instead.")
 
+LENGTH_BUCKETS: tuple[tuple[Optional[int], int], ...] = (
+    (64, 128),
+    (256, 64),
+    (1024, 32),
+    (None, 16),
+)
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+def plan_length_buckets(
+    texts: list[str],
+    buckets: tuple[tuple[Optional[int], int], ...] = LENGTH_BUCKETS,
+) -> list[tuple[int, list[int]]]:
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    plan: list[tuple[int, list[int]]] = []
+    pos = 0
+    for max_len, batch_size in buckets:
+        members: list[int] = []
+        while pos < len(order) and (max_len is None or len(texts[order[pos]]) <= max_len):
+            members.append(order[pos])
+            pos += 1
+        if members:
+            plan.append((batch_size, members))
+    return plan
+
+def encode_bucketed(model: Any, texts: list[str]) -> np.ndarray:
+    normalized = [normalize_text(t) for t in texts]
+    unique: dict[str, int] = {}
+    positions = [unique.setdefault(t, len(unique)) for t in normalized]
+    unique_texts = list(unique)
+
+    result: Optional[np.ndarray] = None
+    for batch_size, members in plan_length_buckets(unique_texts):
+        vecs = np.asarray(
+            model.encode(
+                [unique_texts[i] for i in members],
+                batch_size=batch_size,
+                normalize_embeddings=True,
+            ),
+            dtype=np.float32,
+        )
+        if result is None:
+            result = np.empty((len(unique_texts), vecs.shape[1]), dtype=np.float32)
+        result[members] = vecs
+
+    if result is None:
+        return np.empty((0, 0), dtype=np.float32)
+    return result[positions]
+
 class EmbeddingEncoder:
     DEFAULT_MODEL = "all-MiniLM-L6-v2"
+    WARMUP_TEXTS = (
+        "我需要一个技术合伙人来开发AI产品",
+        "全栈开发专家，擅长Web应用、API设计、系统架构",
+        "Looking for a UI/UX designer to build a mobile app",
+        "Data analysis expert skilled in machine learning and visualization",
+    )
 
     def __init__(self, model_name: Optional[str] = None):
         self._model_name = model_name or self.DEFAULT_MODEL
         self._model = None
+        self._load_lock = threading.Lock()
+        self._ready = False
+        self._load_ms: Optional[float] = None
+        self._warmup_ms: Optional[float] = None
 
     @property
     def model(self):
         if self._model is None:
+            self._load_model()
+        return self._model
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready
+
+    def _load_model(self) -> None:
+        with self._load_lock:
+            if self._model is not None:
+                return
+            start = time.monotonic()
             try:
                 self._model = _get_model(self._model_name)
             except Exception as e:
                 raise EncodingError(
                     f"Failed to load model '{self._model_name}': {e}"
                 ) from e
-        return self._model
+            self._load_ms = (time.monotonic() - start) * 1000
+
+    async def warmup(self, texts: Optional[list[str]] = None) -> None:
+        samples = list(texts or self.WARMUP_TEXTS)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._load_model)
+        start = time.monotonic()
+        try:
+            await loop.run_in_executor(
+                None, lambda: self._model.encode(samples, normalize_embeddings=True)
+            )
+        except Exception as e:
+            raise EncodingError(f"Warmup failed: {e}") from e
+        self._warmup_ms = (time.monotonic() - start) * 1000
+        self._ready = True
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "model": self._model_name,
+            "loaded": self._model is not None,
+            "ready": self._ready,
+            "load_ms": self._load_ms,
+            "warmup_ms": self._warmup_ms,
+        }
 
     async def encode(self, text: str) -> Vector:
         if not text or not text.strip():
@@ -59,10 +156,9 @@ class EmbeddingEncoder:
         try:
             loop = asyncio.get_running_loop()
             vecs = await loop.run_in_executor(
-                None,
-                lambda: self.model.encode(texts, normalize_embeddings=True),
+                None, lambda: encode_bucketed(self.model, texts)
             )
-            return [np.asarray(v, dtype=np.float32) for v in vecs]
+            return list(vecs)
         except EncodingError:
             raise
         except Exception as e:
@@ -11,6 +11,16 @@ class MockEmbeddingEncoder:
         self._model_name = model_name or "mock_encoder"
         self._dimension = 768
 
+    @property
+    def is_ready(self) -> bool:
+        return True
+
+    async def warmup(self, texts: list[str] | None = None) -> None:
+        pass
+
+    def status(self) -> dict:
+        return {"model": self._model_name, "loaded": True, "ready": True}
+
     async def encode(self, text: str) -> Vector:
         if not text or not text.strip():
             raise EncodingError("Cannot encode empty text")
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import struct
+from typing import Any, AsyncIterator, Optional
+
+import numpy as np
+
+from towow.core.errors import ConfigError, EncodingError
+from towow.core.protocols import Vector
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_SPACE_TABLE = "towow_embedding_space"
+EMBEDDING_SPACE_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {EMBEDDING_SPACE_TABLE} (
+    table_name TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    dimension INTEGER NOT NULL,
+    projection TEXT,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+)
+"""
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$")
+_HEADER = struct.Struct(">HH")
+
+def encode_vector_binary(vector: Any) -> bytes:
+    arr = np.asarray(vector, dtype=">f4").ravel()
+    if arr.size == 0 or arr.size > 0xFFFF:
+        raise EncodingError(f"pgvector cannot store a vector of dimension {arr.size}")
+    return _HEADER.pack(arr.size, 0) + arr.tobytes()
+
+def decode_vector_binary(data: bytes) -> Vector:
+    dim, _ = _HEADER.unpack_from(data)
+    return np.frombuffer(data, dtype=">f4", count=dim, offset=_HEADER.size).astype(np.float32)
+
+def _check_identifier(name: str) -> str:
+    if not _IDENTIFIER.match(name):
+        raise ConfigError(f"Invalid SQL identifier: {name!r}")
+    return name
+
+class PgVectorResonanceDetector:
+    def __init__(
+        self,
+        dsn: str,
+        table: str = "agents",
+        id_column: str = "id",
+        vector_column: str = "profile_vector",
+        active_column: Optional[str] = "is_active",
+        min_pool_size: int = 1,
+        max_pool_size: int = 10,
+        command_timeout_s: float = 10.0,
+    ):
+        self._dsn = dsn
+        self._min_pool_size = min_pool_size
+        self._max_pool_size = max_pool_size
+        self._command_timeout = command_timeout_s
+        self._pool: Any = None
+        self._pool_lock = asyncio.Lock()
+
+        table = _check_identifier(table)
+        id_column = _check_identifier(id_column)
+        vector_column = _check_identifier(vector_column)
+        self._table = table
+        self._vector_column = vector_column
+        filters = [f"{vector_column} IS NOT NULL"]
+        if active_column:
+            filters.append(f"{_check_identifier(active_column)} = true")
+        where = " AND ".join(filters)
+        select = (
+            f"SELECT {id_column}::text AS agent_id, 1 - ({vector_column} <=> $1) AS score "
+            f"FROM {table} WHERE {where}"
+        )
+        order = f"ORDER BY {vector_column} <=> $1 LIMIT $2"
+        self._query = f"{select} {order}"
+        self._filtered_query = f"{select} AND {id_column}::text = ANY($3::text[]) {order}"
+
+    async def _init_connection(self, conn: Any) -> None:
+        await conn.set_type_codec(
+            "vector",
+            schema="public",
+            encoder=encode_vector_binary,
+            decoder=decode_vector_binary,
+            format="binary",
+        )
+
+    async def _get_pool(self) -> Any:
+        if self._pool is not None:
+            return self._pool
+        async with self._pool_lock:
+            if self._pool is None:
+                try:
+                    import asyncpg
+                except ImportError as exc:
+                    raise ConfigError("asyncpg is required for PgVectorResonanceDetector") from exc
+                self._pool = await asyncpg.create_pool(
+                    self._dsn,
+                    min_size=self._min_pool_size,
+                    max_size=self._max_pool_size,
+                    command_timeout=self._command_timeout,
+                    init=self._init_connection,
+                )
+                logger.info(
+                    "PgVectorResonanceDetector: pool ready (min=%d, max=%d)",
+                    self._min_pool_size,
+                    self._max_pool_size,
+                )
+        return self._pool
+
+    async def verify_embedding_space(
+        self,
+        model: str,
+        dimension: Optional[int] = None,
+        projection: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Check that stored vectors were written by ``model`` (and ``projection``).
+
+        agent_sync records the embedding space next to the vectors; querying
+        them from another model or dimension silently returns meaningless
+        neighbours, so a mismatch raises ConfigError.
+        """
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            row = None
+            if await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", EMBEDDING_SPACE_TABLE):
+                row = await conn.fetchrow(
+                    f"SELECT model, dimension, projection FROM {EMBEDDING_SPACE_TABLE} WHERE table_name = $1",
+                    self._table,
+                )
+            column_dim = await conn.fetchval(
+                "SELECT atttypmod FROM pg_attribute WHERE attrelid = to_regclass($1) AND attname = $2",
+                self._table,
+                self._vector_column,
+            )
+        if row is None:
+            raise ConfigError(
+                f"No embedding space recorded for table '{self._table}'; re-run agent_sync.py"
+            )
+
+        problems = []
+        if row["model"] != model:
+            problems.append(f"model {row['model']!r} != {model!r}")
+        if (row["projection"] or None) != (projection or None):
+            problems.append(f"projection {row['projection']!r} != {projection!r}")
+        if dimension is not None and row["dimension"] != dimension:
+            problems.append(f"dimension {row['dimension']} != {dimension}")
+        if column_dim is not None and column_dim > 0 and column_dim != row["dimension"]:
+            problems.append(f"column {self._vector_column} is vector({column_dim}), stored {row['dimension']}")
+        if problems:
+            raise ConfigError(
+                f"Embedding space of '{self._table}' does not match the query encoder: "
+                + "; ".join(problems)
+            )
+        return dict(row)
+
+    async def detect(
+        self,
+        demand_vector: Vector,
+        agent_vectors: dict[str, Vector],
+        k_star: int,
+    ) -> list[tuple[str, float]]:
+        if k_star <= 0:
+            return []
+        if np.linalg.norm(demand_vector) < 1e-10:
+            return []
+
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            if agent_vectors:
+                stmt = await conn.prepare(self._filtered_query)
+                rows = await stmt.fetch(demand_vector, k_star, list(agent_vectors))
+            else:
+                stmt = await conn.prepare(self._query)
+                rows = await stmt.fetch(demand_vector, k_star)
+
+        return [(row["agent_id"], float(row["score"])) for row in rows]
+
+    async def detect_stream(
+        self,
+        demand_vector: Vector,
+        agent_vectors: dict[str, Vector],
+        k_star: int,
+        prefetch: int = 1,
+    ) -> AsyncIterator[tuple[str, float]]:
+        if k_star <= 0 or np.linalg.norm(demand_vector) < 1e-10:
+            return
+
+        # Callers may stop early; close the generator (contextlib.aclosing) so the
+        # transaction is rolled back and the connection returned right away.
+        pool = await self._get_pool()
+        conn = await pool.acquire()
+        try:
+            async with conn.transaction():
+                if agent_vectors:
+                    stmt = await conn.prepare(self._filtered_query)
+                    cursor = stmt.cursor(demand_vector, k_star, list(agent_vectors), prefetch=prefetch)
+                else:
+                    stmt = await conn.prepare(self._query)
+                    cursor = stmt.cursor(demand_vector, k_star, prefetch=prefetch)
+                async for row in cursor:
+                    yield row["agent_id"], float(row["score"])
+        finally:
+            await pool.release(conn)
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
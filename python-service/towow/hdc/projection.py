@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Any, Optional, Sequence, Union
+
+import numpy as np
+
+from towow.core.errors import ConfigError, EncodingError
+from towow.core.protocols import Encoder, Vector
+
+logger = logging.getLogger(__name__)
+
+VectorBatch = Union[np.ndarray, Sequence[Vector]]
+
+@dataclass
+class ProjectionReport:
+    method: str
+    source_dim: int
+    target_dim: int
+    sample_count: int
+    explained_variance: Optional[float] = None
+    recall_at_k: Optional[float] = None
+    recall_k: int = 10
+
+    @property
+    def compression_ratio(self) -> float:
+        return self.source_dim / self.target_dim
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "compression_ratio": self.compression_ratio}
+
+def _as_matrix(vectors: VectorBatch) -> np.ndarray:
+    if isinstance(vectors, np.ndarray):
+        matrix = vectors.astype(np.float32, copy=False)
+    elif len(vectors) == 0:
+        raise EncodingError("Expected a non-empty batch of vectors")
+    else:
+        matrix = np.stack([np.asarray(v, dtype=np.float32) for v in vectors])
+    if matrix.ndim != 2 or matrix.shape[0] == 0:
+        raise EncodingError(f"Expected a non-empty 2-D batch of vectors, got shape {matrix.shape}")
+    return matrix
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-10)
+
+def neighbour_recall(
+    original: np.ndarray,
+    projected: np.ndarray,
+    k: int = 10,
+    max_queries: int = 1000,
+) -> float:
+    n = original.shape[0]
+    k = min(k, n - 1)
+    if k <= 0:
+        return 1.0
+    queries = np.arange(min(n, max_queries))
+
+    def top_k(matrix: np.ndarray) -> np.ndarray:
+        normed = _normalize_rows(matrix)
+        sims = normed[queries] @ normed.T
+        sims[np.arange(len(queries)), queries] = -np.inf
+        return np.argpartition(-sims, k - 1, axis=1)[:, :k]
+
+    before = top_k(original)
+    after = top_k(projected)
+    hits = sum(len(set(b) & set(a)) for b, a in zip(before, after))
+    return hits / (len(queries) * k)
+
+class _Projector(ABC):
+    method = ""
+
+    def __init__(self, target_dim: int):
+        if target_dim <= 0:
+            raise ConfigError("target_dim must be positive")
+        self.target_dim = target_dim
+        self._mean: Optional[np.ndarray] = None
+        self._components: Optional[np.ndarray] = None
+        self.report: Optional[ProjectionReport] = None
+
+    @property
+    def is_fitted(self) -> bool:
+        return self._components is not None
+
+    @property
+    def source_dim(self) -> int:
+        if self._components is None:
+            raise ConfigError(f"{type(self).__name__} is not fitted")
+        return self._components.shape[1]
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the fitted projection, so stored vectors can be matched to it."""
+        if self._components is None:
+            raise ConfigError(f"{type(self).__name__} is not fitted")
+        digest = hashlib.sha1(self.method.encode("utf-8"))
+        digest.update(np.ascontiguousarray(self._components).tobytes())
+        if self._mean is not None:
+            digest.update(np.ascontiguousarray(self._mean).tobytes())
+        return digest.hexdigest()[:16]
+
+    def fit(self, vectors: VectorBatch, recall_k: int = 10) -> ProjectionReport:
+        matrix = _as_matrix(vectors)
+        if self.target_dim >= matrix.shape[1]:
+            raise ConfigError(
+                f"target_dim {self.target_dim} must be smaller than source dim {matrix.shape[1]}"
+            )
+        explained = self._fit(matrix)
+        self.report = ProjectionReport(
+            method=self.method,
+            source_dim=matrix.shape[1],
+            target_dim=self.target_dim,
+            sample_count=matrix.shape[0],
+            explained_variance=explained,
+            recall_at_k=neighbour_recall(matrix, self.transform_many(matrix), k=recall_k),
+            recall_k=recall_k,
+        )
+        logger.info("Fitted %s projection: %s", self.method, self.report.to_dict())
+        return self.report
+
+    @abstractmethod
+    def _fit(self, matrix: np.ndarray) -> Optional[float]:
+        """Set ``_components`` (and ``_mean`` if centred); return explained variance if known."""
+
+    def transform_many(self, vectors: VectorBatch) -> np.ndarray:
+        matrix = _as_matrix(vectors)
+        if matrix.shape[1] != self.source_dim:
+            raise EncodingError(
+                f"Projection expects dimension {self.source_dim}, got {matrix.shape[1]}"
+            )
+        if self._mean is not None:
+            matrix = matrix - self._mean
+        return _normalize_rows(matrix @ self._components.T).astype(np.float32)
+
+    def transform(self, vector: Vector) -> Vector:
+        return self.transform_many([vector])[0]
+
+    def save(self, path: str) -> None:
+        if self._components is None:
+            raise ConfigError(f"Cannot save unfitted {type(self).__name__}")
+        report = self.report.to_dict() if self.report else {}
+        report.pop("compression_ratio", None)
+        np.savez(
+            path,
+            method=np.array(self.method),
+            components=self._components,
+            mean=self._mean if self._mean is not None else np.zeros(0, dtype=np.float32),
+            report=np.array(json.dumps(report)),
+        )
+
+    @classmethod
+    def _from_arrays(cls, data: Any) -> _Projector:
+        components = np.asarray(data["components"], dtype=np.float32)
+        projector = cls(target_dim=components.shape[0])
+        projector._components = components
+        mean = np.asarray(data["mean"], dtype=np.float32)
+        projector._mean = mean if mean.size else None
+        report = json.loads(str(data["report"]))
+        projector.report = ProjectionReport(**report) if report else None
+        return projector
+
+class PCAProjector(_Projector):
+    method = "pca"
+
+    def _fit(self, matrix: np.ndarray) -> Optional[float]:
+        if matrix.shape[0] < self.target_dim:
+            raise ConfigError(
+                f"PCA to {self.target_dim} dims needs at least {self.target_dim} samples, "
+                f"got {matrix.shape[0]}; use RandomProjector for small catalogs"
+            )
+        self._mean = matrix.mean(axis=0)
+        _, singular, vt = np.linalg.svd(matrix - self._mean, full_matrices=False)
+        self._components = vt[: self.target_dim].astype(np.float32)
+        variance = singular ** 2
+        total = float(variance.sum())
+        return float(variance[: self.target_dim].sum() / total) if total > 0 else 1.0
+
+class RandomProjector(_Projector):
+    method = "random"
+
+    def __init__(self, target_dim: int, density: Optional[float] = None, seed: int = 0):
+        super().__init__(target_dim)
+        self._density = density
+        self._seed = seed
+
+    def _fit(self, matrix: np.ndarray) -> Optional[float]:
+        source_dim = matrix.shape[1]
+        density = self._density or 1.0 / np.sqrt(source_dim)
+        rng = np.random.default_rng(self._seed)
+        mask = rng.random((self.target_dim, source_dim)) < density
+        signs = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), size=mask.shape)
+        scale = 1.0 / np.sqrt(density * self.target_dim)
+        self._components = (mask * signs * scale).astype(np.float32)
+        return None
+
+_PROJECTORS: dict[str, type[_Projector]] = {
+    PCAProjector.method: PCAProjector,
+    RandomProjector.method: RandomProjector,
+}
+
+def create_projector(method: str, target_dim: int, seed: int = 0) -> _Projector:
+    if method == RandomProjector.method:
+        return RandomProjector(target_dim, seed=seed)
+    if method not in _PROJECTORS:
+        raise ConfigError(f"Unknown projection method '{method}', expected one of {sorted(_PROJECTORS)}")
+    return _PROJECTORS[method](target_dim)
+
+def load_projector(path: str) -> _Projector:
+    with np.load(path, allow_pickle=False) as data:
+        method = str(data["method"])
+        if method not in _PROJECTORS:
+            raise ConfigError(f"Unknown projection method '{method}' in {path}")
+        return _PROJECTORS[method]._from_arrays(data)
+
+class ProjectedEncoder:
+    def __init__(self, encoder: Encoder, projector: _Projector):
+        if not projector.is_fitted:
+            raise ConfigError("ProjectedEncoder requires a fitted projector")
+        self._encoder = encoder
+        self._projector = projector
+
+    @property
+    def dimension(self) -> int:
+        return self._projector.target_dim
+
+    @property
+    def is_ready(self) -> bool:
+        return getattr(self._encoder, "is_ready", True)
+
+    async def warmup(self, texts: Optional[list[str]] = None) -> None:
+        warmup = getattr(self._encoder, "warmup", None)
+        if warmup is not None:
+            await warmup(texts)
+        # A projection fitted on another model's vectors would fail every request.
+        probe = await self._encoder.encode(texts[0] if texts else "warmup")
+        if len(probe) != self._projector.source_dim:
+            raise ConfigError(
+                f"Projection was fitted on {self._projector.source_dim}-dim vectors but the "
+                f"encoder produces {len(probe)}-dim vectors; refit it with the same model"
+            )
+
+    def status(self) -> dict[str, Any]:
+        status = getattr(self._encoder, "status", None)
+        base = status() if status else {"ready": self.is_ready}
+        report = self._projector.report
+        return {**base, "projection": report.to_dict() if report else {"target_dim": self.dimension}}
+
+    async def encode(self, text: str) -> Vector:
+        return self._projector.transform(await self._encoder.encode(text))
+
+    async def batch_encode(self, texts: list[str]) -> list[Vector]:
+        vecs = await self._encoder.batch_encode(texts)
+        if not vecs:
+            return []
+        return list(self._projector.transform_many(vecs))
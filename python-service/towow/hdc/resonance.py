@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+from typing import AsyncIterator
+
 import numpy as np
 
 from towow.core.protocols import Vector
@@ -31,3 +34,36 @@ class CosineResonanceDetector:
 
         results.sort(key=lambda x: x[1], reverse=True)
         return results[:k_star]
+
+    async def detect_stream(
+        self,
+        demand_vector: Vector,
+        agent_vectors: dict[str, Vector],
+        k_star: int,
+    ) -> AsyncIterator[tuple[str, float]]:
+        """Same matches as ``detect``, yielded one at a time.
+
+        The top k is only known once every agent is scored, so this scores them
+        all in one matrix product before the first yield; it does not stream
+        incrementally. Only ``PgVectorResonanceDetector`` produces rows as the
+        query runs. Pipelined offers still start one per match, yielding to the
+        loop between them.
+        """
+        if k_star <= 0 or not agent_vectors:
+            return
+
+        demand_norm = np.linalg.norm(demand_vector)
+        if demand_norm < 1e-10:
+            return
+
+        agent_ids = list(agent_vectors)
+        matrix = np.stack([np.asarray(agent_vectors[a], dtype=np.float32) for a in agent_ids])
+        norms = np.linalg.norm(matrix, axis=1)
+        scores = (matrix @ demand_vector) / np.maximum(norms * demand_norm, 1e-10)
+        scores[norms < 1e-10] = 0.0
+
+        k = min(k_star, len(agent_ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        for idx in top[np.argsort(-scores[top], kind="stable")]:
+            yield agent_ids[idx], float(scores[idx])
+            await asyncio.sleep(0)
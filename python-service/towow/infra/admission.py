@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+
+from towow.core.errors import TowowError
+
+logger = logging.getLogger(__name__)
+
+class AdmissionRejected(TowowError):
+    def __init__(self, retry_after_s: float, queued: int):
+        super().__init__(f"Admission queue full ({queued} waiting), retry after {retry_after_s:.0f}s")
+        self.retry_after_s = retry_after_s
+        self.queued = queued
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_in_flight: int = 16,
+        max_queued: int = 64,
+        expected_duration_s: float = 60.0,
+        smoothing: float = 0.2,
+    ):
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be positive")
+        if max_queued < 0:
+            raise ValueError("max_queued must not be negative")
+        self._max_in_flight = max_in_flight
+        self._max_queued = max_queued
+        self._avg_duration = expected_duration_s
+        self._smoothing = smoothing
+        self._running: set[str] = set()
+        self._waiting: deque[str] = deque()
+        self._turns: dict[str, asyncio.Future] = {}
+        self._reserved: set[str] = set()
+        self._admitted = 0
+        self._deferred = 0
+        self._rejected = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._running)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiting)
+
+    def retry_after(self) -> float:
+        waves = (len(self._waiting) + 1) / self._max_in_flight
+        return max(1.0, math.ceil(waves * self._avg_duration))
+
+    def position(self, key: str) -> Optional[int]:
+        """0 while running, 1-based queue position while deferred, None otherwise."""
+        if key in self._running:
+            return 0
+        try:
+            return self._waiting.index(key) + 1
+        except ValueError:
+            return None
+
+    def reserve(self, key: str) -> None:
+        """Claim a running or queued slot up front, before doing expensive setup.
+
+        Raises AdmissionRejected when full. The slot is used by the next
+        ``submit`` for ``key``, or given back with ``cancel_reservation``.
+        """
+        if len(self._running) >= self._max_in_flight and len(self._waiting) >= self._max_queued:
+            self._rejected += 1
+            raise AdmissionRejected(self.retry_after(), len(self._waiting))
+
+        if len(self._running) < self._max_in_flight:
+            self._running.add(key)
+            self._admitted += 1
+        else:
+            self._waiting.append(key)
+            self._turns[key] = asyncio.get_running_loop().create_future()
+            self._deferred += 1
+            logger.info("Admission: %s deferred at position %d", key, len(self._waiting))
+        self._reserved.add(key)
+
+    def cancel_reservation(self, key: str) -> None:
+        if key in self._reserved:
+            self._reserved.discard(key)
+            self._release(key)
+
+    def submit(self, key: str, fn: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        if key not in self._reserved:
+            self.reserve(key)
+        self._reserved.discard(key)
+        return asyncio.create_task(self._run(key, fn))
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        try:
+            turn = self._turns.get(key)
+            if turn is not None:
+                await turn
+            started = loop.time()
+            try:
+                return await fn()
+            finally:
+                elapsed = loop.time() - started
+                self._avg_duration += self._smoothing * (elapsed - self._avg_duration)
+        finally:
+            self._release(key)
+
+    def _release(self, key: str) -> None:
+        self._turns.pop(key, None)
+        if key in self._running:
+            self._running.discard(key)
+        else:
+            try:
+                self._waiting.remove(key)
+            except ValueError:
+                pass
+        while self._waiting and len(self._running) < self._max_in_flight:
+            next_key = self._waiting.popleft()
+            self._running.add(next_key)
+            self._admitted += 1
+            turn = self._turns.pop(next_key, None)
+            if turn is not None and not turn.done():
+                turn.set_result(None)
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "max_in_flight": self._max_in_flight,
+            "max_queued": self._max_queued,
+            "in_flight": len(self._running),
+            "queued": len(self._waiting),
+            "admitted": self._admitted,
+            "deferred": self._deferred,
+            "rejected": self._rejected,
+            "avg_duration_s": round(self._avg_duration, 3),
+        }
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_requirement(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+class IdempotencyIndex:
+    """Maps request keys to the negotiation they started, for ``window_s`` seconds.
+
+    Keys come from an explicit client idempotency key or, failing that, a hash
+    of (user_id, normalised requirement, k), so double submits and client
+    retries attach to the negotiation already running instead of paying for a
+    second one.
+    """
+
+    def __init__(self, window_s: float = 60.0):
+        self._window = window_s
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._window > 0
+
+    @staticmethod
+    def key_for(
+        user_id: str,
+        requirement: str,
+        k: int,
+        idempotency_key: Optional[str] = None,
+    ) -> str:
+        if idempotency_key:
+            raw = f"key\0{user_id}\0{idempotency_key}"
+        else:
+            raw = f"req\0{user_id}\0{normalize_requirement(requirement)}\0{k}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> Optional[str]:
+        self._prune()
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return entry[0]
+
+    def remember(self, key: str, negotiation_id: str) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = (negotiation_id, time.monotonic())
+        self._entries.move_to_end(key)
+
+    def forget(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self._window
+        while self._entries:
+            key, (_, created) = next(iter(self._entries.items()))
+            if created > cutoff:
+                break
+            self._entries.popitem(last=False)
+
+    def metrics(self) -> dict[str, Any]:
+        self._prune()
+        return {
+            "window_s": self._window,
+            "tracked": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+        }
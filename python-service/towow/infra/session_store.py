@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+from towow.core.models import NegotiationSession, NegotiationState
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    negotiation_id TEXT PRIMARY KEY,
+    parent_id TEXT,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    data BLOB NOT NULL
+)
+"""
+
+def _encode(session: NegotiationSession) -> tuple[Any, ...]:
+    data = json.dumps(session.to_dict(), ensure_ascii=False, default=str)
+    return (
+        session.negotiation_id,
+        session.parent_negotiation_id,
+        session.state.value,
+        time.time(),
+        zlib.compress(data.encode("utf-8")),
+    )
+
+def _decode(blob: bytes) -> NegotiationSession:
+    return NegotiationSession.from_dict(json.loads(zlib.decompress(blob)))
+
+class SessionStore:
+    """Active sessions in memory; completed ones age out to SQLite.
+
+    Completed sessions stay in an in-memory LRU until they have been idle for
+    ``completed_ttl_s`` or ``max_completed`` is exceeded, then are written as
+    compressed JSON to a WAL-mode SQLite file and dropped from memory. ``get``
+    rehydrates them on demand, so old results remain queryable while memory
+    stays bounded.
+
+    The same table holds engine checkpoints: ``checkpoint`` upserts the
+    session after every state transition, and ``unfinished`` returns the ones
+    a restart interrupted so they can be resumed.
+
+    Inside a running loop, writes go to a single writer thread so they never
+    block it and apply in submission order; sessions stay readable from
+    memory until their write has landed. Reads use their own read-only WAL
+    connection, so a lookup never waits behind a commit.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        max_completed: int = 256,
+        completed_ttl_s: float = 300.0,
+    ):
+        if max_completed < 0:
+            raise ValueError("max_completed must not be negative")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+        self._db.commit()
+        if path != ":memory:":
+            uri = Path(path).absolute().as_uri() + "?mode=ro"
+            self._reader = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self._read_lock = threading.Lock()
+        else:
+            # An in-memory database can't be opened twice; share the writer's connection.
+            self._reader = self._db
+            self._read_lock = self._lock
+
+        self._max_completed = max_completed
+        self._ttl = completed_ttl_s
+        self._active: dict[str, NegotiationSession] = {}
+        self._completed: OrderedDict[str, tuple[NegotiationSession, float]] = OrderedDict()
+        self._persisted: set[str] = set()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-store")
+        self._writing: dict[str, NegotiationSession] = {}
+        self._pending: set[asyncio.Future] = set()
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._offloaded = 0
+        self._rehydrated = 0
+        self._checkpoints = 0
+
+    def __contains__(self, negotiation_id: str) -> bool:
+        return self.get(negotiation_id) is not None
+
+    def put(self, session: NegotiationSession) -> None:
+        self._completed.pop(session.negotiation_id, None)
+        self._active[session.negotiation_id] = session
+
+    def get(self, negotiation_id: str) -> Optional[NegotiationSession]:
+        session = self._active.get(negotiation_id)
+        if session is not None:
+            return session
+        cached = self._completed.pop(negotiation_id, None)
+        if cached is not None:
+            self._completed[negotiation_id] = (cached[0], time.monotonic())
+            return cached[0]
+        session = self._writing.get(negotiation_id)
+        if session is not None:
+            # Offload still in flight: keep serving it, it is about to be on disk.
+            self._persisted.add(negotiation_id)
+            self._completed[negotiation_id] = (session, time.monotonic())
+            self._evict()
+            return session
+
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT data FROM sessions WHERE negotiation_id = ?", (negotiation_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        session = _decode(row[0])
+        self._rehydrated += 1
+        self._persisted.add(negotiation_id)
+        self._completed[negotiation_id] = (session, time.monotonic())
+        self._evict()
+        return session
+
+    def discard(self, negotiation_id: str) -> None:
+        self._active.pop(negotiation_id, None)
+        self._completed.pop(negotiation_id, None)
+        self._tasks.pop(negotiation_id, None)
+        self._persisted.discard(negotiation_id)
+        self._writing.pop(negotiation_id, None)
+        self._submit(self._delete, negotiation_id)
+
+    def _delete(self, negotiation_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE negotiation_id = ?", (negotiation_id,))
+            self._db.commit()
+
+    def complete(self, negotiation_id: str) -> None:
+        """Mark a session and its sub-sessions finished, making them evictable."""
+        pending = [negotiation_id]
+        while pending:
+            session = self._active.pop(pending.pop(), None)
+            if session is None:
+                continue
+            self._persisted.discard(session.negotiation_id)
+            self._completed[session.negotiation_id] = (session, time.monotonic())
+            pending.extend(session.sub_session_ids)
+        self._evict()
+
+    def attach_task(self, negotiation_id: str, task: asyncio.Task) -> None:
+        self._tasks[negotiation_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(negotiation_id, None))
+
+    def get_task(self, negotiation_id: str) -> Optional[asyncio.Task]:
+        return self._tasks.get(negotiation_id)
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        batch: list[NegotiationSession] = []
+        while self._completed:
+            negotiation_id, (session, touched) = next(iter(self._completed.items()))
+            if now - touched < self._ttl and len(self._completed) <= self._max_completed:
+                break
+            self._completed.popitem(last=False)
+            if negotiation_id in self._persisted:
+                self._persisted.discard(negotiation_id)
+            else:
+                batch.append(session)
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch: list[NegotiationSession]) -> None:
+        # Serialise on the caller's thread so the snapshot is consistent.
+        rows = [_encode(session) for session in batch]
+        for session in batch:
+            self._writing[session.negotiation_id] = session
+        self._offloaded += len(batch)
+        logger.debug("SessionStore: offloading %d sessions", len(batch))
+
+        def written() -> None:
+            for session in batch:
+                if self._writing.get(session.negotiation_id) is session:
+                    del self._writing[session.negotiation_id]
+
+        self._submit(self._write_rows, rows, on_done=written)
+
+    def _submit(self, fn: Any, *args: Any, on_done: Any = None) -> None:
+        """Run a DB write on the writer thread, or inline when no loop is running."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._writer.submit(fn, *args).result()
+            if on_done is not None:
+                on_done()
+            return
+
+        future = loop.run_in_executor(self._writer, fn, *args)
+        self._pending.add(future)
+
+        def done(f: asyncio.Future) -> None:
+            self._pending.discard(f)
+            if on_done is not None:
+                on_done()
+            if not f.cancelled() and f.exception() is not None:
+                logger.error("SessionStore: write failed: %s", f.exception())
+
+        future.add_done_callback(done)
+
+    async def drain(self) -> None:
+        """Wait for every write submitted so far to land."""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def _write_rows(self, rows: list[tuple[Any, ...]]) -> None:
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._db.commit()
+
+    async def checkpoint(self, session: NegotiationSession) -> None:
+        # Serialise on the loop so the snapshot is consistent; commit off it.
+        row = _encode(session)
+        # Same writer thread as offloads, so a checkpoint never overtakes a discard.
+        await asyncio.get_running_loop().run_in_executor(self._writer, self._write_rows, [row])
+        self._checkpoints += 1
+
+    def unfinished(self) -> list[NegotiationSession]:
+        """Sessions a restart interrupted, oldest first.
+
+        A session whose last checkpoint is not COMPLETED is skipped when its run
+        was cancelled or failed: those ended on purpose, not because of the restart.
+        """
+        with self._read_lock:
+            rows = self._reader.execute(
+                "SELECT data FROM sessions WHERE state != ? ORDER BY updated_at",
+                (NegotiationState.COMPLETED.value,),
+            ).fetchall()
+        sessions = [_decode(row[0]) for row in rows]
+        return [
+            session for session in sessions
+            if not (session.metadata.get("cancelled") or session.metadata.get("error"))
+        ]
+
+    def flush(self) -> None:
+        """Write every in-memory completed session to disk and wait for it (shutdown path)."""
+        batch = [
+            session for negotiation_id, (session, _) in self._completed.items()
+            if negotiation_id not in self._persisted
+        ]
+        self._completed.clear()
+        self._persisted.clear()
+        if batch:
+            self._offloaded += len(batch)
+            self._writer.submit(self._write_rows, [_encode(session) for session in batch]).result()
+        else:
+            # Still wait for writes already queued on the writer thread.
+            self._writer.submit(lambda: None).result()
+        self._writing.clear()
+
+    def metrics(self) -> dict[str, Any]:
+        with self._read_lock:
+            stored = self._reader.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {
+            "active": len(self._active),
+            "completed_in_memory": len(self._completed),
+            "running_tasks": len(self._tasks),
+            "stored": stored,
+            "offloaded": self._offloaded,
+            "rehydrated": self._rehydrated,
+            "checkpoints": self._checkpoints,
+        }
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.shutdown(wait=True)
+        if self._reader is not self._db:
+            with self._read_lock:
+                self._reader.close()
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,172 @@
+"""Export negotiation traces to Chrome Trace Event Format or folded stacks.
+
+Works on ``TraceChain.to_dict()`` output, so traces can be analysed offline:
+
+    python -m towow.infra.trace_export traces/*.json -o timeline.json
+    python -m towow.infra.trace_export traces/*.json --format folded -o stacks.txt
+
+Open the JSON in https://ui.perfetto.dev or chrome://tracing; feed folded
+stacks to flamegraph.pl or speedscope.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+def _spans(trace: dict[str, Any]) -> list[dict[str, Any]]:
+    return [
+        e for e in trace.get("entries", [])
+        if e.get("start_ms") is not None and e.get("duration_ms") is not None
+    ]
+
+def _started_us(trace: dict[str, Any]) -> float:
+    return datetime.fromisoformat(trace["started_at"]).timestamp() * 1_000_000
+
+def _assign_lanes(spans: list[dict[str, Any]]) -> dict[str, int]:
+    """Pack spans into lanes so every lane holds properly nested intervals.
+
+    Perfetto draws slices on one thread as a stack, so overlapping siblings
+    (concurrent offers, parallel tool calls) each need their own lane.
+    """
+    lanes: list[list[tuple[float, float]]] = []
+    assigned: dict[str, int] = {}
+    for span in sorted(spans, key=lambda s: (s["start_ms"], -s["duration_ms"])):
+        start = span["start_ms"]
+        end = start + span["duration_ms"]
+        preferred = assigned.get(span.get("parent_id"))
+        order = ([preferred] if preferred is not None else []) + list(range(len(lanes)))
+        for lane in order:
+            stack = lanes[lane]
+            while stack and stack[-1][1] <= start:
+                stack.pop()
+            if not stack or end <= stack[-1][1]:
+                stack.append((start, end))
+                assigned[span["span_id"]] = lane
+                break
+        else:
+            lanes.append([(start, end)])
+            assigned[span["span_id"]] = len(lanes) - 1
+    return assigned
+
+def to_chrome_events(
+    trace: dict[str, Any],
+    pid: int = 1,
+    origin_us: Optional[float] = None,
+) -> list[dict[str, Any]]:
+    spans = _spans(trace)
+    base = _started_us(trace) - (origin_us if origin_us is not None else _started_us(trace))
+    lanes = _assign_lanes(spans)
+
+    events: list[dict[str, Any]] = [{
+        "ph": "M",
+        "name": "process_name",
+        "pid": pid,
+        "args": {"name": trace.get("negotiation_id", f"negotiation {pid}")},
+    }]
+    for lane in sorted(set(lanes.values())):
+        events.append({
+            "ph": "M",
+            "name": "thread_name",
+            "pid": pid,
+            "tid": lane,
+            "args": {"name": f"lane {lane}"},
+        })
+    for span in spans:
+        events.append({
+            "ph": "X",
+            "name": span["step"],
+            "cat": "towow",
+            "pid": pid,
+            "tid": lanes[span["span_id"]],
+            "ts": base + span["start_ms"] * 1000,
+            "dur": span["duration_ms"] * 1000,
+            "args": {**span.get("metadata", {}), "span_id": span["span_id"]},
+        })
+    return events
+
+def to_chrome_trace(traces: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    traces = [t for t in traces if _spans(t)]
+    origin = min((_started_us(t) for t in traces), default=0.0)
+    events: list[dict[str, Any]] = []
+    for pid, trace in enumerate(traces, start=1):
+        events.extend(to_chrome_events(trace, pid=pid, origin_us=origin))
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+def to_folded_stacks(traces: Iterable[dict[str, Any]]) -> list[str]:
+    """Self time per stack in microseconds, aggregated across traces."""
+    totals: dict[str, float] = defaultdict(float)
+    for trace in traces:
+        spans = {s["span_id"]: s for s in _spans(trace)}
+        child_ms: dict[str, float] = defaultdict(float)
+        for span in spans.values():
+            if span.get("parent_id") in spans:
+                child_ms[span["parent_id"]] += span["duration_ms"]
+
+        for span in spans.values():
+            path = [span["step"]]
+            parent = spans.get(span.get("parent_id"))
+            while parent is not None:
+                path.append(parent["step"])
+                parent = spans.get(parent.get("parent_id"))
+            self_ms = max(0.0, span["duration_ms"] - child_ms[span["span_id"]])
+            totals[";".join(reversed(path))] += self_ms * 1000
+
+    return [f"{stack} {round(us)}" for stack, us in sorted(totals.items()) if round(us) > 0]
+
+def _extract_traces(data: Any) -> list[dict[str, Any]]:
+    if isinstance(data, list):
+        return [t for item in data for t in _extract_traces(item)]
+    if not isinstance(data, dict):
+        return []
+    if "entries" in data and "started_at" in data:
+        return [data]
+    if isinstance(data.get("trace"), dict):
+        return _extract_traces(data["trace"])
+    return []
+
+def load_traces(paths: Iterable[str]) -> list[dict[str, Any]]:
+    """Read traces from JSON files (a trace, a session with ``trace``, or a list) or JSONL."""
+    traces: list[dict[str, Any]] = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        try:
+            traces.extend(_extract_traces(json.loads(text)))
+        except json.JSONDecodeError:
+            for line in text.splitlines():
+                if line.strip():
+                    traces.extend(_extract_traces(json.loads(line)))
+    return traces
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export negotiation traces for Perfetto or flamegraphs")
+    parser.add_argument("paths", nargs="+", help="trace JSON / JSONL files")
+    parser.add_argument("--format", choices=["chrome", "folded"], default="chrome")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    traces = load_traces(args.paths)
+    if not traces:
+        print("No traces found", file=sys.stderr)
+        return 1
+
+    if args.format == "chrome":
+        output = json.dumps(to_chrome_trace(traces), ensure_ascii=False)
+    else:
+        output = "\n".join(to_folded_stacks(traces)) + "\n"
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Wrote {len(traces)} traces to {args.output}", file=sys.stderr)
+    else:
+        sys.stdout.write(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())